@@ -3,10 +3,69 @@ import logging
 import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Fragmentos de ``BaseAgent.stream``: texto suelto (va a DEFAULT_STREAM_FIELD),
+# {"field": "data.code", "delta": "..."} o {"result": {...}} con el resultado final
+StreamChunk = Union[str, Dict[str, Any]]
+DEFAULT_STREAM_FIELD = "output"
+
+
+def _set_path(result: Dict[str, Any], path: str, value: Any) -> None:
+    """Asigna ``value`` en una ruta con puntos sin pisar lo que ya exista"""
+    *parents, leaf = path.split(".")
+    target = result
+    for key in parents:
+        target = target.setdefault(key, {})
+    target.setdefault(leaf, value)
+
+
+class StreamAssembler:
+    """Reconstruye el resultado final a partir de los fragmentos de un stream"""
+
+    def __init__(self):
+        self.parts: Dict[str, List[str]] = {}
+        self.sizes: Dict[str, int] = {}
+        self.result: Optional[Any] = None
+        self.chunks = 0
+
+    def add(self, chunk: StreamChunk) -> Optional[Dict[str, Any]]:
+        """Registra un fragmento; retorna el delta a publicar o None si era
+        el resultado final. ``offset`` permite al cliente detectar huecos."""
+
+        if isinstance(chunk, dict) and "result" in chunk:
+            self.result = chunk["result"]
+            return None
+        if isinstance(chunk, dict):
+            field = chunk.get("field") or DEFAULT_STREAM_FIELD
+            delta = str(chunk.get("delta", ""))
+        else:
+            field, delta = DEFAULT_STREAM_FIELD, str(chunk)
+
+        offset = self.sizes.get(field, 0)
+        self.parts.setdefault(field, []).append(delta)
+        self.sizes[field] = offset + len(delta)
+        self.chunks += 1
+        return {"field": field, "delta": delta, "offset": offset, "chunk": self.chunks}
+
+    def build(self) -> Any:
+        """Resultado final con los campos de texto ya concatenados"""
+        result = self.result if self.result is not None else {"status": "success"}
+        if isinstance(result, dict):
+            for field, parts in self.parts.items():
+                _set_path(result, field, "".join(parts))
+        return result
+
+
+def collect_stream(chunks: Iterable[StreamChunk]) -> Any:
+    """Consume un stream síncrono completo (para quien llama a ``handle``)"""
+    assembler = StreamAssembler()
+    for chunk in chunks:
+        assembler.add(chunk)
+    return assembler.build()
+
 
 class BaseAgent(ABC):
     """Clase base para todos los agentes IA en el hub"""
@@ -35,6 +94,19 @@ class BaseAgent(ABC):
             Dict con la respuesta del agente
         """
 
+    def stream(
+        self, message: Dict[str, Any]
+    ) -> Optional[Union[Iterator[StreamChunk], AsyncIterator[StreamChunk]]]:
+        """
+        Versión incremental opcional de ``handle``.
+
+        Retorna un generador (síncrono o asíncrono) de ``StreamChunk`` sin
+        hacer trabajo todavía, o ``None`` si la acción no se emite en
+        streaming. El motor publica cada fragmento como ``node_progress`` y
+        arma el resultado final con ``StreamAssembler``.
+        """
+        return None
+
     def _validate_message(self, message: Dict[str, Any]) -> bool:
         """Valida formato básico del mensaje"""
         if not isinstance(message, dict):
@@ -5,9 +5,9 @@
 
 import re
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
-from agenthub.agents.base_agent import BaseAgent
+from agenthub.agents.base_agent import BaseAgent, StreamChunk, collect_stream
 
 
 class ContentWriterAgent(BaseAgent):
@@ -54,8 +54,18 @@ class ContentWriterAgent(BaseAgent):
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
+    def stream(self, message: Dict[str, Any]) -> Optional[Iterator[StreamChunk]]:
+        """Los posts de blog se emiten sección a sección"""
+        if message.get("action") == "write_blog_post":
+            return self._stream_blog_post(message.get("data", {}))
+        return None
+
     def _write_blog_post(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Genera un post de blog completo"""
+        return collect_stream(self._stream_blog_post(data))
+
+    def _stream_blog_post(self, data: Dict[str, Any]) -> Iterator[StreamChunk]:
+        """Genera el post emitiendo cada sección en cuanto está escrita"""
         topic = data.get("topic", "Tecnología")
         style = data.get("style", "professional")
         word_count = data.get("word_count", 800)
@@ -64,6 +74,9 @@ class ContentWriterAgent(BaseAgent):
 
         # Generar título llamativo
         title = self._generate_blog_title(topic, keywords)
+        header = f"# {title}\n\n"
+        words = len(header.split())
+        yield {"field": "data.content", "delta": header}
 
         # Generar estructura del post
         sections = [
@@ -82,26 +95,32 @@ class ContentWriterAgent(BaseAgent):
                 section, topic, style, target_audience
             )
             content_sections.append({"heading": section, "content": section_content})
+            part = self._format_blog_section(section, section_content)
+            words += len(part.split())
+            yield {"field": "data.content", "delta": part}
+
+        if keywords:
+            footer = f"**Keywords:** {', '.join(keywords)}\n"
+            words += len(footer.split())
+            yield {"field": "data.content", "delta": footer}
 
         # Generar meta descripción
         meta_description = self._generate_meta_description(topic, keywords)
 
-        # Compilar post completo
-        full_post = self._compile_blog_post(title, content_sections, keywords)
-
-        return {
-            "status": "success",
-            "data": {
-                "title": title,
-                "content": full_post,
-                "sections": content_sections,
-                "meta_description": meta_description,
-                "estimated_reading_time": f"{max(1, word_count // 200)} min",
-                "word_count": len(full_post.split()),
-                "seo_keywords": keywords,
-                "style": style,
-                "target_audience": target_audience,
-            },
+        yield {
+            "result": {
+                "status": "success",
+                "data": {
+                    "title": title,
+                    "sections": content_sections,
+                    "meta_description": meta_description,
+                    "estimated_reading_time": f"{max(1, word_count // 200)} min",
+                    "word_count": words,
+                    "seo_keywords": keywords,
+                    "style": style,
+                    "target_audience": target_audience,
+                },
+            }
         }
 
     def _create_social_media(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -426,6 +445,17 @@ Las principales características incluyen:
         else:
             return f"Contenido detallado sobre {section} en el contexto de {topic}."
 
+    def _format_blog_section(self, heading: str, content: str) -> str:
+        """Sección del post en Markdown"""
+        return f"## {heading}\n\n{content}\n\n"
+
+    def _generate_meta_description(self, topic: str, keywords: List[str]) -> str:
+        """Meta descripción SEO (máx. 160 caracteres)"""
+        description = f"Descubre todo sobre {topic}: beneficios, implementación y mejores prácticas."
+        if keywords:
+            description += f" {', '.join(keywords[:3])}."
+        return description[:160]
+
     def _generate_social_content(
         self, topic: str, style: str, platform: str, max_chars: int
     ) -> str:
@@ -6,9 +6,9 @@
 import json
 import random
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
-from agenthub.agents.base_agent import BaseAgent
+from agenthub.agents.base_agent import BaseAgent, StreamChunk, collect_stream
 
 
 class UIComponentGeneratorAgent(BaseAgent):
@@ -77,6 +77,12 @@ class UIComponentGeneratorAgent(BaseAgent):
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
+    def stream(self, message: Dict[str, Any]) -> Optional[Iterator[StreamChunk]]:
+        """Las landing pages se emiten sección a sección"""
+        if message.get("action") == "create_landing_page":
+            return self._stream_landing_page(message.get("data", {}))
+        return None
+
     def _generate_component(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Genera un componente UI personalizado"""
         component_type = data.get("type", "button")
@@ -133,10 +139,18 @@ class UIComponentGeneratorAgent(BaseAgent):
 
     def _create_landing_page(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Crea una landing page completa"""
+        return collect_stream(self._stream_landing_page(data))
+
+    def _stream_landing_page(self, data: Dict[str, Any]) -> Iterator[StreamChunk]:
+        """Genera la landing page emitiendo el código de cada sección en
+        cuanto está lista; el archivo principal se arma con los fragmentos"""
         business_type = data.get("business_type", "startup")
         color_scheme = data.get("color_scheme", "blue")
         sections = data.get("sections", ["hero", "features", "pricing", "contact"])
         framework = data.get("framework", "react")
+        code_field = "data.main_file.code"
+
+        yield {"field": code_field, "delta": self._landing_page_header(framework, color_scheme)}
 
         # Generar secciones de la landing page
         page_sections = {}
@@ -144,42 +158,41 @@ class UIComponentGeneratorAgent(BaseAgent):
             page_sections[section] = self._generate_landing_section(
                 section, business_type, color_scheme, framework
             )
+            yield {"field": code_field, "delta": page_sections[section] + "\n"}
 
-        # Generar página completa
-        full_page_code = self._assemble_landing_page(
-            page_sections, framework, color_scheme
-        )
+        yield {"field": code_field, "delta": self._landing_page_footer(framework)}
 
         # Generar archivos de configuración
         config_files = self._generate_landing_config_files(framework)
 
-        return {
-            "status": "success",
-            "data": {
-                "business_type": business_type,
-                "color_scheme": color_scheme,
-                "framework": framework,
-                "sections": list(page_sections.keys()),
-                "main_file": {
-                    "filename": f"LandingPage.{self._get_file_extension(framework)}",
-                    "code": full_page_code,
-                    "language": self._get_file_language(framework),
+        yield {
+            "result": {
+                "status": "success",
+                "data": {
+                    "business_type": business_type,
+                    "color_scheme": color_scheme,
+                    "framework": framework,
+                    "sections": list(page_sections.keys()),
+                    "main_file": {
+                        "filename": f"LandingPage.{self._get_file_extension(framework)}",
+                        "language": self._get_file_language(framework),
+                    },
+                    "section_files": [
+                        {
+                            "filename": f"{section.title()}.{self._get_file_extension(framework)}",
+                            "code": code,
+                            "section": section,
+                        }
+                        for section, code in page_sections.items()
+                    ],
+                    "config_files": config_files,
+                    "dependencies": self._get_landing_dependencies(framework),
+                    "seo_optimized": True,
+                    "mobile_responsive": True,
+                    "performance_score": random.randint(85, 98),
+                    "generated_at": datetime.now().isoformat(),
                 },
-                "section_files": [
-                    {
-                        "filename": f"{section.title()}.{self._get_file_extension(framework)}",
-                        "code": code,
-                        "section": section,
-                    }
-                    for section, code in page_sections.items()
-                ],
-                "config_files": config_files,
-                "dependencies": self._get_landing_dependencies(framework),
-                "seo_optimized": True,
-                "mobile_responsive": True,
-                "performance_score": random.randint(85, 98),
-                "generated_at": datetime.now().isoformat(),
-            },
+            }
         }
 
     def _generate_form(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -833,11 +846,35 @@ function App() {{
             f"// {section} section for {business_type} with {color_scheme} color scheme"
         )
 
-    def _assemble_landing_page(
-        self, sections: Dict, framework: str, color_scheme: str
-    ) -> str:
-        """Ensambla la landing page completa"""
-        return "// Complete landing page code would be generated here"
+    def _landing_page_header(self, framework: str, color_scheme: str) -> str:
+        """Cabecera del archivo principal de la landing page"""
+        return f"// Landing page ({framework}, {color_scheme} color scheme)\n"
+
+    def _landing_page_footer(self, framework: str) -> str:
+        """Cierre del archivo principal de la landing page"""
+        return "// End of landing page\n"
+
+    def _generate_landing_config_files(self, framework: str) -> List[Dict[str, str]]:
+        """Archivos de configuración de la landing page"""
+        if framework in ("react", "vue", "svelte"):
+            return [
+                {
+                    "filename": "package.json",
+                    "content": json.dumps(
+                        {"name": "landing-page", "private": True}, indent=2
+                    ),
+                }
+            ]
+        return []
+
+    def _get_landing_dependencies(self, framework: str) -> List[str]:
+        """Dependencias de la landing page"""
+        return {
+            "react": ["react", "react-dom"],
+            "vue": ["vue"],
+            "svelte": ["svelte"],
+            "angular": ["@angular/core"],
+        }.get(framework, [])
 
     def _get_default_form_fields(self, form_type: str) -> List[Dict]:
         """Obtiene campos por defecto para formularios"""
@@ -9,11 +9,15 @@ import requests
 @click.group()
 @click.option("--host", default="localhost", help="AgentHub host")
 @click.option("--port", default=8000, help="AgentHub port")
+@click.option(
+    "--token", envvar="AGENTHUB_TOKEN", help="Bearer token for authenticated endpoints"
+)
 @click.pass_context
-def cli(ctx, host, port):
+def cli(ctx, host, port, token):
     """AgentHub CLI - Interact with AgentHub from command line"""
     ctx.ensure_object(dict)
     ctx.obj["base_url"] = f"http://{host}:{port}"
+    ctx.obj["token"] = token
 
 
 @cli.command()
@@ -100,11 +104,116 @@ def workflows(ctx):
         click.echo("❌ Cannot connect to AgentHub")
 
 
+def _auth_headers(ctx):
+    token = ctx.obj.get("token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def _iter_sse(response):
+    """Eventos (id, data) de una respuesta text/event-stream"""
+    event_id, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield event_id, "\n".join(data)
+            event_id, data = None, []
+        elif line.startswith(":"):
+            continue  # keep-alive
+        elif line.startswith("id:"):
+            event_id = line[3:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+
+def _echo_event(event):
+    """Imprime una línea de progreso; retorna el estado final si lo hay"""
+    event_type = event.get("type")
+    data = event.get("data", {})
+    node = data.get("node_id")
+
+    if event_type == "workflow_started":
+        name = data.get("workflow_name", data.get("workflow_id"))
+        click.echo(f"▶️ Workflow {name} started")
+    elif event_type == "node_started":
+        click.echo(f"  ⏳ {node} ({data.get('agent_type')}) running")
+    elif event_type == "node_progress" and "delta" in data:
+        size = data.get("offset", 0) + len(data["delta"])
+        click.echo(f"  … {node}: {data.get('field')} {size} chars")
+    elif event_type == "node_progress":
+        click.echo(f"  … {node}: {data.get('progress', '')}")
+    elif event_type == "node_retry":
+        click.echo(
+            f"  🔁 {node} retry #{data.get('attempt')} "
+            f"in {data.get('delay', 0):.1f}s: {data.get('error')}"
+        )
+    elif event_type == "node_completed":
+        cached = " (cached)" if data.get("cached") else ""
+        click.echo(f"  ✅ {node} completed in {data.get('duration') or 0:.2f}s{cached}")
+    elif event_type == "node_failed":
+        click.echo(f"  ❌ {node} failed: {data.get('error')}")
+    elif event_type == "replay_gap":
+        click.echo("  ⚠️ Some earlier events are no longer available")
+    elif event_type == "workflow_completed":
+        click.echo(f"✅ Workflow completed in {data.get('duration') or 0:.2f}s")
+        return "completed"
+    elif event_type == "workflow_failed":
+        click.echo(f"❌ Workflow failed: {data.get('error')}")
+        return "failed"
+    elif event_type == "workflow_cancelled":
+        click.echo("🛑 Workflow cancelled")
+        return "cancelled"
+    elif event_type == "execution_finished":
+        click.echo(f"📊 Status: {data.get('status')}")
+        return data.get("status")
+    return None
+
+
+def _follow_execution(ctx, execution_id):
+    """Sigue el stream SSE reanudando desde el último id si se corta"""
+    url = f"{ctx.obj['base_url']}/api/v1/executions/{execution_id}/events"
+    last_id = None
+    while True:
+        headers = _auth_headers(ctx)
+        if last_id:
+            headers["Last-Event-ID"] = last_id
+        try:
+            with requests.get(
+                url, headers=headers, stream=True, timeout=(5, 60)
+            ) as response:
+                if response.status_code != 200:
+                    click.echo(f"❌ Error: {response.status_code} - {response.text}")
+                    return None
+                for event_id, data in _iter_sse(response):
+                    last_id = event_id or last_id
+                    try:
+                        event = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    if not isinstance(event, dict):
+                        continue  # p.ej. aviso de overflow: se reconecta
+                    status = _echo_event(event)
+                    if status:
+                        return status
+        except (
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.ReadTimeout,
+        ):
+            pass
+        click.echo("⚠️ Stream interrupted, reconnecting...")
+
+
 @cli.command()
 @click.argument("workflow_id")
 @click.option("--data", help="JSON data for the workflow")
+@click.option(
+    "--follow/--no-follow",
+    default=True,
+    help="Stream progress until the workflow finishes",
+)
 @click.pass_context
-def run(ctx, workflow_id, data):
+def run(ctx, workflow_id, data, follow):
     """Run a workflow"""
     try:
         payload = {"initial_data": {}}
@@ -119,16 +228,23 @@ def run(ctx, workflow_id, data):
         response = requests.post(
             f"{ctx.obj['base_url']}/api/v1/workflows/{workflow_id}/execute",
             json=payload,
+            headers=_auth_headers(ctx),
         )
 
-        if response.status_code == 200:
-            result = response.json()
-            click.echo("✅ Workflow started successfully")
-            click.echo(f"🆔 Execution ID: {result['execution_id']}")
-            click.echo(f"⏱️ Duration: {result['execution_time']:.2f}s")
-            click.echo(f"📊 Status: {result['status']}")
-        else:
+        if response.status_code != 200:
             click.echo(f"❌ Error: {response.status_code} - {response.text}")
+            return
+
+        result = response.json()
+        click.echo("✅ Workflow started successfully")
+        click.echo(f"🆔 Execution ID: {result['execution_id']}")
+        if not follow:
+            click.echo(f"📊 Status: {result['status']}")
+            return
+
+        status = _follow_execution(ctx, result["execution_id"])
+        if status and status != "completed":
+            ctx.exit(1)
 
     except requests.exceptions.ConnectionError:
         click.echo("❌ Cannot connect to AgentHub")
@@ -154,16 +270,15 @@ def init(project_name, template):
     (project_path / "tests").mkdir()
 
     # Crear archivos básicos
-    with open(project_path / "config.yaml", "w") as f:
-        f.write(
-            """
+    config_yaml = """
 env: development
 host: 0.0.0.0
 port: 8000
 debug: true
 log_level: INFO
 """
-        )
+    with open(project_path / "config.yaml", "w") as f:
+        f.write(config_yaml)
 
     with open(project_path / "registry.json", "w") as f:
         json.dump(
@@ -172,9 +287,7 @@ log_level: INFO
             indent=2,
         )
 
-    with open(project_path / "agents" / "example_agent.py", "w") as f:
-        f.write(
-            """
+    example_agent = """
 from agenthub.agents.base_agent import BaseAgent
 
 class ExampleAgent(BaseAgent):
@@ -194,7 +307,8 @@ class ExampleAgent(BaseAgent):
             "description": "Example agent for demonstration"
         }
 """
-        )
+    with open(project_path / "agents" / "example_agent.py", "w") as f:
+        f.write(example_agent)
 
     click.echo(f"✅ Project {project_name} created successfully!")
     click.echo("📁 Next steps:")
@@ -0,0 +1,477 @@
+# agenthub/execution_store.py
+"""Almacenamiento de ejecuciones de workflows.
+
+Los registros son diccionarios con las claves ``execution_id``, ``workflow_id``,
+``workflow_name``, ``source``, ``status``, ``started_at``, ``finished_at``,
+``duration``, ``error`` y ``result``. ``source`` indica qué motor creó la
+ejecución (``WorkflowEngine`` u ``Orchestrator``), que pueden compartir tabla.
+Los resultados (final y por nodo) se guardan aparte y solo se devuelven al
+pedir la ejecución con ``include_results=True``.
+
+Los listados van de la ejecución más reciente a la más antigua (por
+``started_at`` y ``execution_id``) y se paginan con un cursor opaco.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import heapq
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Origen de cada ejecución: ambos motores pueden escribir en el mismo store
+ENGINE_SOURCE = "engine"
+ORCHESTRATOR_SOURCE = "orchestrator"
+
+SUMMARY_FIELDS = (
+    "execution_id",
+    "workflow_id",
+    "workflow_name",
+    "source",
+    "status",
+    "started_at",
+    "finished_at",
+    "duration",
+    "error",
+)
+
+
+def encode_cursor(summary: Dict[str, Any]) -> str:
+    """Cursor que apunta justo después de ``summary`` en el listado"""
+    raw = json.dumps([summary["started_at"].isoformat(), summary["execution_id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(started_at, execution_id) del último elemento ya entregado"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode())
+        started_at, execution_id = json.loads(raw)
+        return datetime.fromisoformat(started_at), execution_id
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+
+
+async def store_call(
+    store: "ExecutionStore", method: str, *args: Any, **kwargs: Any
+) -> Any:
+    """Llama a un método del store sin bloquear el event loop si hace I/O"""
+    if store.blocking:
+        return await asyncio.to_thread(getattr(store, method), *args, **kwargs)
+    return getattr(store, method)(*args, **kwargs)
+
+
+class ExecutionStore(ABC):
+    """Interfaz común de los backends de ejecuciones"""
+
+    # True si las operaciones hacen I/O y deben correr fuera del event loop
+    blocking = False
+
+    @abstractmethod
+    def save_execution(self, record: Dict[str, Any]) -> None:
+        """Crea o reemplaza el registro de una ejecución"""
+
+    @abstractmethod
+    def update_execution(self, execution_id: str, **fields: Any) -> None:
+        """Actualiza campos de una ejecución existente"""
+
+    @abstractmethod
+    def add_node_result(
+        self, execution_id: str, node_id: str, data: Dict[str, Any]
+    ) -> None:
+        """Registra el resultado de un nodo (puede quedar en buffer)"""
+
+    @abstractmethod
+    def get_execution(
+        self, execution_id: str, include_results: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Obtiene una ejecución por id"""
+
+    @abstractmethod
+    def list_executions(
+        self,
+        workflow_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Lista resúmenes de ejecuciones, las más recientes primero"""
+
+    def list_page(
+        self, limit: int = 100, cursor: Optional[str] = None, **filters: Any
+    ) -> Dict[str, Any]:
+        """Página de resúmenes y el cursor de la siguiente (None al final)"""
+        items = self.list_executions(limit=limit + 1, cursor=cursor, **filters)
+        next_cursor = None
+        if len(items) > limit:
+            next_cursor = encode_cursor(items[limit - 1])
+        return {"executions": items[:limit], "next_cursor": next_cursor}
+
+    @abstractmethod
+    def count(self, source: Optional[str] = None) -> int:
+        """Número de ejecuciones almacenadas (de un origen si se indica)"""
+
+    def flush(self) -> None:
+        """Escribe los resultados de nodos pendientes"""
+
+    def close(self) -> None:
+        """Libera recursos del backend"""
+        self.flush()
+
+
+class InMemoryExecutionStore(ExecutionStore):
+    """Ring buffer en memoria con tamaño máximo y expiración por TTL"""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: Optional[float] = 86400):
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._results: Dict[str, Any] = {}
+        self._stored_at: Dict[str, float] = {}
+        self._node_results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_workflow: Dict[str, Set[str]] = defaultdict(set)
+        self._by_status: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def save_execution(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            execution_id = record["execution_id"]
+            if execution_id in self._records:
+                self._unindex(execution_id)
+            else:
+                self._stored_at[execution_id] = time.monotonic()
+            summary = {key: record.get(key) for key in SUMMARY_FIELDS}
+            summary["source"] = summary["source"] or ENGINE_SOURCE
+            self._records[execution_id] = summary
+            self._results[execution_id] = record.get("result")
+            self._index(execution_id)
+            self._evict()
+
+    def update_execution(self, execution_id: str, **fields: Any) -> None:
+        with self._lock:
+            record = self._records.get(execution_id)
+            if record is None:
+                return
+            self._unindex(execution_id)
+            if "result" in fields:
+                self._results[execution_id] = fields.pop("result")
+            record.update(fields)
+            self._index(execution_id)
+
+    def add_node_result(
+        self, execution_id: str, node_id: str, data: Dict[str, Any]
+    ) -> None:
+        with self._lock:
+            if execution_id in self._records:
+                self._node_results.setdefault(execution_id, {})[node_id] = data
+
+    def get_execution(
+        self, execution_id: str, include_results: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._evict()
+            record = self._records.get(execution_id)
+            if record is None:
+                return None
+            if not include_results:
+                return dict(record)
+            return {
+                **record,
+                "result": self._results.get(execution_id),
+                "nodes": dict(self._node_results.get(execution_id, {})),
+            }
+
+    def list_executions(
+        self,
+        workflow_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            self._evict()
+            candidates: Optional[Set[str]] = None
+            if workflow_id is not None:
+                candidates = set(self._by_workflow.get(workflow_id, ()))
+            if status is not None:
+                by_status = self._by_status.get(status, set())
+                candidates = (
+                    candidates & by_status if candidates is not None else set(by_status)
+                )
+            ids = self._records.keys() if candidates is None else candidates
+
+            def matches(record: Dict[str, Any]) -> bool:
+                if source is not None and record["source"] != source:
+                    return False
+                started_at = record["started_at"]
+                if since and started_at < since:
+                    return False
+                if until and started_at > until:
+                    return False
+                return after is None or (started_at, record["execution_id"]) < after
+
+            # Solo se ordenan los ``limit`` primeros, no todo el historial
+            page = heapq.nlargest(
+                limit,
+                (r for r in map(self._records.__getitem__, ids) if matches(r)),
+                key=lambda r: (r["started_at"], r["execution_id"]),
+            )
+            return [dict(record) for record in page]
+
+    def count(self, source: Optional[str] = None) -> int:
+        with self._lock:
+            self._evict()
+            if source is None:
+                return len(self._records)
+            return sum(1 for r in self._records.values() if r["source"] == source)
+
+    def _index(self, execution_id: str) -> None:
+        record = self._records[execution_id]
+        self._by_workflow[record["workflow_id"]].add(execution_id)
+        self._by_status[record["status"]].add(execution_id)
+
+    def _unindex(self, execution_id: str) -> None:
+        record = self._records[execution_id]
+        for index, key in (
+            (self._by_workflow, record["workflow_id"]),
+            (self._by_status, record["status"]),
+        ):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(execution_id)
+                if not ids:
+                    del index[key]
+
+    def _drop(self, execution_id: str) -> None:
+        self._unindex(execution_id)
+        del self._records[execution_id]
+        self._results.pop(execution_id, None)
+        self._stored_at.pop(execution_id, None)
+        self._node_results.pop(execution_id, None)
+
+    def _evict(self) -> None:
+        """Descarta registros expirados y los más antiguos sobre el límite"""
+        if self.ttl_seconds is not None:
+            deadline = time.monotonic() - self.ttl_seconds
+            while self._records:
+                oldest = next(iter(self._records))
+                if self._stored_at[oldest] > deadline:
+                    break
+                self._drop(oldest)
+
+        while len(self._records) > self.max_size:
+            self._drop(next(iter(self._records)))
+
+
+class SQLExecutionStore(ExecutionStore):
+    """Backend SQLAlchemy con escritura por lotes de resultados de nodos"""
+
+    blocking = True
+
+    def __init__(self, session_factory=None, batch_size: int = 50):
+        from agenthub.models.workflow_execution import (
+            WorkflowExecutionRecord,
+            WorkflowNodeResultRecord,
+        )
+
+        if session_factory is None:
+            from agenthub.database.connection import SessionLocal
+
+            session_factory = SessionLocal
+
+        self._execution_model = WorkflowExecutionRecord
+        self._node_model = WorkflowNodeResultRecord
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self._pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+        bind = getattr(session_factory, "kw", {}).get("bind")
+        if bind is not None:
+            WorkflowExecutionRecord.metadata.create_all(
+                bind=bind,
+                tables=[
+                    WorkflowExecutionRecord.__table__,
+                    WorkflowNodeResultRecord.__table__,
+                ],
+            )
+
+    def save_execution(self, record: Dict[str, Any]) -> None:
+        db = self.session_factory()
+        try:
+            summary = {key: record.get(key) for key in SUMMARY_FIELDS}
+            summary["source"] = summary["source"] or ENGINE_SOURCE
+            db.merge(
+                self._execution_model(
+                    **summary, result=self._dumps(record.get("result"))
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def update_execution(self, execution_id: str, **fields: Any) -> None:
+        if "result" in fields:
+            fields["result"] = self._dumps(fields["result"])
+        # Los resultados de nodos deben estar escritos antes del estado final
+        self.flush()
+        db = self.session_factory()
+        try:
+            db.query(self._execution_model).filter_by(execution_id=execution_id).update(
+                fields
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def add_node_result(
+        self, execution_id: str, node_id: str, data: Dict[str, Any]
+    ) -> None:
+        with self._lock:
+            self._pending.append((execution_id, node_id, data))
+            should_flush = len(self._pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        db = self.session_factory()
+        try:
+            db.add_all(
+                self._node_model(
+                    execution_id=execution_id, node_id=node_id, data=self._dumps(data)
+                )
+                for execution_id, node_id, data in pending
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Error writing %d node results: %s", len(pending), e)
+        finally:
+            db.close()
+
+    def get_execution(
+        self, execution_id: str, include_results: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            row = db.get(self._execution_model, execution_id)
+            if row is None:
+                return None
+            record = self._row_to_summary(row)
+            if include_results:
+                self.flush()
+                record["result"] = self._loads(row.result)
+                record["nodes"] = {
+                    node.node_id: self._loads(node.data)
+                    for node in db.query(self._node_model)
+                    .filter_by(execution_id=execution_id)
+                    .order_by(self._node_model.id)
+                }
+            return record
+        finally:
+            db.close()
+
+    def list_executions(
+        self,
+        workflow_id: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        from sqlalchemy import and_, or_
+
+        after = decode_cursor(cursor) if cursor else None
+        model = self._execution_model
+        db = self.session_factory()
+        try:
+            query = db.query(model)
+            if workflow_id is not None:
+                query = query.filter(model.workflow_id == workflow_id)
+            if source is not None:
+                query = query.filter(model.source == source)
+            if status is not None:
+                query = query.filter(model.status == status)
+            if since is not None:
+                query = query.filter(model.started_at >= since)
+            if until is not None:
+                query = query.filter(model.started_at <= until)
+            if after is not None:
+                query = query.filter(
+                    or_(
+                        model.started_at < after[0],
+                        and_(
+                            model.started_at == after[0],
+                            model.execution_id < after[1],
+                        ),
+                    )
+                )
+            rows = (
+                query.order_by(model.started_at.desc(), model.execution_id.desc())
+                .limit(limit)
+                .all()
+            )
+            return [self._row_to_summary(row) for row in rows]
+        finally:
+            db.close()
+
+    def count(self, source: Optional[str] = None) -> int:
+        db = self.session_factory()
+        try:
+            query = db.query(self._execution_model)
+            if source is not None:
+                query = query.filter(self._execution_model.source == source)
+            return query.count()
+        finally:
+            db.close()
+
+    def _row_to_summary(self, row) -> Dict[str, Any]:
+        return {key: getattr(row, key) for key in SUMMARY_FIELDS}
+
+    @staticmethod
+    def _dumps(value: Any) -> Optional[str]:
+        return None if value is None else json.dumps(value, default=str)
+
+    @staticmethod
+    def _loads(value: Optional[str]) -> Any:
+        return None if value is None else json.loads(value)
+
+
+def create_execution_store(
+    settings: Optional[Dict[str, Any]] = None,
+) -> ExecutionStore:
+    """Crea el backend configurado (``memory`` por defecto o ``sql``)"""
+
+    settings = settings or {}
+    backend = settings.get("backend", "memory")
+    if backend == "sql":
+        return SQLExecutionStore(batch_size=settings.get("batch_size", 50))
+    if backend != "memory":
+        raise ValueError(f"Unknown execution store backend: {backend}")
+    return InMemoryExecutionStore(
+        max_size=settings.get("max_size", 1000),
+        ttl_seconds=settings.get("ttl_seconds", 86400),
+    )
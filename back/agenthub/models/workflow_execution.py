@@ -0,0 +1,39 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+
+from ..database.connection import Base
+
+
+class WorkflowExecutionRecord(Base):
+    __tablename__ = "workflow_executions"
+
+    execution_id = Column(String, primary_key=True)
+    workflow_id = Column(String, nullable=False, index=True)
+    workflow_name = Column(String, nullable=True)
+    # "engine" (WorkflowEngine) u "orchestrator": comparten tabla
+    source = Column(
+        String, nullable=False, default="engine", server_default="engine", index=True
+    )
+    status = Column(String, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+
+    __table_args__ = (
+        Index("ix_workflow_executions_workflow_started", "workflow_id", "started_at"),
+    )
+
+
+class WorkflowNodeResultRecord(Base):
+    __tablename__ = "workflow_node_results"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    execution_id = Column(
+        String,
+        ForeignKey("workflow_executions.execution_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    node_id = Column(String, nullable=False)
+    data = Column(Text, nullable=False)  # JSON
@@ -1,13 +1,36 @@
 # agenthub/orchestrator.py
+import asyncio
+import itertools
 import logging
 import re
+import threading
 import time
 import uuid
+import weakref
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
 
 from .agents.base_agent import BaseAgent
+from .execution_store import (
+    ORCHESTRATOR_SOURCE,
+    ExecutionStore,
+    create_execution_store,
+    store_call,
+)
+from .workflow_context import WorkflowContext
 from agenthub.config import config
 
 logger = logging.getLogger(__name__)
@@ -17,6 +40,237 @@ class WorkflowExecutionError(Exception):
     """Error en ejecución de workflow"""
 
 
+class WorkflowTimeoutError(WorkflowExecutionError):
+    """El workflow superó su deadline global"""
+
+
+class TaskScheduler:
+    """Ejecuta llamadas bloqueantes a agentes en el pool de hilos compartido
+    con un máximo de ``max_concurrency`` en vuelo por event loop.
+
+    Las tareas que esperan turno lo hacen en el semáforo (no en la cola del
+    executor), así que cancelarlas no deja trabajo pendiente en los hilos. El
+    hueco de una tarea cancelada mientras corre se libera cuando su hilo
+    termina, no al cancelarla.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_concurrency: int = 4):
+        self.executor = executor
+        self.max_concurrency = max(1, max_concurrency)
+        # Un semáforo por loop: asyncio.Semaphore queda ligado al primero que lo usa
+        self._slots: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]"
+        ) = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = asyncio.Semaphore(self.max_concurrency)
+                self._slots[loop] = slots
+        return slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta ``fn(*args)`` en un hilo cuando haya un hueco libre"""
+        slots = self._get_slots()
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        loop = asyncio.get_running_loop()
+
+        def release(_: Any) -> None:
+            # Corre en el hilo del executor al terminar (o al cancelarse antes
+            # de empezar): el hilo sigue ocupado aunque el awaiter se cancele
+            with self._lock:
+                self.running -= 1
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                pass  # loop cerrado: su semáforo ya no se usa
+
+        with self._lock:
+            self.running += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.running -= 1
+            slots.release()
+            raise
+        future.add_done_callback(release)
+
+        try:
+            result = await asyncio.wrap_future(future)
+            self.completed += 1
+            return result
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+
+class WorkflowBatch:
+    """Lote de ejecuciones de un workflow creado por ``Orchestrator.submit_batch``.
+
+    Al iterarlo entrega un resultado por payload en orden de llegada
+    (``index`` indica su posición) y mantiene como mucho
+    ``max_concurrency`` ejecuciones en vuelo. Un item que falla no corta el
+    lote. Si se deja de iterar, las ejecuciones pendientes se cancelan.
+    """
+
+    def __init__(
+        self,
+        orchestrator: "Orchestrator",
+        workflow_name: str,
+        workflow: Dict[str, Any],
+        payloads: List[Optional[Dict[str, Any]]],
+        max_concurrency: int,
+    ):
+        self.orchestrator = orchestrator
+        self.workflow_name = workflow_name
+        self.workflow = workflow
+        self.payloads = payloads
+        self.max_concurrency = max(1, max_concurrency)
+        # Un UUID por lote; cada item se identifica por su posición
+        self.batch_id = str(uuid.uuid4())
+        self.completed = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._execution_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    async def _run_item(self, index: int) -> Dict[str, Any]:
+        execution_id = f"{self.batch_id}-{index}"
+        try:
+            outcome = await self.orchestrator._run_workflow(
+                self.workflow_name,
+                self.workflow,
+                self.payloads[index],
+                execution_id,
+                log_level=logging.DEBUG,
+            )
+        except WorkflowExecutionError as e:
+            return {
+                "index": index,
+                "execution_id": execution_id,
+                "status": "failed",
+                "error": str(e),
+            }
+        return {
+            "index": index,
+            "execution_id": execution_id,
+            "status": "completed",
+            "execution_time": outcome["execution_time"],
+            "result": outcome["result"],
+        }
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        if self.started_at is not None:
+            raise RuntimeError(f"Batch {self.batch_id} already started")
+        self.started_at = time.monotonic()
+        indexes = iter(range(len(self.payloads)))
+        pending = set()
+        try:
+            while True:
+                # Se rellena hasta el límite: no se crean N tareas de golpe
+                for index in itertools.islice(
+                    indexes, self.max_concurrency - len(pending)
+                ):
+                    pending.add(asyncio.ensure_future(self._run_item(index)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    item = task.result()
+                    if item["status"] == "completed":
+                        self.completed += 1
+                        self._execution_time += item["execution_time"]
+                    else:
+                        self.failed += 1
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            self.finished_at = time.monotonic()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iteración bloqueante: cada resultado se entrega según termina"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "Iterating a batch blocks; use 'async for' inside an event loop"
+            )
+
+        loop = asyncio.new_event_loop()
+        items = self.__aiter__()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(items.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(items.aclose())
+            loop.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del lote: progreso y throughput (ejecuciones por segundo)"""
+        done = self.completed + self.failed
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            "batch_id": self.batch_id,
+            "workflow": self.workflow_name,
+            "total": len(self.payloads),
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": len(self.payloads) - done,
+            "max_concurrency": self.max_concurrency,
+            "elapsed": elapsed,
+            "throughput": done / elapsed if elapsed > 0 else 0.0,
+            "avg_execution_time": (
+                self._execution_time / self.completed if self.completed else None
+            ),
+        }
+
+
 class AgentRegistry:
     """Registry de agentes disponibles"""
 
@@ -92,11 +346,14 @@ class Orchestrator:
         """Valida que la tarea tenga formato 'agent_id.action'."""
         return bool(cls.TASK_REGEX.match(task))
 
-    def __init__(self):
+    def __init__(self, execution_store: Optional[ExecutionStore] = None):
         self.agent_registry = AgentRegistry()
         self.workflow_registry = WorkflowRegistry()
-        self.execution_history: Dict[str, Dict[str, Any]] = {}
+        self.execution_history = execution_store or create_execution_store(
+            config.get("execution_store")
+        )
         self.executor = ThreadPoolExecutor(max_workers=config.get("max_workers", 4))
+        self.scheduler = TaskScheduler(self.executor, config.get("max_workers", 4))
         self.logger = logging.getLogger(f"{__name__}.Orchestrator")
 
     def register_agent(self, agent: BaseAgent):
@@ -106,9 +363,12 @@ class Orchestrator:
     def register_workflow(
         self,
         name: str,
-        tasks: List[str],
+        tasks: Optional[List[str]] = None,
         parallel: bool = False,
         timeout: Optional[int] = None,
+        stages: Optional[List[List[str]]] = None,
+        depends_on: Optional[Dict[str, List[str]]] = None,
+        inputs: Optional[Dict[str, List[str]]] = None,
     ) -> None:
         """
         Registra un workflow
@@ -118,18 +378,71 @@ class Orchestrator:
             tasks: Lista de tareas en formato "agent_id.action"
             parallel: Si las tareas se ejecutan en paralelo
             timeout: Timeout en segundos
+            stages: Etapas secuenciales; las tareas de una etapa corren en
+                paralelo y ven el contexto de las etapas anteriores
+            depends_on: Dependencias de datos entre ``tasks``
+                ({tarea: [tareas previas]}); se traducen a etapas
+            inputs: Claves del contexto que recibe cada tarea
+                ({tarea: [claves]}); sin entrada recibe todo el contexto
         """
-        for task in tasks:
+        if stages is not None:
+            stages = [
+                [group] if isinstance(group, str) else list(group) for group in stages
+            ]
+            tasks = [task for stage in stages for task in stage]
+        elif depends_on:
+            stages = self._stages_from_dependencies(tasks or [], depends_on)
+
+        for task in tasks or []:
             if not self.is_valid_task(task):
                 raise ValueError(f"Invalid task format: {task}. Use 'agent_id.action'")
 
         definition = {
-            "tasks": tasks,
+            "tasks": tasks or [],
             "parallel": parallel,
             "timeout": timeout or config.get("timeout", 30),
         }
+        if inputs:
+            unknown = [task for task in inputs if task not in definition["tasks"]]
+            if unknown:
+                raise ValueError(f"Unknown task in inputs: {', '.join(unknown)}")
+            definition["inputs"] = {task: list(keys) for task, keys in inputs.items()}
+        if stages is not None:
+            if any(not stage for stage in stages):
+                raise ValueError(f"Workflow {name} has an empty stage")
+            definition["stages"] = stages
         self.workflow_registry.register(name, definition)
 
+    @staticmethod
+    def _stages_from_dependencies(
+        tasks: List[str], depends_on: Dict[str, List[str]]
+    ) -> List[List[str]]:
+        """Agrupa las tareas por niveles (Kahn); dentro de cada etapa se
+        respeta el orden de declaración."""
+        if len(set(tasks)) != len(tasks):
+            raise ValueError("Tasks must be unique when using depends_on")
+        for task, requires in depends_on.items():
+            unknown = [t for t in [task, *requires] if t not in tasks]
+            if unknown:
+                raise ValueError(f"Unknown task in depends_on: {', '.join(unknown)}")
+
+        remaining = {task: set(depends_on.get(task, ())) for task in tasks}
+        stages: List[List[str]] = []
+        while remaining:
+            ready = [
+                task for task in tasks if task in remaining and not remaining[task]
+            ]
+            if not ready:
+                raise ValueError(
+                    f"Circular dependency between: {', '.join(sorted(remaining))}"
+                )
+            stages.append(ready)
+            for task in ready:
+                del remaining[task]
+            for requires in remaining.values():
+                requires.difference_update(ready)
+        return stages
+
     def send_message(self, agent_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
         """Envía un mensaje a un agente específico"""
         agent = self.agent_registry.get(agent_id)
@@ -145,7 +458,7 @@ class Orchestrator:
         self, workflow_name: str, initial_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Ejecuta un workflow completo
+        Ejecuta un workflow completo (versión bloqueante)
 
         Args:
             workflow_name: Nombre del workflow a ejecutar
@@ -154,43 +467,86 @@ class Orchestrator:
         Returns:
             Resultado de la ejecución del workflow
         """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.execute_workflow_async(workflow_name, initial_data))
+        # Dentro de un event loop (p.ej. un handler de FastAPI) se mantiene el
+        # contrato bloqueante: el workflow corre en su propio loop en otro
+        # hilo. Desde código async conviene 'await execute_workflow_async()'
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(
+                asyncio.run, self.execute_workflow_async(workflow_name, initial_data)
+            ).result()
+
+    async def execute_workflow_async(
+        self, workflow_name: str, initial_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta un workflow completo con un único deadline global
+
+        Las tareas pasan por el ``TaskScheduler`` compartido; al vencer el
+        ``timeout`` del workflow se cancelan las que siguen en cola y las que
+        están corriendo reciben ``cancel_event`` para abortar.
+        """
         workflow = self.workflow_registry.get(workflow_name)
         if not workflow:
             raise WorkflowExecutionError(f"Workflow {workflow_name} not found")
+        return await self._run_workflow(
+            workflow_name, workflow, initial_data, str(uuid.uuid4())
+        )
 
-        execution_id = str(uuid.uuid4())
+    async def _run_workflow(
+        self,
+        workflow_name: str,
+        workflow: Dict[str, Any],
+        initial_data: Optional[Dict[str, Any]],
+        execution_id: str,
+        log_level: int = logging.INFO,
+    ) -> Dict[str, Any]:
+        """Ejecuta un workflow ya resuelto y lo guarda en el historial"""
         start_time = time.time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + workflow.get("timeout", 30)
+        cancel_event = threading.Event()
+        context = WorkflowContext(initial_data or {})
 
-        self.logger.info(
-            f"Starting workflow {workflow_name} (execution: {execution_id})"
+        self.logger.log(
+            log_level, f"Starting workflow {workflow_name} (execution: {execution_id})"
         )
 
         try:
-            if workflow.get("parallel", False):
-                result = self._execute_parallel_workflow(
-                    workflow, initial_data or {}, execution_id
+            if "stages" in workflow:
+                result = await self._execute_staged_workflow(
+                    workflow, context, execution_id, deadline, cancel_event
+                )
+            elif workflow.get("parallel", False):
+                result = await self._execute_parallel_workflow(
+                    workflow, context, execution_id, deadline, cancel_event
                 )
             else:
-                result = self._execute_sequential_workflow(
-                    workflow, initial_data or {}, execution_id
+                result = await self._execute_sequential_workflow(
+                    workflow, context, execution_id, deadline, cancel_event
                 )
 
             execution_time = time.time() - start_time
 
             # Guardar en historial
-            self.execution_history[execution_id] = {
-                "workflow_name": workflow_name,
-                "start_time": start_time,
-                "execution_time": execution_time,
-                "status": "completed",
-                "result": result,
-            }
+            await self._record_execution(
+                execution_id,
+                workflow_name,
+                start_time,
+                execution_time,
+                "completed",
+                result=result,
+            )
 
             # Actualizar contador
             workflow["executions"] += 1
 
-            self.logger.info(
-                f"Workflow {workflow_name} completed in {execution_time:.2f}s"
+            self.logger.log(
+                log_level,
+                f"Workflow {workflow_name} completed in {execution_time:.2f}s",
             )
 
             return {
@@ -204,37 +560,109 @@ class Orchestrator:
         except Exception as e:
             execution_time = time.time() - start_time
 
-            self.execution_history[execution_id] = {
-                "workflow_name": workflow_name,
-                "start_time": start_time,
-                "execution_time": execution_time,
-                "status": "failed",
-                "error": str(e),
-            }
+            await self._record_execution(
+                execution_id,
+                workflow_name,
+                start_time,
+                execution_time,
+                "failed",
+                error=str(e),
+            )
 
-            self.logger.error(f"Workflow {workflow_name} failed: {str(e)}")
+            self.logger.log(
+                max(log_level, logging.WARNING),
+                f"Workflow {workflow_name} failed: {str(e)}",
+            )
+            if isinstance(e, WorkflowTimeoutError):
+                raise
             raise WorkflowExecutionError(f"Workflow execution failed: {str(e)}")
+        finally:
+            # Lo que siga corriendo en hilos ya no tiene a quién entregar
+            cancel_event.set()
+
+    def submit_batch(
+        self,
+        workflow_name: str,
+        payloads: Iterable[Optional[Dict[str, Any]]],
+        max_concurrency: Optional[int] = None,
+    ) -> "WorkflowBatch":
+        """
+        Prepara muchas ejecuciones del mismo workflow
+
+        El workflow se busca y valida una sola vez (fallan aquí, no en cada
+        item). Las ejecuciones empiezan al iterar el lote: ``async for`` o
+        ``for`` fuera de un event loop.
+
+        Args:
+            workflow_name: Nombre del workflow a ejecutar
+            payloads: Datos iniciales de cada ejecución
+            max_concurrency: Ejecuciones en vuelo a la vez (por defecto
+                ``batch_concurrency`` o ``max_workers`` de la config)
+        """
+        workflow = self.workflow_registry.get(workflow_name)
+        if not workflow:
+            raise WorkflowExecutionError(f"Workflow {workflow_name} not found")
+        missing = sorted(
+            {
+                self._split_task(task)[0]
+                for task in workflow["tasks"]
+                if self.agent_registry.get(self._split_task(task)[0]) is None
+            }
+        )
+        if missing:
+            raise WorkflowExecutionError(
+                f"Workflow {workflow_name} uses unknown agents: {', '.join(missing)}"
+            )
+        return WorkflowBatch(
+            self,
+            workflow_name,
+            workflow,
+            list(payloads),
+            max_concurrency
+            or config.get("batch_concurrency", config.get("max_workers", 4)),
+        )
+
+    @staticmethod
+    def _split_task(task: str) -> Tuple[str, str]:
+        try:
+            agent_id, action = task.split(".", 1)
+        except ValueError:
+            raise WorkflowExecutionError(f"Invalid task format: {task}")
+        return agent_id, action
 
-    def _execute_sequential_workflow(
-        self, workflow: Dict[str, Any], context: Dict[str, Any], execution_id: str
+    async def _execute_sequential_workflow(
+        self,
+        workflow: Dict[str, Any],
+        context: WorkflowContext,
+        execution_id: str,
+        deadline: float,
+        cancel_event: threading.Event,
     ) -> Dict[str, Any]:
         """Ejecuta workflow secuencial"""
         results = {}
+        loop = asyncio.get_running_loop()
 
         for i, task in enumerate(workflow["tasks"], 1):
-            try:
-                agent_id, action = task.split(".", 1)
-            except ValueError:
-                raise WorkflowExecutionError(f"Invalid task format: {task}")
+            agent_id, action = self._split_task(task)
 
             message = {
                 "action": action,
-                "data": context,
+                "data": self._task_input(workflow, task, context),
                 "workflow_execution_id": execution_id,
                 "step": i,
+                "cancel_event": cancel_event,
             }
 
-            step_result = self.send_message(agent_id, message)
+            try:
+                step_result = await asyncio.wait_for(
+                    self.scheduler.run(self.send_message, agent_id, message),
+                    deadline - loop.time(),
+                )
+            except asyncio.TimeoutError:
+                raise WorkflowTimeoutError(
+                    f"Workflow timed out after {workflow.get('timeout', 30)}s "
+                    f"at step {i} ({task})"
+                ) from None
 
             results[f"step_{i}"] = {
                 "task": task,
@@ -243,79 +671,245 @@ class Orchestrator:
                 "result": step_result,
             }
 
-            # Actualizar contexto con el resultado
-            if isinstance(step_result, dict) and "data" in step_result:
-                context.update(step_result["data"])
+            # El resultado se apila como capa nueva, sin copiar el contexto
+            self._push_result(context, step_result)
 
-        return {"steps": results, "final_context": context}
+        return {"steps": results, "final_context": context.to_dict()}
 
-    def _execute_parallel_workflow(
-        self, workflow: Dict[str, Any], context: Dict[str, Any], execution_id: str
+    async def _execute_parallel_workflow(
+        self,
+        workflow: Dict[str, Any],
+        context: WorkflowContext,
+        execution_id: str,
+        deadline: float,
+        cancel_event: threading.Event,
     ) -> Dict[str, Any]:
-        """Ejecuta workflow en paralelo"""
-        tasks = []
+        """Ejecuta workflow en paralelo recogiendo resultados según terminan"""
+        pending: Dict[asyncio.Task, Tuple[str, str, str]] = {}
 
         for i, task in enumerate(workflow["tasks"], 1):
-            try:
-                agent_id, action = task.split(".", 1)
-            except ValueError:
-                raise WorkflowExecutionError(f"Invalid task format: {task}")
+            agent_id, action = self._split_task(task)
 
             message = {
                 "action": action,
-                "data": context.copy(),
+                "data": self._task_input(workflow, task, context),
                 "workflow_execution_id": execution_id,
                 "step": i,
+                "cancel_event": cancel_event,
             }
 
-            future = self.executor.submit(self.send_message, agent_id, message)
-            tasks.append((task, agent_id, action, future))
+            future = asyncio.ensure_future(
+                self.scheduler.run(self.send_message, agent_id, message)
+            )
+            pending[future] = (task, agent_id, action)
 
         results = {}
-        timeout = workflow.get("timeout", 30)
+        loop = asyncio.get_running_loop()
+        remaining = set(pending)
+        try:
+            while remaining:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                done, remaining = await asyncio.wait(
+                    remaining, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    task, agent_id, action = pending[future]
+                    entry = {"agent_id": agent_id, "action": action}
+                    if future.exception() is not None:
+                        entry["error"] = str(future.exception())
+                    else:
+                        entry["result"] = future.result()
+                    results[task] = entry
+        finally:
+            # Deadline vencido (o ejecución cancelada): nada queda corriendo
+            for future in remaining:
+                future.cancel()
+            if remaining:
+                cancel_event.set()
+                await asyncio.gather(*remaining, return_exceptions=True)
+
+        for future in remaining:
+            task, agent_id, action = pending[future]
+            results[task] = {
+                "agent_id": agent_id,
+                "action": action,
+                "error": f"Timed out after {workflow.get('timeout', 30)}s",
+            }
 
-        for task, agent_id, action, future in tasks:
-            try:
-                step_result = future.result(timeout=timeout)
-                results[task] = {
-                    "agent_id": agent_id,
+        # Mismo orden que la definición, sin importar cuál terminó antes
+        ordered = {task: results[task] for task in workflow["tasks"] if task in results}
+        return {"parallel_results": ordered, "context": context.to_dict()}
+
+    async def _execute_staged_workflow(
+        self,
+        workflow: Dict[str, Any],
+        context: WorkflowContext,
+        execution_id: str,
+        deadline: float,
+        cancel_event: threading.Event,
+    ) -> Dict[str, Any]:
+        """Ejecuta las etapas en orden y las tareas de cada etapa en paralelo.
+
+        Todas las tareas de una etapa ven el mismo contexto; al cerrar la
+        etapa sus resultados se mezclan en orden de declaración, así el
+        contexto final no depende de qué tarea terminó antes.
+        """
+        loop = asyncio.get_running_loop()
+        stage_results = []
+        step = 0
+
+        for index, stage in enumerate(workflow["stages"], 1):
+            futures: Dict[asyncio.Future, Tuple[str, str, str]] = {}
+            for task in stage:
+                agent_id, action = self._split_task(task)
+                step += 1
+                message = {
                     "action": action,
-                    "result": step_result,
+                    "data": self._task_input(workflow, task, context),
+                    "workflow_execution_id": execution_id,
+                    "step": step,
+                    "stage": index,
+                    "cancel_event": cancel_event,
                 }
-            except Exception as e:
+                future = asyncio.ensure_future(
+                    self.scheduler.run(self.send_message, agent_id, message)
+                )
+                futures[future] = (task, agent_id, action)
+
+            done, pending = await asyncio.wait(
+                futures,
+                timeout=max(0, deadline - loop.time()),
+                return_when=asyncio.FIRST_EXCEPTION,
+            )
+            failed = next((f for f in done if f.exception() is not None), None)
+            if pending:
+                for future in pending:
+                    future.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            if failed is not None:
+                raise failed.exception()
+            if pending:
+                raise WorkflowTimeoutError(
+                    f"Workflow timed out after {workflow.get('timeout', 30)}s "
+                    f"in stage {index}"
+                )
+
+            results = {}
+            for future, (task, agent_id, action) in futures.items():
+                step_result = future.result()
                 results[task] = {
                     "agent_id": agent_id,
                     "action": action,
-                    "error": str(e),
+                    "result": step_result,
                 }
-
-        return {"parallel_results": results, "context": context}
+                self._push_result(context, step_result)
+            stage_results.append(results)
+
+        return {"stages": stage_results, "final_context": context.to_dict()}
+
+    @staticmethod
+    def _task_input(
+        workflow: Dict[str, Any], task: str, context: WorkflowContext
+    ) -> MutableMapping[str, Any]:
+        """Vista copy-on-write del contexto (o solo las claves declaradas)"""
+        return context.view(workflow.get("inputs", {}).get(task))
+
+    @staticmethod
+    def _push_result(context: WorkflowContext, step_result: Any) -> None:
+        if isinstance(step_result, dict) and isinstance(
+            step_result.get("data"), Mapping
+        ):
+            context.push(step_result["data"])
+
+    async def _record_execution(
+        self,
+        execution_id: str,
+        workflow_name: str,
+        start_time: float,
+        execution_time: float,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Guarda una ejecución terminada en el historial"""
+        await store_call(
+            self.execution_history,
+            "save_execution",
+            {
+                "execution_id": execution_id,
+                "workflow_id": workflow_name,
+                "workflow_name": workflow_name,
+                "source": ORCHESTRATOR_SOURCE,
+                "status": status,
+                "started_at": datetime.fromtimestamp(start_time),
+                "finished_at": datetime.now(),
+                "duration": execution_time,
+                "error": error,
+                "result": result,
+            },
+        )
 
     def get_execution_history(self, execution_id: str) -> Optional[Dict[str, Any]]:
         """Obtiene historial de ejecución"""
-        return self.execution_history.get(execution_id)
+        return self.execution_history.get_execution(execution_id)
 
-    def list_executions(self) -> List[Dict[str, Any]]:
-        """Lista todas las ejecuciones"""
-        return [
-            {"execution_id": eid, **details}
-            for eid, details in self.execution_history.items()
-        ]
+    def get_execution_result(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Resultado completo de una ejecución (se guarda aparte del resumen)"""
+        record = self.execution_history.get_execution(
+            execution_id, include_results=True
+        )
+        return record.get("result") if record else None
+
+    def list_executions(
+        self,
+        workflow_name: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Lista las ejecuciones más recientes (sin resultados)"""
+        return self.execution_history.list_executions(
+            workflow_id=workflow_name,
+            status=status,
+            limit=limit,
+            cursor=cursor,
+            source=ORCHESTRATOR_SOURCE,
+        )
+
+    def list_executions_page(
+        self,
+        workflow_name: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Página de resúmenes con ``next_cursor`` para pedir la siguiente"""
+        return self.execution_history.list_page(
+            workflow_id=workflow_name,
+            status=status,
+            limit=limit,
+            cursor=cursor,
+            source=ORCHESTRATOR_SOURCE,
+        )
 
     def get_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas del orquestador"""
         return {
             "agents": len(self.agent_registry.agents),
             "workflows": len(self.workflow_registry.workflows),
-            "total_executions": len(self.execution_history),
+            "total_executions": self.execution_history.count(ORCHESTRATOR_SOURCE),
             "active_threads": self.executor._threads
             and len(self.executor._threads)
             or 0,
+            "scheduler": self.scheduler.get_stats(),
         }
 
     def shutdown(self) -> None:
         """Detiene el ejecutor de hilos"""
         self.executor.shutdown(wait=False)
+        self.execution_history.close()
 
 
 # Instancia global
@@ -0,0 +1,57 @@
+# agenthub/workflow_context.py
+from collections import ChainMap
+from typing import Any, Dict, Iterable, Iterator, Mapping, MutableMapping, Optional
+
+
+class WorkflowContext:
+    """
+    Contexto de un workflow del orquestador por capas (copy-on-write).
+
+    La base son los datos iniciales y cada paso apila su resultado como una
+    capa nueva sin copiar nada. Cada tarea recibe una vista con una capa
+    propia vacía donde caen sus escrituras, o solo las claves que declara.
+    """
+
+    # Con más capas las búsquedas se alargan: se aplanan en un solo dict
+    MAX_LAYERS = 32
+
+    def __init__(self, initial: Optional[Mapping[str, Any]] = None):
+        self._chain: ChainMap = ChainMap(initial if initial is not None else {})
+
+    def push(self, data: Mapping[str, Any]) -> None:
+        """Apila el resultado de un paso (sus claves tapan a las anteriores)"""
+        if not data:
+            return
+        # new_child crea una cadena nueva: las vistas ya entregadas no cambian
+        self._chain = self._chain.new_child(data)
+        if len(self._chain.maps) > self.MAX_LAYERS:
+            self._chain = ChainMap(dict(self._chain))
+
+    def view(self, keys: Optional[Iterable[str]] = None) -> MutableMapping[str, Any]:
+        """Datos para una tarea: todo el contexto o solo ``keys``"""
+        if keys is None:
+            return self._chain.new_child()
+        return {key: self._chain[key] for key in keys if key in self._chain}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Contexto final aplanado (copia superficial, una sola vez)"""
+        return dict(self._chain)
+
+    @property
+    def depth(self) -> int:
+        return len(self._chain.maps)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._chain[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._chain
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._chain)
+
+    def __len__(self) -> int:
+        return len(self._chain)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._chain.get(key, default)
@@ -5,26 +5,28 @@ from ..orchestrator import orchestrator
 def register_default_workflows():
     """Registra workflows predefinidos"""
 
-    # Workflow básico de desarrollo de API
+    # Workflow básico de desarrollo de API: la validación y los tests solo
+    # necesitan la API generada, así que corren en paralelo
     orchestrator.register_workflow(
         name="api_development",
-        tasks=[
-            "backend_agent.analyze_requirements",
-            "backend_agent.suggest_architecture",
-            "backend_agent.generate_api",
-            "qa_agent.validate_api_spec",
-            "qa_agent.generate_tests",
+        stages=[
+            ["backend_agent.analyze_requirements"],
+            ["backend_agent.suggest_architecture"],
+            ["backend_agent.generate_api"],
+            ["qa_agent.validate_api_spec", "qa_agent.generate_tests"],
         ],
     )
 
-    # Workflow de testing completo
+    # Workflow de testing completo (pruebas independientes entre sí)
     orchestrator.register_workflow(
         name="full_testing_suite",
-        tasks=[
-            "qa_agent.test_api",
-            "qa_agent.analyze_code_quality",
-            "qa_agent.performance_test",
-            "qa_agent.security_scan",
+        stages=[
+            [
+                "qa_agent.test_api",
+                "qa_agent.analyze_code_quality",
+                "qa_agent.performance_test",
+                "qa_agent.security_scan",
+            ]
         ],
     )
 
@@ -37,12 +39,17 @@ def register_default_workflows():
             "qa_agent.generate_tests",
             "qa_agent.test_api",
         ],
+        depends_on={
+            "backend_agent.generate_crud": ["backend_agent.generate_model"],
+            "qa_agent.generate_tests": ["backend_agent.generate_crud"],
+            "qa_agent.test_api": ["backend_agent.generate_crud"],
+        },
     )
 
     # Workflow de análisis de código
     orchestrator.register_workflow(
         name="code_analysis",
-        tasks=["qa_agent.analyze_code_quality", "qa_agent.security_scan"],
+        stages=[["qa_agent.analyze_code_quality", "qa_agent.security_scan"]],
     )
 
     # Workflow paralelo de testing
@@ -22,9 +22,16 @@ except Exception:
     uvicorn = None
 
 # 3. TERCERO: FastAPI imports
-from fastapi import Depends, FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
@@ -36,6 +43,7 @@ from agenthub.agents.data_analyst_agent import DataAnalystAgent
 from agenthub.agents.ui_generator_agent import UIGeneratorAgent
 
 from agenthub.config import config
+from agenthub.execution_store import create_execution_store
 from agenthub.orchestrator import orchestrator
 
 # 5. QUINTO: Database y Auth
@@ -53,6 +61,17 @@ from workflow_engine.core.WorkflowEngine import (
     ConnectionType,
     NodeStatus
 )
+from workflow_engine.core.cache import NodeResultCache
+from workflow_engine.core.connections import ConnectionManager
+from workflow_engine.core.event_backends import (
+    InMemoryEventBackend,
+    create_event_backend,
+)
+from workflow_engine.core.events import execution_topic, workflow_topic
+from workflow_engine.core.encoding import dumps
+from workflow_engine.core.executors import AgentPoolManager
+from workflow_engine.core.policies import NodePolicies
+from workflow_engine.core.sse import SSEConnection
 
 # Seguridad para Workflows
 from security.workflow_security import WorkflowSecurityManager
@@ -75,7 +94,7 @@ workflow_runtime = {
     "workflow_engine": None,
     "workflows": {},
     "active_executions": {},
-    "websocket_connections": [],
+    "connections": None,
     "security_manager": None,
 }
 
@@ -137,13 +156,16 @@ async def startup_event():
 
 async def shutdown_event():
     """Cleanup on shutdown"""
-    # Close all websocket connections
-    for ws in workflow_runtime["websocket_connections"]:
-        try:
-            await ws.close()
-        except:
-            pass
-    
+    # Close all websocket and SSE connections
+    if workflow_runtime["connections"] is not None:
+        await workflow_runtime["connections"].close()
+
+    if workflow_runtime["workflow_engine"]:
+        await workflow_runtime["workflow_engine"].shutdown()
+
+    if workflow_runtime["event_bus"]:
+        await workflow_runtime["event_bus"].close()
+
     if hasattr(orchestrator, 'shutdown'):
         orchestrator.shutdown()
     logger.info("✅ Shutdown complete")
@@ -165,10 +187,55 @@ async def initialize_workflow_engine():
     try:
         # Create workflow engine components
         workflow_runtime["agent_registry"] = AgentRegistry()
-        workflow_runtime["event_bus"] = EventBus()
+        events_cfg = config.get("events", {})
+        workflow_runtime["event_bus"] = EventBus(
+            queue_size=events_cfg.get("queue_size", 256),
+            overflow_policy=events_cfg.get("overflow_policy", "drop_oldest"),
+            max_frame_size=events_cfg.get("max_frame_size", 64 * 1024),
+            batch_window=(events_cfg.get("batch_window_ms") or 0) / 1000 or None,
+            listener_timeout=events_cfg.get("listener_timeout", 5.0),
+            replay_size=events_cfg.get("replay_size", 1000),
+            replay_executions=events_cfg.get("replay_executions", 500),
+            replay_log_bytes=events_cfg.get("replay_log_bytes", 1024 * 1024),
+            replay_total_bytes=events_cfg.get(
+                "replay_total_bytes", 64 * 1024 * 1024
+            ),
+            backend=create_event_backend(
+                {
+                    "use_redis": config.get("use_redis"),
+                    "redis_url": config.get("redis_url"),
+                }
+            ),
+        )
+        try:
+            await workflow_runtime["event_bus"].start()
+        except Exception as e:
+            # Sin Redis se sigue funcionando, pero solo dentro de este worker
+            logger.error(
+                f"❌ Event backend unavailable, using in-memory delivery: {e}"
+            )
+            workflow_runtime["event_bus"].set_backend(InMemoryEventBackend())
+        websocket_cfg = config.get("websocket", {})
+        workflow_runtime["connections"] = ConnectionManager(
+            workflow_runtime["event_bus"],
+            ping_interval=websocket_cfg.get("ping_interval", 20),
+            pong_timeout=websocket_cfg.get("pong_timeout", 10),
+        )
+        workflow_runtime["connections"].start()
         workflow_runtime["workflow_engine"] = WorkflowEngine(
             workflow_runtime["agent_registry"], 
-            workflow_runtime["event_bus"]
+            workflow_runtime["event_bus"],
+            max_concurrency=config.get("workflows", {}).get("max_parallel_tasks"),
+            max_background_executions=config.get("workflows", {}).get(
+                "max_background_executions"
+            ),
+            execution_store=create_execution_store(config.get("execution_store")),
+            result_cache=create_result_cache(
+                config.get("workflows", {}).get("result_cache")
+            ),
+            node_policies=NodePolicies.from_settings(config.get("agents")),
+            workflow_timeout=config.get("workflows", {}).get("default_timeout"),
+            agent_pools=AgentPoolManager(config.get("agents", {}).get("pools")),
         )
         
         logger.info("✅ Workflow engine initialized")
@@ -177,6 +244,20 @@ async def initialize_workflow_engine():
         logger.error(f"❌ Failed to initialize workflow engine: {e}")
         raise
 
+
+def create_result_cache(
+    settings: Optional[Dict[str, Any]]
+) -> Optional[NodeResultCache]:
+    """Create the node result cache from config (None when disabled)"""
+    settings = settings or {}
+    if not settings.get("enabled", True):
+        return None
+    return NodeResultCache(
+        max_entries=settings.get("max_entries", 1000),
+        max_bytes=settings.get("max_bytes", 64 * 1024 * 1024),
+        ttl_seconds=settings.get("ttl_seconds", 3600),
+    )
+
 async def load_agents_from_registry():
     """Load agents and register them in both systems"""
     registry_file = config.get("registry_file", "registry.json")
@@ -218,6 +299,13 @@ async def load_agents_from_registry():
             # Register in orchestrator (traditional system)
             orchestrator.register_agent(agent)
             
+            # Agentes CPU-bound opt-in: "executor": "process" en registry.json
+            engine = workflow_runtime["workflow_engine"]
+            if entry.get("executor") == "process" and engine:
+                engine.agent_pools.use_process_pool(
+                    agent_class, **entry.get("pool", {})
+                )
+
             # Register in workflow engine (new system)
             if workflow_runtime["agent_registry"]:
                 definition = agent.get_capabilities()
@@ -382,6 +470,8 @@ class CreateWorkflowRequest(BaseModel):
 
 class ExecuteWorkflowRequest(BaseModel):
     initial_data: Dict[str, Any] = Field(default_factory=dict)
+    # Si es True la petición espera a que termine la ejecución
+    wait: bool = False
 
 # ============================================
 # WORKFLOW ENDPOINTS
@@ -467,6 +557,8 @@ async def create_workflow(request: CreateWorkflowRequest, current_user: dict = D
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid workflow: {e}")
     except Exception as e:
         logger.error(f"Error creating workflow: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -486,9 +578,9 @@ async def get_workflow(workflow_id: str, current_user: dict = Depends(auth_route
                 "id": node.id,
                 "agent_type": node.agent_type,
                 "config": node.config,
-                "status": node.status.value if hasattr(node, 'status') else 'pending',
+                # El estado de ejecución vive en cada ejecución (/api/v1/executions)
+                "status": NodeStatus.PENDING.value,
                 "inputs": getattr(node, 'inputs', []),
-                "result": getattr(node, 'result', None)
             })
         
         connections = []
@@ -506,6 +598,7 @@ async def get_workflow(workflow_id: str, current_user: dict = Depends(auth_route
                 "description": getattr(workflow, 'description', ''),
                 "nodes": nodes,
                 "connections": connections,
+                "execution_plan": workflow.get_execution_plan().to_dict(),
                 "status": getattr(workflow, 'status', 'pending'),
                 "created_at": getattr(workflow, 'created_at', datetime.now()).isoformat()
             }
@@ -557,10 +650,20 @@ async def execute_workflow(workflow_id: str, request: ExecuteWorkflowRequest, cu
             if not validation.get("is_valid", False):
                 raise HTTPException(status_code=400, detail="Workflow failed security validation")
 
-        # Execute workflow
-        execution_id = await workflow_runtime["workflow_engine"].execute_workflow(
-            workflow, request.initial_data
-        )
+        engine = workflow_runtime["workflow_engine"]
+
+        if request.wait:
+            execution_id = await engine.execute_workflow(workflow, request.initial_data)
+            logger.info(f"✅ Workflow execution finished: {execution_id}")
+            return {
+                "execution_id": execution_id,
+                "workflow_id": workflow_id,
+                "status": "completed",
+                "message": "Workflow execution completed successfully"
+            }
+
+        # Execute workflow in background
+        execution_id = engine.submit_workflow(workflow, request.initial_data)
         
         logger.info(f"✅ Workflow execution started: {execution_id}")
         
@@ -568,7 +671,8 @@ async def execute_workflow(workflow_id: str, request: ExecuteWorkflowRequest, cu
             "execution_id": execution_id,
             "workflow_id": workflow_id,
             "status": "started",
-            "message": "Workflow execution started successfully"
+            "message": "Workflow execution started successfully",
+            "status_url": f"/api/v1/executions/{execution_id}",
         }
         
     except HTTPException:
@@ -577,6 +681,160 @@ async def execute_workflow(workflow_id: str, request: ExecuteWorkflowRequest, cu
         logger.error(f"Error executing workflow: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def _get_engine() -> WorkflowEngine:
+    """Obtiene el motor de workflows o responde 500"""
+    engine = workflow_runtime["workflow_engine"]
+    if not engine:
+        raise HTTPException(status_code=500, detail="Workflow engine not initialized")
+    return engine
+
+
+async def _get_execution(
+    execution_id: str, include_results: bool = False
+) -> Dict[str, Any]:
+    """Obtiene una ejecución o responde 404"""
+    execution = await _get_engine().get_execution(
+        execution_id, include_results=include_results
+    )
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
+
+@app.get("/api/v1/executions")
+async def list_executions(
+    workflow_id: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(auth_router.get_current_user),
+):
+    """List recent workflow executions filtered by workflow, status and time range.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to fetch the next page.
+    """
+    try:
+        page = await _get_engine().list_executions_page(
+            workflow_id=workflow_id,
+            status=status,
+            since=since,
+            until=until,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**page, "total": len(page["executions"])}
+
+
+@app.get("/api/v1/executions/{execution_id}")
+async def get_execution_status(
+    execution_id: str, current_user: dict = Depends(auth_router.get_current_user)
+):
+    """Get status and per-node progress of a workflow execution"""
+    return await _get_execution(execution_id)
+
+
+@app.get("/api/v1/executions/{execution_id}/result")
+async def get_execution_result(
+    execution_id: str, current_user: dict = Depends(auth_router.get_current_user)
+):
+    """Get the final result of a finished workflow execution"""
+    execution = await _get_execution(execution_id, include_results=True)
+    if execution["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="Execution still in progress")
+    return execution
+
+
+@app.get("/api/v1/executions/{execution_id}/nodes/{node_id}")
+async def get_execution_node_result(
+    execution_id: str,
+    node_id: str,
+    current_user: dict = Depends(auth_router.get_current_user),
+):
+    """Get the stored result of a single node of an execution"""
+    node = await _get_engine().get_node_result(execution_id, node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Node result not found")
+    return {"execution_id": execution_id, "node_id": node_id, **node}
+
+
+@app.post("/api/v1/executions/{execution_id}/cancel")
+async def cancel_execution(
+    execution_id: str, current_user: dict = Depends(auth_router.get_current_user)
+):
+    """Cancel a running workflow execution"""
+    await _get_execution(execution_id)
+    if not _get_engine().cancel_execution(execution_id):
+        raise HTTPException(status_code=409, detail="Execution already finished")
+
+    logger.info(f"🛑 Workflow execution cancelled: {execution_id}")
+    return {
+        "execution_id": execution_id,
+        "status": "cancelling",
+        "message": "Workflow execution cancellation requested"
+    }
+
+
+@app.get("/api/v1/executions/{execution_id}/events")
+async def stream_execution_events(
+    execution_id: str,
+    request: Request,
+    since: Optional[int] = None,
+    current_user: dict = Depends(auth_router.get_current_user),
+):
+    """Stream the events of an execution as Server-Sent Events.
+
+    Replays the buffered events after ``since`` (or the ``Last-Event-ID``
+    header) and then streams live until the execution finishes.
+    """
+    execution = await _get_execution(execution_id)
+    event_bus = workflow_runtime.get("event_bus")
+    if event_bus is None:
+        raise HTTPException(status_code=500, detail="Event bus not initialized")
+
+    if since is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        since = int(last_event_id) if last_event_id.isdigit() else 0
+
+    events_config = config.get("events", {})
+    connection = SSEConnection(events_config.get("sse_buffer_size", 16))
+    connections = workflow_runtime["connections"]
+    if connections is not None:
+        # Sin ping: el keep-alive del stream mantiene viva la conexión
+        connections.register(
+            connection, kind="sse", heartbeat=False, execution_id=execution_id
+        )
+    # Suscripción y replay sin awaits intermedios, igual que en el WebSocket
+    subscriber = event_bus.add_websocket(
+        connection, [execution_topic(execution_id)], batch_window=0
+    )
+    event_bus.replay(connection, execution_id, since)
+    if execution["status"] not in ("queued", "running"):
+        # Ya terminó: tras el replay se cierra con el estado final
+        frame = dumps({"type": "execution_finished", "data": execution})
+        subscriber.enqueue_replay([("execution_finished", None, frame)])
+
+    async def event_stream():
+        try:
+            keepalive = events_config.get("sse_keepalive", 15)
+            async for message in connection.stream(keepalive):
+                yield message
+        finally:
+            if connections is not None:
+                connections.unregister(connection)
+            else:
+                event_bus.remove_websocket(connection)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/api/v1/agents/available")
 async def get_available_agents(current_user: dict = Depends(auth_router.get_current_user)):
     """Get all available agents for workflow creation"""
@@ -696,15 +954,32 @@ async def create_from_template(template_id: str, customizations: dict = None, cu
 # ============================================
 
 @app.websocket("/api/v1/workflows/{workflow_id}/ws")
-async def workflow_websocket(websocket: WebSocket, workflow_id: str):
-    """WebSocket para updates en tiempo real de workflows"""
+async def workflow_websocket(
+    websocket: WebSocket,
+    workflow_id: str,
+    execution_id: Optional[str] = None,
+    batch_ms: Optional[int] = None,
+    since: Optional[int] = None,
+):
+    """WebSocket para updates en tiempo real de workflows.
+
+    Recibe solo los eventos del workflow, o de una ejecución concreta si se
+    indica ``?execution_id=``. Con ``?batch_ms=50`` los eventos llegan
+    agrupados en frames ``batch`` cada 50 ms. Con ``execution_id`` y
+    ``?since=<seq>`` se reenvían primero los eventos posteriores a ``seq``.
+
+    El servidor envía ``{"type": "ping", "id": n}`` tras un periodo sin
+    actividad; el cliente debe contestar ``{"type": "pong", "id": n}`` (o
+    cualquier otro mensaje) antes de ``pong_timeout`` o se cierra el socket.
+    """
     await websocket.accept()
-    workflow_runtime["websocket_connections"].append(websocket)
-
-    if workflow_runtime.get("event_bus") is not None:
+    connections = workflow_runtime["connections"]
+    if connections is not None:
+        connections.register(
+            websocket, workflow_id=workflow_id, execution_id=execution_id
+        )
+    event_bus = workflow_runtime.get("event_bus")
 
-        workflow_runtime["event_bus"].websocket_connections.append(websocket)
-    
     try:
         logger.info(f"WebSocket connected for workflow: {workflow_id}")
         
@@ -714,28 +989,53 @@ async def workflow_websocket(websocket: WebSocket, workflow_id: str):
             "workflow_id": workflow_id,
             "timestamp": datetime.now().isoformat()
         })
+
+        # Suscripción y replay sin awaits intermedios: no se pierde ni se
+        # duplica ningún evento entre el buffer y el stream en vivo
+        if event_bus is not None:
+            topic = (
+                execution_topic(execution_id)
+                if execution_id
+                else workflow_topic(workflow_id)
+            )
+            event_bus.add_websocket(
+                websocket,
+                [topic],
+                batch_window=batch_ms / 1000 if batch_ms is not None else None,
+            )
+            if execution_id and since is not None:
+                event_bus.replay(websocket, execution_id, since)
         
         # Keep connection alive
         while True:
             data = await websocket.receive_text()
-            # Echo back for heartbeat
-            await websocket.send_json({
+            if connections is not None:
+                connections.touch(websocket)
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            if isinstance(message, dict) and message.get("type") == "pong":
+                if connections is not None:
+                    connections.pong(websocket, message.get("id"))
+                continue
+            # Echo back for heartbeat (por el writer del EventBus si lo hay)
+            frame = json.dumps({
                 "type": "heartbeat",
                 "timestamp": datetime.now().isoformat()
             })
+            if event_bus is None or event_bus.send_control(websocket, frame) is None:
+                await websocket.send_text(frame)
             
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for workflow: {workflow_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        if websocket in workflow_runtime["websocket_connections"]:
-            workflow_runtime["websocket_connections"].remove(websocket)
-
-        if workflow_runtime.get("event_bus") is not None and \
-                websocket in workflow_runtime["event_bus"].websocket_connections:
-
-            workflow_runtime["event_bus"].websocket_connections.remove(websocket)
+        if connections is not None:
+            connections.unregister(websocket)
+        elif event_bus is not None:
+            event_bus.remove_websocket(websocket)
 
 # ============================================
 # ENDPOINTS ORIGINALES (mantenidos)
@@ -786,7 +1086,28 @@ async def health_check():
         "total_agents": len(workflow_runtime["agent_registry"].agents) if workflow_runtime["agent_registry"] else 0,
         "total_workflows": len(workflow_runtime["workflows"]),
         "active_executions": len(workflow_runtime.get("active_executions", {})),
-        "websocket_connections": len(workflow_runtime["websocket_connections"])
+        "result_cache": (
+            workflow_runtime["workflow_engine"].result_cache.get_stats()
+            if workflow_runtime["workflow_engine"]
+            and workflow_runtime["workflow_engine"].result_cache
+            else None
+        ),
+        "agent_pools": (
+            workflow_runtime["workflow_engine"].agent_pools.get_stats()
+            if workflow_runtime["workflow_engine"]
+            else {}
+        ),
+        "event_bus": (
+            workflow_runtime["event_bus"].get_stats()
+            if workflow_runtime["event_bus"]
+            else None
+        ),
+        "websocket_connections": len(workflow_runtime["connections"] or ()),
+        "connections": (
+            workflow_runtime["connections"].get_stats()
+            if workflow_runtime["connections"] is not None
+            else None
+        ),
     }
 
 # ============================================
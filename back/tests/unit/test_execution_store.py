@@ -0,0 +1,148 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+from agenthub.execution_store import InMemoryExecutionStore, SQLExecutionStore
+
+
+def make_record(execution_id, workflow_id="wf", status="completed", started_at=None):
+    return {
+        "execution_id": execution_id,
+        "workflow_id": workflow_id,
+        "workflow_name": workflow_id,
+        "status": status,
+        "started_at": started_at or datetime.now(),
+    }
+
+
+@pytest.fixture
+def sql_store():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    return SQLExecutionStore(sessionmaker(bind=engine), batch_size=2)
+
+
+class TestInMemoryExecutionStore:
+    def test_ring_buffer_evicts_oldest(self):
+        store = InMemoryExecutionStore(max_size=2)
+        for i in range(3):
+            store.save_execution(make_record(f"e{i}"))
+
+        assert store.count() == 2
+        assert store.get_execution("e0") is None
+        assert store.get_execution("e2") is not None
+
+    def test_ttl_expires_records(self):
+        store = InMemoryExecutionStore(ttl_seconds=0.01)
+        store.save_execution(make_record("e1"))
+        time.sleep(0.02)
+
+        assert store.get_execution("e1") is None
+        assert store.list_executions() == []
+
+    def test_indexed_lookups(self):
+        store = InMemoryExecutionStore()
+        now = datetime.now()
+        store.save_execution(make_record("e1", "a", "completed", now - timedelta(hours=2)))
+        store.save_execution(make_record("e2", "a", "running", now))
+        store.save_execution(make_record("e3", "b", "completed", now))
+
+        assert [r["execution_id"] for r in store.list_executions(workflow_id="a")] == ["e2", "e1"]
+        assert {r["execution_id"] for r in store.list_executions(status="completed")} == {"e1", "e3"}
+        recent = store.list_executions(since=now - timedelta(minutes=1))
+        assert {r["execution_id"] for r in recent} == {"e2", "e3"}
+
+        store.update_execution("e2", status="completed")
+        assert store.list_executions(status="running") == []
+
+    def test_node_results_only_with_include_results(self):
+        store = InMemoryExecutionStore()
+        store.save_execution(make_record("e1"))
+        store.add_node_result("e1", "n1", {"status": "completed", "result": {"x": 1}})
+
+        assert "nodes" not in store.get_execution("e1", include_results=False)
+        assert store.get_execution("e1")["nodes"]["n1"]["result"] == {"x": 1}
+
+    def test_final_result_is_kept_out_of_listings(self):
+        store = InMemoryExecutionStore()
+        store.save_execution({**make_record("e1"), "result": {"big": "x" * 100}})
+        store.update_execution("e1", result={"big": "y"})
+
+        assert "result" not in store.list_executions()[0]
+        assert "result" not in store.get_execution("e1", include_results=False)
+        assert store.get_execution("e1")["result"] == {"big": "y"}
+
+    def test_cursor_pagination_walks_every_record_once(self):
+        store = InMemoryExecutionStore()
+        now = datetime.now()
+        # Dos ejecuciones con el mismo started_at: desempata execution_id
+        for i in range(5):
+            store.save_execution(make_record(f"e{i}", started_at=now - timedelta(seconds=i // 2)))
+
+        seen, cursor = [], None
+        while True:
+            page = store.list_page(limit=2, cursor=cursor)
+            seen += [r["execution_id"] for r in page["executions"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == ["e1", "e0", "e3", "e2", "e4"]
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            InMemoryExecutionStore().list_executions(cursor="not-a-cursor")
+
+
+class TestSQLExecutionStore:
+    def test_round_trip_and_batched_node_results(self, sql_store):
+        sql_store.save_execution(make_record("e1", "a", "running"))
+        sql_store.add_node_result("e1", "n1", {"result": {"x": 1}})
+        assert sql_store._pending
+
+        sql_store.update_execution("e1", status="completed", duration=1.5)
+
+        record = sql_store.get_execution("e1")
+        assert record["status"] == "completed"
+        assert record["duration"] == 1.5
+        assert record["nodes"] == {"n1": {"result": {"x": 1}}}
+
+    def test_list_filters(self, sql_store):
+        now = datetime.now()
+        sql_store.save_execution(make_record("e1", "a", "completed", now - timedelta(days=1)))
+        sql_store.save_execution(make_record("e2", "a", "failed", now))
+        sql_store.save_execution(make_record("e3", "b", "completed", now))
+
+        assert [r["execution_id"] for r in sql_store.list_executions(workflow_id="a")] == ["e2", "e1"]
+        assert [r["execution_id"] for r in sql_store.list_executions(status="failed")] == ["e2"]
+        assert sql_store.count() == 3
+
+    def test_listings_are_scoped_by_source(self, sql_store):
+        sql_store.save_execution(make_record("e1"))
+        sql_store.save_execution({**make_record("o1"), "source": "orchestrator"})
+
+        assert sql_store.get_execution("e1")["source"] == "engine"
+        ids = [r["execution_id"] for r in sql_store.list_executions(source="engine")]
+        assert ids == ["e1"]
+        assert sql_store.count("orchestrator") == 1
+
+    def test_cursor_pagination(self, sql_store):
+        now = datetime.now()
+        for i in range(5):
+            sql_store.save_execution(make_record(f"e{i}", "a", started_at=now - timedelta(seconds=i)))
+        sql_store.save_execution(make_record("other", "b", started_at=now))
+
+        first = sql_store.list_page(workflow_id="a", limit=3)
+        second = sql_store.list_page(workflow_id="a", limit=3, cursor=first["next_cursor"])
+
+        assert [r["execution_id"] for r in first["executions"]] == ["e0", "e1", "e2"]
+        assert [r["execution_id"] for r in second["executions"]] == ["e3", "e4"]
+        assert second["next_cursor"] is None
@@ -1,6 +1,15 @@
+import asyncio
+import time
+
 import pytest
 from agenthub.agents.base_agent import BaseAgent
-from agenthub.orchestrator import AgentRegistry, Orchestrator, WorkflowRegistry
+from agenthub.orchestrator import (
+    AgentRegistry,
+    Orchestrator,
+    WorkflowExecutionError,
+    WorkflowRegistry,
+    WorkflowTimeoutError,
+)
 
 
 class MockAgent(BaseAgent):
@@ -11,6 +20,21 @@ class MockAgent(BaseAgent):
         return {"status": "success", "data": "mock_response"}
 
 
+class SleepyAgent(BaseAgent):
+    """Duerme ``action`` segundos (p.ej. "0.2") salvo que se cancele"""
+
+    def __init__(self, agent_id="sleepy"):
+        super().__init__(agent_id)
+        self.finished = []
+
+    def handle(self, message):
+        delay = float(message["action"].replace("_", "."))
+        if message["cancel_event"].wait(delay):
+            return {"status": "cancelled"}
+        self.finished.append(delay)
+        return {"status": "success", "data": {f"slept_{message['action']}": delay}}
+
+
 class TestAgentRegistry:
     def test_register_agent(self):
         registry = AgentRegistry()
@@ -80,3 +104,341 @@ class TestOrchestrator:
 
         assert result["status"] == "completed"
         assert "execution_id" in result
+
+    def test_history_pages_summaries_and_fetches_results_on_demand(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(MockAgent())
+        orchestrator.register_workflow("test_workflow", ["mock_agent.test_action"])
+        ids = [orchestrator.execute_workflow("test_workflow")["execution_id"] for _ in range(3)]
+
+        first = orchestrator.list_executions_page("test_workflow", limit=2)
+        second = orchestrator.list_executions_page(
+            "test_workflow", limit=2, cursor=first["next_cursor"]
+        )
+
+        listed = [r["execution_id"] for r in first["executions"] + second["executions"]]
+        assert sorted(listed) == sorted(ids)
+        assert second["next_cursor"] is None
+        assert all("result" not in r for r in first["executions"])
+        assert "final_context" in orchestrator.get_execution_result(ids[0])
+
+
+class TestBatchSubmission:
+    def test_batch_streams_every_item_with_concurrency_cap(self):
+        orchestrator = Orchestrator()
+        agent = SleepyAgent()
+        orchestrator.register_agent(agent)
+        orchestrator.register_workflow("nap", ["sleepy.0_1"])
+
+        batch = orchestrator.submit_batch("nap", [{"n": i} for i in range(6)], max_concurrency=3)
+        started = time.monotonic()
+        items = list(batch)
+        elapsed = time.monotonic() - started
+
+        assert sorted(item["index"] for item in items) == list(range(6))
+        assert all(item["status"] == "completed" for item in items)
+        # 6 items de 0.1s con 3 en vuelo: dos tandas
+        assert 0.18 < elapsed < 0.5
+        assert items[0]["result"]["final_context"]["n"] == items[0]["index"]
+        stats = batch.get_stats()
+        assert stats["completed"] == 6 and stats["pending"] == 0
+        assert stats["throughput"] > 0
+        assert orchestrator.get_execution_history(items[0]["execution_id"]) is not None
+
+    def test_failed_items_do_not_stop_the_batch(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(SleepyAgent())
+        orchestrator.register_workflow("nap", ["sleepy.0_3"], timeout=0.1)
+        orchestrator.register_workflow("quick", ["sleepy.0"])
+
+        failed = list(orchestrator.submit_batch("nap", [{}, {}]))
+        quick = list(orchestrator.submit_batch("quick", [{}, {}, {}]))
+
+        assert [item["status"] for item in failed] == ["failed", "failed"]
+        assert [item["status"] for item in quick] == ["completed"] * 3
+
+    def test_setup_is_validated_once_before_running(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_workflow("orphan", ["ghost.run"])
+
+        with pytest.raises(WorkflowExecutionError, match="ghost"):
+            orchestrator.submit_batch("orphan", [{}])
+        with pytest.raises(WorkflowExecutionError, match="not found"):
+            orchestrator.submit_batch("missing", [{}])
+
+    def test_async_iteration_and_early_stop_cancels_pending(self):
+        orchestrator = Orchestrator()
+        agent = SleepyAgent()
+        orchestrator.register_agent(agent)
+        orchestrator.register_workflow("nap", ["sleepy.0_05"])
+        batch = orchestrator.submit_batch("nap", [{}] * 10, max_concurrency=2)
+
+        async def first_two():
+            seen = []
+            async for item in batch:
+                seen.append(item)
+                if len(seen) == 2:
+                    break
+            return seen
+
+        seen = asyncio.run(first_two())
+
+        assert len(seen) == 2
+        assert batch.get_stats()["pending"] == 8
+        assert len(agent.finished) < 10
+
+
+class TestAsyncOrchestrator:
+    def test_parallel_workflow_takes_longest_task_time(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(SleepyAgent())
+        orchestrator.register_workflow(
+            "fan_out", ["sleepy.0_2", "sleepy.0_1", "sleepy.0_05"], parallel=True
+        )
+
+        started = time.monotonic()
+        result = orchestrator.execute_workflow("fan_out")
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.35
+        assert list(result["result"]["parallel_results"]) == [
+            "sleepy.0_2",
+            "sleepy.0_1",
+            "sleepy.0_05",
+        ]
+
+    def test_parallel_deadline_is_global_and_cancels_outstanding_tasks(self):
+        orchestrator = Orchestrator()
+        agent = SleepyAgent()
+        orchestrator.register_agent(agent)
+        orchestrator.register_workflow(
+            "slow_fan_out",
+            ["sleepy.0_05", "sleepy.5", "sleepy.6"],
+            parallel=True,
+            timeout=0.2,
+        )
+
+        started = time.monotonic()
+        result = orchestrator.execute_workflow("slow_fan_out")
+        elapsed = time.monotonic() - started
+
+        results = result["result"]["parallel_results"]
+        assert elapsed < 1
+        assert "result" in results["sleepy.0_05"]
+        assert "Timed out" in results["sleepy.5"]["error"]
+        assert "Timed out" in results["sleepy.6"]["error"]
+        assert agent.finished == [0.05]
+
+    def test_sequential_workflow_fails_on_deadline(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(SleepyAgent())
+        orchestrator.register_workflow(
+            "slow_chain", ["sleepy.0_1", "sleepy.0_1", "sleepy.0_1"], timeout=0.15
+        )
+
+        with pytest.raises(WorkflowTimeoutError):
+            orchestrator.execute_workflow("slow_chain")
+
+        assert orchestrator.list_executions()[0]["status"] == "failed"
+
+    def test_scheduler_bounds_concurrency_across_workflows(self):
+        orchestrator = Orchestrator()
+        orchestrator.scheduler.max_concurrency = 2
+        orchestrator.register_agent(SleepyAgent())
+        orchestrator.register_workflow("pair", ["sleepy.0_1", "sleepy.0_05"], parallel=True)
+
+        async def scenario():
+            peak = 0
+
+            async def watch():
+                nonlocal peak
+                while True:
+                    peak = max(peak, orchestrator.scheduler.running)
+                    await asyncio.sleep(0.005)
+
+            watcher = asyncio.create_task(watch())
+            await asyncio.gather(
+                *(orchestrator.execute_workflow_async("pair") for _ in range(3))
+            )
+            watcher.cancel()
+            return peak
+
+        assert asyncio.run(scenario()) == 2
+        assert orchestrator.get_stats()["scheduler"]["completed"] == 6
+
+    def test_cancelled_call_keeps_its_slot_until_the_thread_finishes(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from agenthub.orchestrator import TaskScheduler
+
+        lock = threading.Lock()
+        current = peak = 0
+
+        def work(delay):
+            nonlocal current, peak
+            with lock:
+                current += 1
+                peak = max(peak, current)
+            time.sleep(delay)
+            with lock:
+                current -= 1
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        scheduler = TaskScheduler(executor, max_concurrency=1)
+
+        async def scenario():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(scheduler.run(work, 0.3), 0.05)
+            assert scheduler.get_stats()["running"] == 1
+            await scheduler.run(work, 0.01)
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            executor.shutdown(wait=True)
+
+        assert peak == 1
+        assert scheduler.get_stats()["running"] == 0
+
+    def test_blocking_call_still_works_inside_event_loop(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(MockAgent())
+        orchestrator.register_workflow("test_workflow", ["mock_agent.test_action"])
+
+        async def scenario():
+            return orchestrator.execute_workflow("test_workflow")
+
+        assert asyncio.run(scenario())["status"] == "completed"
+
+
+class TestStagedWorkflows:
+    def test_stages_fan_out_and_merge_in_declaration_order(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(SleepyAgent())
+        orchestrator.register_workflow(
+            "staged",
+            stages=[["sleepy.0_05"], ["sleepy.0_15", "sleepy.0_1"]],
+        )
+
+        started = time.monotonic()
+        result = orchestrator.execute_workflow("staged")["result"]
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.3
+        assert [list(stage) for stage in result["stages"]] == [
+            ["sleepy.0_05"],
+            ["sleepy.0_15", "sleepy.0_1"],
+        ]
+        assert list(result["final_context"]) == ["slept_0_05", "slept_0_15", "slept_0_1"]
+
+    def test_depends_on_is_layered_into_stages(self):
+        orchestrator = Orchestrator()
+        orchestrator.register_workflow(
+            "deps",
+            tasks=["a.build", "b.test", "c.lint", "d.deploy"],
+            depends_on={"b.test": ["a.build"], "d.deploy": ["b.test", "c.lint"]},
+        )
+
+        assert orchestrator.workflow_registry.get("deps")["stages"] == [
+            ["a.build", "c.lint"],
+            ["b.test"],
+            ["d.deploy"],
+        ]
+
+    def test_circular_dependencies_are_rejected(self):
+        orchestrator = Orchestrator()
+
+        with pytest.raises(ValueError, match="Circular"):
+            orchestrator.register_workflow(
+                "loop",
+                tasks=["a.x", "b.y"],
+                depends_on={"a.x": ["b.y"], "b.y": ["a.x"]},
+            )
+
+    def test_default_api_development_validates_and_tests_in_parallel(self):
+        from agenthub.agents.backend_agent import BackendAgent
+        from agenthub.agents.qa_agent import QAAgent
+        from agenthub.workflows import default
+
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(BackendAgent())
+        orchestrator.register_agent(QAAgent())
+        original = default.orchestrator
+        default.orchestrator = orchestrator
+        try:
+            default.register_default_workflows()
+        finally:
+            default.orchestrator = original
+
+        assert orchestrator.workflow_registry.get("api_development")["stages"][-1] == [
+            "qa_agent.validate_api_spec",
+            "qa_agent.generate_tests",
+        ]
+        result = orchestrator.execute_workflow("api_development", {"requirements": "API"})
+        assert len(result["result"]["stages"]) == 4
+
+
+class RecordingAgent(BaseAgent):
+    def __init__(self, agent_id="recorder"):
+        super().__init__(agent_id)
+        self.seen = {}
+
+    def handle(self, message):
+        data = message["data"]
+        self.seen[message["action"]] = dict(data)
+        # Escritura local: no debe filtrarse a otras tareas
+        data["scratch"] = message["action"]
+        return {"status": "success", "data": {message["action"]: "x" * 10}}
+
+
+class TestWorkflowContext:
+    def test_layers_override_without_copying_and_views_are_copy_on_write(self):
+        from agenthub.workflow_context import WorkflowContext
+
+        blob = {"code": "x" * 1000}
+        context = WorkflowContext({"a": 1})
+        context.push(blob)
+        view = context.view()
+        view["a"] = 2
+        context.push({"a": 3})
+
+        assert context["a"] == 3
+        assert view["a"] == 2
+        assert context.to_dict()["code"] is blob["code"]
+        assert context.view(["a", "missing"]) == {"a": 3}
+
+    def test_layers_are_compacted(self):
+        from agenthub.workflow_context import WorkflowContext
+
+        context = WorkflowContext()
+        for i in range(WorkflowContext.MAX_LAYERS + 5):
+            context.push({f"k{i}": i, "last": i})
+
+        assert context.depth <= WorkflowContext.MAX_LAYERS
+        assert context["last"] == WorkflowContext.MAX_LAYERS + 4
+        assert len(context) == WorkflowContext.MAX_LAYERS + 6
+
+    def test_sequential_steps_see_previous_results_and_declared_projection(self):
+        orchestrator = Orchestrator()
+        agent = RecordingAgent()
+        orchestrator.register_agent(agent)
+        orchestrator.register_workflow(
+            "chain",
+            ["recorder.first", "recorder.second", "recorder.third"],
+            inputs={"recorder.third": ["first", "seed"]},
+        )
+        initial = {"seed": 1}
+
+        result = orchestrator.execute_workflow("chain", initial)["result"]
+
+        assert agent.seen["second"] == {"seed": 1, "first": "x" * 10}
+        assert agent.seen["third"] == {"seed": 1, "first": "x" * 10}
+        assert "scratch" not in result["final_context"]
+        assert initial == {"seed": 1}
+
+    def test_unknown_task_in_inputs_is_rejected(self):
+        orchestrator = Orchestrator()
+
+        with pytest.raises(ValueError, match="inputs"):
+            orchestrator.register_workflow("bad", ["a.b"], inputs={"c.d": ["x"]})
@@ -24,3 +24,46 @@ def test_valid_condition():
 def test_malicious_condition_blocked():
     exec_ctx = create_execution({})
     assert exec_ctx._evaluate_condition("__import__('os').system('echo hi')") is False
+
+
+def test_condition_does_not_repr_context_values():
+    class NoRepr(dict):
+        def __repr__(self):
+            raise AssertionError("context values must not be repr()'d")
+
+    exec_ctx = create_execution({"value": 5})
+    exec_ctx.execution_context["node_big"] = NoRepr(status="success")
+    assert exec_ctx._evaluate_condition("{node_big}['status'] == 'success'") is True
+
+
+def test_missing_variable_evaluates_false():
+    exec_ctx = create_execution({})
+    assert exec_ctx._evaluate_condition("{node_missing}['status'] == 'ok'") is False
+    assert exec_ctx._evaluate_condition("unknown_name == 1") is False
+
+
+def test_conditions_are_compiled_once_and_shared():
+    from workflow_engine.core.conditions import get_condition
+
+    assert get_condition("{initial_data}['x'] > 1") is get_condition("{initial_data}['x'] > 1")
+
+
+def test_invalid_condition_raises_a_fresh_error_each_time():
+    from workflow_engine.core.conditions import get_condition
+
+    errors = []
+    for _ in range(2):
+        with pytest.raises(ValueError) as exc:
+            get_condition("open('x')")
+        errors.append(exc.value)
+
+    assert errors[0] is not errors[1]
+    assert str(errors[0]) == str(errors[1])
+
+
+def test_invalid_condition_rejected_when_added_to_workflow():
+    from workflow_engine.core.WorkflowEngine import WorkflowNode
+
+    workflow = Workflow("wf", "Test")
+    with pytest.raises(ValueError):
+        workflow.add_node(WorkflowNode("n", "a", {"condition": "open('x')"}))
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from workflow_engine.core.WorkflowEngine import (
+    AgentRegistry,
+    EventBus,
+    Workflow,
+    WorkflowEngine,
+    WorkflowNode,
+)
+from workflow_engine.core.executors import AgentPool, AgentPoolFullError, AgentPoolManager
+
+
+class BlockingAgent:
+    def __init__(self, release):
+        self.release = release
+
+    def handle(self, message):
+        self.release.wait(5)
+        return {"blocked": True}
+
+
+class QuickAgent:
+    def handle(self, message):
+        return {"thread": threading.current_thread().name}
+
+
+def test_pool_rejects_when_queue_is_full():
+    release = threading.Event()
+    pool = AgentPool("blocking", workers=1, max_queue=1)
+    try:
+        futures = [pool.submit(release.wait, 5) for _ in range(2)]
+        with pytest.raises(AgentPoolFullError):
+            pool.submit(release.wait, 5)
+
+        stats = pool.get_stats()
+        assert stats["queue_depth"] + stats["running"] == 2
+        assert stats["rejected"] == 1
+        release.set()
+        assert [f.result(timeout=1) for f in futures] == [True, True]
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
+
+    assert pool.get_stats()["completed"] == 2
+
+
+def test_pool_sizes_come_from_settings():
+    manager = AgentPoolManager({"default": {"workers": 3}, "QuickAgent": {"workers": 1}})
+
+    assert manager.get_pool(QuickAgent()).workers == 1
+    assert manager.get_pool(BlockingAgent(None)).workers == 3
+
+
+def test_slow_agent_class_does_not_starve_others():
+    release = threading.Event()
+    registry = AgentRegistry()
+    registry.register_agent("blocking", BlockingAgent(release), {})
+    registry.register_agent("quick", QuickAgent(), {})
+    pools = AgentPoolManager({"BlockingAgent": {"workers": 1, "max_queue": 10}})
+    engine = WorkflowEngine(registry, EventBus(), agent_pools=pools)
+
+    slow = Workflow("wf_slow", "slow")
+    slow.add_node(WorkflowNode("1", "blocking", {"action": "run"}))
+    quick = Workflow("wf_quick", "quick")
+    quick.add_node(WorkflowNode("1", "quick", {"action": "run"}))
+
+    async def scenario():
+        blocked = [asyncio.create_task(engine.execute_workflow(slow)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        execution_id = await asyncio.wait_for(engine.execute_workflow(quick), 1)
+        stats = pools.get_stats()
+        release.set()
+        await asyncio.gather(*blocked)
+        return execution_id, stats
+
+    try:
+        execution_id, stats = asyncio.run(scenario())
+    finally:
+        release.set()
+        pools.shutdown()
+
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    node = record["nodes"]["1"]
+    assert node["result"]["thread"].startswith("agent-QuickAgent")
+    assert stats["BlockingAgent"]["queue_depth"] == 2
+    assert stats["QuickAgent"]["completed"] == 1
+
+
+def test_run_in_worker_reuses_agent_instance():
+    from agenthub.agents.backend_agent import BackendAgent
+    from workflow_engine.core import executors
+
+    agent = BackendAgent()
+    spec = executors.agent_spec(agent)
+    payload = json.dumps({"action": "analyze_requirements", "data": {"requirements": "API"}})
+
+    _, first = executors.run_in_worker(spec, payload.encode())
+    executors.run_in_worker(spec, payload.encode())
+
+    assert json.loads(first)["status"] == "success"
+    assert len([s for s in executors._worker_agents if s == spec]) == 1
+
+
+def test_process_pool_runs_sync_agent_in_worker_process():
+    from agenthub.agents.backend_agent import BackendAgent
+
+    registry = AgentRegistry()
+    registry.register_agent("backend", BackendAgent(), {})
+    pools = AgentPoolManager()
+    pools.use_process_pool(BackendAgent, process_workers=1)
+    engine = WorkflowEngine(registry, EventBus(), agent_pools=pools)
+
+    wf = Workflow("wf_process", "process")
+    wf.add_node(WorkflowNode("1", "backend", {"action": "analyze_requirements"}))
+
+    try:
+        execution_id = asyncio.run(engine.execute_workflow(wf, {"requirements": "API"}))
+        stats = pools.get_stats()["BackendAgent"]
+    finally:
+        pools.shutdown(wait=True)
+
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    node = record["nodes"]["1"]
+    assert node["result"]["status"] == "success"
+    assert stats["backend"] == "process"
+    assert stats["completed"] == 1
+
+
+def test_worker_builds_agents_that_need_an_id():
+    from agenthub.agents.base_agent import BaseAgent
+    from workflow_engine.core import executors
+
+    class NeedsId(BaseAgent):
+        def handle(self, message):
+            return {"status": "success"}
+
+    class NeedsDb:
+        def __init__(self, db):
+            self.db = db
+
+    assert executors.worker_init_kwargs(NeedsId, "a1", {}) == {
+        "agent_id": "a1",
+        "name": "a1",
+    }
+    with pytest.raises(TypeError, match="db"):
+        AgentPoolManager().use_process_pool(NeedsDb)
+
+
+def test_process_pool_is_not_a_thread_pool():
+    from workflow_engine.core.executors import ProcessAgentPool
+
+    class CpuAgent:
+        def handle(self, message):
+            return {}
+
+        def stream(self, message):
+            return iter(())
+
+    pools = AgentPoolManager()
+    pools.use_process_pool(CpuAgent, process_workers=1)
+    agent = CpuAgent()
+    try:
+        assert isinstance(pools.get_pool(agent), ProcessAgentPool)
+        assert not isinstance(pools.get_pool(agent), AgentPool)
+        assert not pools.supports_streaming(agent)
+        with pytest.raises(TypeError, match="process pool"):
+            pools.stream(agent, agent.stream({}))
+    finally:
+        pools.shutdown()
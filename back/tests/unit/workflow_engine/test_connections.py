@@ -0,0 +1,177 @@
+import asyncio
+import json
+
+from workflow_engine.core.connections import PING_TIMEOUT_CLOSE_CODE, ConnectionManager
+from workflow_engine.core.events import EventBus, execution_topic
+
+
+class FakeWebSocket:
+    def __init__(self, hang=False):
+        self.hang = hang
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, text):
+        if self.hang:
+            await asyncio.sleep(10)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_register_and_unregister_also_leave_the_event_bus():
+    bus = EventBus()
+    manager = ConnectionManager(bus)
+    ws = FakeWebSocket()
+    manager.register(ws)
+    bus.add_websocket(ws)
+
+    manager.unregister(ws)
+
+    assert ws not in manager
+    assert bus.subscribers == {}
+    assert manager.get_stats()["total"] == 1
+
+
+def test_idle_socket_is_pinged_and_reaped_without_pong():
+    manager = ConnectionManager(ping_interval=0.01, pong_timeout=0.02)
+    alive, dead = FakeWebSocket(), FakeWebSocket()
+    manager.register(alive)
+    manager.register(dead)
+
+    async def scenario():
+        await asyncio.sleep(0.02)
+        await manager.check()
+        ping = alive.sent[0]
+        manager.pong(alive, ping["id"])
+        await asyncio.sleep(0.03)
+        return await manager.check()
+
+    reaped = asyncio.run(scenario())
+
+    assert reaped == 1
+    assert dead.sent[0]["type"] == "ping"
+    assert dead.closed_with == PING_TIMEOUT_CLOSE_CODE
+    assert alive in manager and dead not in manager
+    stats = manager.get_stats()
+    assert stats["reaped"] == 1
+    assert stats["pongs_received"] == 1
+    assert stats["avg_rtt"] is not None
+
+
+def test_client_activity_counts_as_pong():
+    manager = ConnectionManager(ping_interval=0.01, pong_timeout=0.02)
+    ws = FakeWebSocket()
+    manager.register(ws)
+
+    async def scenario():
+        await asyncio.sleep(0.02)
+        await manager.check()
+        manager.touch(ws)
+        await asyncio.sleep(0.03)
+        await manager.check()
+
+    asyncio.run(scenario())
+
+    assert ws in manager
+    assert ws.closed_with is None
+
+
+class ExclusiveWebSocket(FakeWebSocket):
+    """Falla si dos envíos se solapan, como un WebSocket de Starlette"""
+
+    def __init__(self, delay=0.01):
+        super().__init__()
+        self.delay = delay
+        self.busy = False
+        self.overlapped = False
+
+    async def send_text(self, text):
+        if self.busy:
+            self.overlapped = True
+        self.busy = True
+        await asyncio.sleep(self.delay)
+        self.busy = False
+        self.sent.append(json.loads(text))
+
+
+def test_ping_goes_through_the_event_writer_of_subscribed_sockets():
+    bus = EventBus()
+    manager = ConnectionManager(bus, ping_interval=0, pong_timeout=1)
+    ws = ExclusiveWebSocket()
+
+    async def scenario():
+        bus.add_websocket(ws, [execution_topic("e")])
+        manager.register(ws)
+        for i in range(3):
+            await bus.emit("node_completed", {"execution_id": "e", "node_id": str(i)})
+        await manager.check()
+        await bus.drain()
+
+    asyncio.run(scenario())
+
+    assert not ws.overlapped
+    # El ping se adelanta a los eventos que aún estaban en cola
+    assert [m["type"] for m in ws.sent].index("ping") < 3
+    assert manager.get_stats()["pings_sent"] == 1
+
+
+def test_ping_stuck_behind_a_hung_writer_reaps_connection():
+    bus = EventBus()
+    manager = ConnectionManager(bus, ping_interval=0, pong_timeout=0.02)
+    ws = ExclusiveWebSocket(delay=10)
+
+    async def scenario():
+        bus.add_websocket(ws, [execution_topic("e")])
+        manager.register(ws)
+        await bus.emit("node_completed", {"execution_id": "e", "node_id": "1"})
+        await asyncio.sleep(0)
+        await manager.check()
+        await bus.close()
+
+    asyncio.run(scenario())
+
+    assert ws not in manager
+    assert ws.closed_with == PING_TIMEOUT_CLOSE_CODE
+
+
+def test_blocked_ping_send_reaps_connection():
+    manager = ConnectionManager(ping_interval=0, pong_timeout=0.02)
+    ws = FakeWebSocket(hang=True)
+    manager.register(ws)
+
+    asyncio.run(manager.check())
+
+    assert ws not in manager
+    assert ws.closed_with == PING_TIMEOUT_CLOSE_CODE
+
+
+def test_streams_without_heartbeat_are_counted_but_not_pinged():
+    manager = ConnectionManager(ping_interval=0, pong_timeout=1)
+    stream = FakeWebSocket()
+    manager.register(stream, kind="sse", heartbeat=False)
+    manager.register(FakeWebSocket())
+
+    asyncio.run(manager.check())
+
+    assert stream.sent == []
+    stats = manager.get_stats()
+    assert stats["by_kind"] == {"sse": 1, "websocket": 1}
+    assert stats["oldest_age"] >= stats["avg_age"] >= 0
+
+
+def test_heartbeat_task_runs_and_close_disconnects_everyone():
+    manager = ConnectionManager(ping_interval=0.01, pong_timeout=0.02)
+    ws = FakeWebSocket()
+    manager.register(ws)
+
+    async def scenario():
+        manager.start()
+        await asyncio.sleep(0.1)
+        await manager.close()
+
+    asyncio.run(scenario())
+
+    assert manager.get_stats()["reaped"] == 1
+    assert len(manager) == 0
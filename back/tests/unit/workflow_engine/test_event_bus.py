@@ -0,0 +1,418 @@
+import asyncio
+import json
+
+from workflow_engine.core.events import (
+    ALL_TOPIC,
+    EventBus,
+    execution_topic,
+    workflow_topic,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False, delay=0):
+        self.fail = fail
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("closed")
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def _emit_all(bus, events):
+    async def scenario():
+        for event_type, data in events:
+            await bus.emit(event_type, data)
+        await bus.drain()
+
+    asyncio.run(scenario())
+
+
+def test_events_are_routed_by_workflow_and_execution():
+    bus = EventBus()
+    wf_a, wf_b, exec_a, everything = (FakeWebSocket() for _ in range(4))
+    bus.add_websocket(wf_a, [workflow_topic("a")])
+    bus.add_websocket(wf_b, [workflow_topic("b")])
+    bus.add_websocket(exec_a, [execution_topic("exec_a_1")])
+    bus.add_websocket(everything, [ALL_TOPIC])
+
+    _emit_all(
+        bus,
+        [("node_started", {"workflow_id": "a", "execution_id": "exec_a_1", "node_id": "1"})],
+    )
+
+    assert [m["type"] for m in wf_a.sent] == ["node_started"]
+    assert wf_b.sent == []
+    assert len(exec_a.sent) == 1
+    assert len(everything.sent) == 1
+
+
+def test_socket_subscribed_to_several_matching_topics_gets_one_copy():
+    bus = EventBus()
+    ws = FakeWebSocket()
+    bus.add_websocket(ws, [workflow_topic("a"), execution_topic("exec_a_1")])
+
+    _emit_all(bus, [("node_started", {"workflow_id": "a", "execution_id": "exec_a_1"})])
+
+    assert len(ws.sent) == 1
+
+
+def test_failed_socket_is_removed_from_every_topic():
+    bus = EventBus()
+    ws = FakeWebSocket(fail=True)
+    bus.add_websocket(ws, [workflow_topic("a"), ALL_TOPIC])
+
+    _emit_all(bus, [("workflow_started", {"workflow_id": "a"})])
+
+    assert bus.websocket_connections == []
+    assert dict(bus.topic_subscribers) == {}
+
+
+def test_slow_client_does_not_block_emit():
+    bus = EventBus()
+    slow = FakeWebSocket(delay=0.2)
+    bus.add_websocket(slow)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(5):
+            await bus.emit("node_started", {"execution_id": "e", "node_id": str(i)})
+        elapsed = loop.time() - started
+        await bus.close()
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.05
+
+
+def test_drop_oldest_keeps_queue_bounded():
+    bus = EventBus(queue_size=2)
+    ws = FakeWebSocket(delay=0.01)
+    subscriber = bus.add_websocket(ws)
+
+    _emit_all(bus, [("node_completed", {"execution_id": "e", "node_id": str(i)}) for i in range(5)])
+
+    # emit no cede el loop: el writer solo llega a ver los dos últimos
+    assert [m["data"]["node_id"] for m in ws.sent] == ["3", "4"]
+    assert subscriber.dropped == 3
+
+
+def test_coalesce_replaces_superseded_node_progress():
+    bus = EventBus(queue_size=2, overflow_policy="coalesce")
+    ws = FakeWebSocket(delay=0.01)
+    subscriber = bus.add_websocket(ws)
+
+    _emit_all(
+        bus,
+        [
+            ("workflow_started", {"execution_id": "e"}),
+            ("node_started", {"execution_id": "e", "node_id": "1"}),
+            ("node_started", {"execution_id": "e", "node_id": "2"}),
+            ("node_completed", {"execution_id": "e", "node_id": "2"}),
+        ],
+    )
+
+    sent = [(m["type"], m["data"].get("node_id")) for m in ws.sent]
+    assert ("node_completed", "2") in sent
+    assert ("node_started", "2") not in sent
+    assert subscriber.coalesced == 1
+
+
+def test_disconnect_policy_closes_slow_client():
+    bus = EventBus(queue_size=1, overflow_policy="disconnect")
+    ws = FakeWebSocket(delay=0.05)
+    bus.add_websocket(ws)
+
+    _emit_all(bus, [("node_completed", {"execution_id": "e", "node_id": str(i)}) for i in range(3)])
+
+    assert bus.websocket_connections == []
+    assert ws.closed_with == 1013
+    assert bus.get_stats()["disconnected_slow"] == 1
+
+
+def test_event_is_encoded_once_for_all_subscribers():
+    bus = EventBus()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for ws in sockets:
+        bus.add_websocket(ws)
+
+    _emit_all(bus, [("node_completed", {"execution_id": "e", "node_id": "1", "result": {"a": 1}})])
+
+    assert bus.get_stats()["frames_encoded"] == 1
+    assert all(ws.sent[0]["data"]["result"] == {"a": 1} for ws in sockets)
+
+
+def test_large_results_are_replaced_by_a_reference():
+    bus = EventBus(max_frame_size=1024)
+    ws = FakeWebSocket()
+    bus.add_websocket(ws)
+
+    _emit_all(
+        bus,
+        [("node_completed", {"execution_id": "e", "node_id": "1", "result": {"code": "x" * 5000}})],
+    )
+
+    result = ws.sent[0]["data"]["result"]
+    assert result["truncated"] is True
+    assert result["url"] == "/api/v1/executions/e/nodes/1"
+    assert bus.get_stats()["truncated"] == 1
+
+
+def test_encoding_falls_back_to_json_for_unsupported_values():
+    from workflow_engine.core.encoding import dumps
+
+    assert json.loads(dumps({"big": 2**70, 1: "a"})) == {"big": 2**70, "1": "a"}
+
+
+def test_batching_sends_one_frame_and_coalesces_node_updates():
+    bus = EventBus(batch_window=0.02)
+    ws = FakeWebSocket()
+    subscriber = bus.add_websocket(ws)
+
+    _emit_all(
+        bus,
+        [
+            ("node_started", {"execution_id": "e", "node_id": "1"}),
+            ("node_started", {"execution_id": "e", "node_id": "2"}),
+            ("node_completed", {"execution_id": "e", "node_id": "1"}),
+            ("workflow_completed", {"execution_id": "e"}),
+        ],
+    )
+
+    assert len(ws.sent) == 1
+    batch = ws.sent[0]
+    assert batch["type"] == "batch"
+    assert [(e["type"], e["data"].get("node_id")) for e in batch["events"]] == [
+        ("node_started", "2"),
+        ("node_completed", "1"),
+        ("workflow_completed", None),
+    ]
+    assert subscriber.events_sent == 3
+    assert subscriber.coalesced == 1
+
+
+def test_subscriber_can_opt_out_of_bus_batching():
+    bus = EventBus(batch_window=0.02)
+    ws = FakeWebSocket()
+    bus.add_websocket(ws, batch_window=0)
+
+    _emit_all(bus, [("node_started", {"execution_id": "e", "node_id": str(i)}) for i in range(2)])
+
+    assert [m["type"] for m in ws.sent] == ["node_started", "node_started"]
+
+
+def test_listeners_run_concurrently_with_timeouts_and_metrics():
+    bus = EventBus(listener_timeout=0.1)
+    calls = []
+
+    async def slow(data):
+        await asyncio.sleep(1)
+
+    async def fast(data):
+        calls.append(("async", data["n"]))
+
+    def sync(data):
+        calls.append(("sync", data["n"]))
+
+    def broken(data):
+        raise RuntimeError("boom")
+
+    for callback in (slow, fast, sync, broken):
+        bus.subscribe("node_started", callback)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bus.emit("node_started", {"n": 1})
+        return loop.time() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 0.5
+    assert sorted(calls) == [("async", 1), ("sync", 1)]
+    stats = bus.get_listener_stats()
+    slow_stats = next(v for k, v in stats.items() if k.endswith("slow"))
+    broken_stats = next(v for k, v in stats.items() if k.endswith("broken"))
+    assert slow_stats["timeouts"] == 1
+    assert broken_stats["errors"] == 1
+    assert all(v["calls"] == 1 for v in stats.values())
+
+
+def test_events_fan_out_across_buses_sharing_a_backend():
+    from workflow_engine.core.event_backends import InMemoryBroker, InMemoryEventBackend
+
+    broker = InMemoryBroker()
+    worker_a = EventBus(backend=InMemoryEventBackend(broker))
+    worker_b = EventBus(backend=InMemoryEventBackend(broker))
+    ws_a, ws_b, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    worker_a.add_websocket(ws_a, [workflow_topic("a")])
+    worker_b.add_websocket(ws_b, [workflow_topic("a")])
+    worker_b.add_websocket(other, [workflow_topic("b")])
+    received = []
+    worker_b.subscribe("node_completed", lambda data: received.append(data))
+
+    async def scenario():
+        await worker_a.emit(
+            "node_completed", {"workflow_id": "a", "execution_id": "e", "node_id": "1"}
+        )
+        await worker_a.drain()
+        await worker_b.drain()
+
+    asyncio.run(scenario())
+
+    assert [m["data"]["node_id"] for m in ws_a.sent] == ["1"]
+    assert [m["data"]["node_id"] for m in ws_b.sent] == ["1"]
+    assert other.sent == []
+    # Los listeners internos solo corren en el proceso que emite
+    assert received == []
+
+
+def test_backend_publish_errors_do_not_fail_emit():
+    from workflow_engine.core.event_backends import InMemoryBroker, InMemoryEventBackend
+
+    class BrokenBackend(InMemoryEventBackend):
+        async def publish(self, message):
+            raise ConnectionError("redis down")
+
+    bus = EventBus(backend=BrokenBackend(InMemoryBroker()))
+    ws = FakeWebSocket()
+    bus.add_websocket(ws, [execution_topic("e")])
+
+    async def scenario():
+        await bus.emit("node_completed", {"execution_id": "e", "node_id": "1"})
+        await bus.drain()
+
+    asyncio.run(scenario())
+
+    assert [m["data"]["node_id"] for m in ws.sent] == ["1"]
+    assert bus.get_stats()["publish_errors"] == 1
+
+
+def test_envelope_carries_the_encoded_frame_unchanged():
+    from workflow_engine.core.event_backends import InMemoryBroker, InMemoryEventBackend
+
+    broker = InMemoryBroker()
+    bus = EventBus(backend=InMemoryEventBackend(broker))
+    messages = []
+    publish = broker.publish
+    broker.publish = lambda message: (messages.append(message), publish(message))
+    bus.retain("e")
+
+    asyncio.run(bus.emit("node_completed", {"execution_id": "e", "text": "a\nb"}))
+
+    header, frame = messages[0].split("\n", 1)
+    assert json.loads(header)["seq"] == 1
+    assert json.loads(frame)["data"]["text"] == "a\nb"
+    assert bus.event_logs["e"].since(0)[0][3] == frame
+
+
+def test_distributed_bus_only_logs_followed_executions():
+    from workflow_engine.core.event_backends import InMemoryBroker, InMemoryEventBackend
+
+    broker = InMemoryBroker()
+    bus = EventBus(backend=InMemoryEventBackend(broker), replay_executions=1)
+    messages = []
+    publish = broker.publish
+    broker.publish = lambda message: (messages.append(message), publish(message))
+    bus.retain("followed")
+
+    async def scenario():
+        await bus.emit("node_completed", {"execution_id": "followed"})
+        for _ in range(3):
+            await bus.emit("node_completed", {"execution_id": "other"})
+
+    asyncio.run(scenario())
+
+    assert list(bus.event_logs) == ["followed"]
+    seqs = [json.loads(m.split("\n", 1)[0])["seq"] for m in messages]
+    assert seqs == [1, 1, 2, 3]
+
+
+def test_late_subscriber_replays_events_since_sequence():
+    bus = EventBus()
+    early = FakeWebSocket()
+    late = FakeWebSocket()
+    bus.add_websocket(early, [execution_topic("e")])
+
+    async def scenario():
+        for i in range(4):
+            await bus.emit("node_completed", {"execution_id": "e", "node_id": str(i)})
+        bus.add_websocket(late, [execution_topic("e")])
+        replayed = bus.replay(late, "e", since=2)
+        await bus.emit("workflow_completed", {"execution_id": "e"})
+        await bus.drain()
+        return replayed
+
+    assert asyncio.run(scenario()) == 2
+    assert [m["seq"] for m in early.sent] == [1, 2, 3, 4, 5]
+    assert [m["seq"] for m in late.sent] == [3, 4, 5]
+    assert bus.get_last_seq("e") == 5
+
+
+def test_replay_reports_gap_when_buffer_was_trimmed():
+    bus = EventBus(replay_size=2)
+    ws = FakeWebSocket()
+    bus.retain("e")
+
+    async def scenario():
+        for i in range(5):
+            await bus.emit("node_completed", {"execution_id": "e", "node_id": str(i)})
+        bus.add_websocket(ws, [execution_topic("e")])
+        bus.replay(ws, "e", since=0)
+        await bus.drain()
+
+    asyncio.run(scenario())
+
+    assert ws.sent[0]["type"] == "replay_gap"
+    assert ws.sent[0]["data"]["first_seq"] == 4
+    assert [m["seq"] for m in ws.sent[1:]] == [4, 5]
+
+
+def test_replay_is_only_kept_when_retained_or_followed():
+    bus = EventBus()
+    ws, late = FakeWebSocket(), FakeWebSocket()
+
+    async def scenario():
+        bus.add_websocket(ws, [execution_topic("followed")])
+        await bus.emit("node_completed", {"execution_id": "nobody", "node_id": "1"})
+        await bus.emit("node_completed", {"execution_id": "followed", "node_id": "1"})
+        bus.add_websocket(late, [execution_topic("followed")])
+        bus.replay(late, "followed", since=0)
+        await bus.drain()
+
+    asyncio.run(scenario())
+
+    assert list(bus.event_logs) == ["followed"]
+    assert bus.frames_encoded == 1
+    # Empezó a guardarse a mitad de ejecución: el replay completo lo avisa
+    assert [m["type"] for m in late.sent] == ["replay_gap", "node_completed"]
+
+
+def test_replay_buffers_are_capped_in_bytes():
+    bus = EventBus(replay_log_bytes=1000, replay_total_bytes=1500)
+    payload = "x" * 300
+
+    async def scenario():
+        for execution_id in ("a", "b"):
+            bus.retain(execution_id)
+            for i in range(5):
+                await bus.emit(
+                    "node_completed",
+                    {"execution_id": execution_id, "node_id": str(i), "text": payload},
+                )
+
+    asyncio.run(scenario())
+
+    assert all(log.bytes <= 1000 for log in bus.event_logs.values())
+    assert bus.replay_bytes == sum(log.bytes for log in bus.event_logs.values())
+    assert bus.replay_bytes <= 1500
+    # Se descarta primero la ejecución menos reciente
+    assert list(bus.event_logs) == ["b"]
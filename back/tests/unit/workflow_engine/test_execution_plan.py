@@ -0,0 +1,92 @@
+import pytest
+
+from workflow_engine.core.plan import ExecutionPlan
+from workflow_engine.core.WorkflowEngine import (
+    ConnectionType,
+    Workflow,
+    WorkflowConnection,
+    WorkflowNode,
+)
+
+
+def build_startup_workflow():
+    wf = Workflow("startup", "startup")
+    for node_id in [
+        "validate_idea",
+        "generate_ui",
+        "create_api",
+        "analyze_data",
+        "qa_testing",
+    ]:
+        wf.add_node(WorkflowNode(node_id, "agent", {}))
+    for source, target in [
+        ("validate_idea", "generate_ui"),
+        ("validate_idea", "create_api"),
+        ("create_api", "analyze_data"),
+        ("generate_ui", "qa_testing"),
+        ("analyze_data", "qa_testing"),
+    ]:
+        wf.add_connection(WorkflowConnection(source, target))
+    return wf
+
+
+def test_plan_levels_and_critical_path():
+    plan = build_startup_workflow().get_execution_plan().to_dict()
+
+    assert plan["levels"] == [
+        ["validate_idea"],
+        ["generate_ui", "create_api"],
+        ["analyze_data"],
+        ["qa_testing"],
+    ]
+    assert plan["critical_path"] == [
+        "validate_idea",
+        "create_api",
+        "analyze_data",
+        "qa_testing",
+    ]
+    assert plan["max_parallelism"] == 2
+
+
+def test_plan_is_cached_until_graph_changes():
+    wf = build_startup_workflow()
+    plan = wf.get_execution_plan()
+    assert wf.get_execution_plan() is plan
+
+    wf.add_node(WorkflowNode("deploy", "agent", {}))
+    new_plan = wf.get_execution_plan()
+    assert new_plan is not plan
+    assert "deploy" in new_plan.execution_order
+
+    wf.connections.append(WorkflowConnection("qa_testing", "deploy"))
+    assert wf.get_execution_plan().execution_order[-1] == "deploy"
+
+
+def test_declared_inputs_wait_for_their_source():
+    plan = ExecutionPlan(["a", "b"], [])
+    assert plan.levels == [[0, 1]]
+
+    wf = Workflow("wf", "wf")
+    wf.add_node(WorkflowNode("a", "agent", {}))
+    wf.add_node(WorkflowNode("b", "agent", {}))
+    wf.add_connection(WorkflowConnection("a", "b", ConnectionType.ERROR))
+    assert wf.get_execution_plan().to_dict()["levels"] == [["a"], ["b"]]
+
+    # Una entrada no SUCCESS que cierra un ciclo no bloquea el plan
+    wf.add_connection(WorkflowConnection("b", "a", ConnectionType.CONDITIONAL))
+    assert wf.get_execution_plan().execution_order == ["a", "b"]
+
+
+def test_cycle_detection():
+    with pytest.raises(Exception, match="cycles"):
+        ExecutionPlan(["a", "b"], [("a", "b"), ("b", "a")])
+
+
+def test_large_graph_plan():
+    count = 500
+    ids = [f"n{i}" for i in range(count)]
+    edges = [(ids[i], ids[i + 1]) for i in range(count - 1)]
+    plan = ExecutionPlan(ids, edges)
+
+    assert plan.execution_order == ids
+    assert len(plan.critical_path) == count
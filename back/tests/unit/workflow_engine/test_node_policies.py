@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+import pytest
+from workflow_engine.core.WorkflowEngine import (
+    AgentRegistry,
+    EventBus,
+    Workflow,
+    WorkflowEngine,
+    WorkflowNode,
+)
+from workflow_engine.core.policies import (
+    NodePolicies,
+    NodeTimeoutError,
+    RetryPolicy,
+    WorkflowTimeoutError,
+)
+
+
+class FlakyAgent:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def handle(self, message):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("transient")
+        return {"calls": self.calls}
+
+
+class SlowAgent:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def handle(self, message):
+        await asyncio.sleep(self.delay)
+        return {"ok": True}
+
+
+def _single_node_workflow(agent_type, config=None):
+    wf = Workflow(f"wf_{agent_type}", agent_type)
+    wf.add_node(WorkflowNode("1", agent_type, {"action": "run", **(config or {})}))
+    return wf
+
+
+def _fast_retry(max_retries):
+    return RetryPolicy(max_retries=max_retries, base_delay=0.001, max_delay=0.001)
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(max_retries=5, base_delay=1, max_delay=4)
+
+    delays = [policy.backoff(attempt) for attempt in range(1, 6) for _ in range(20)]
+
+    assert all(0 <= d <= 4 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_only_transient_errors_are_retried():
+    from workflow_engine.core.executors import AgentPoolFullError
+
+    policy = RetryPolicy(max_retries=3)
+
+    assert policy.should_retry(1, ConnectionError())
+    assert policy.should_retry(1, TimeoutError())
+    assert policy.should_retry(1, NodeTimeoutError())
+    assert not policy.should_retry(1, ValueError())
+    assert not policy.should_retry(1, KeyError("x"))
+    assert not policy.should_retry(1, AgentPoolFullError())
+
+    broad = policy.merged({"retry_on": ["Exception"]})
+    assert broad.should_retry(1, ValueError())
+    assert not broad.should_retry(1, AgentPoolFullError())
+    with pytest.raises(ValueError):
+        RetryPolicy(retry_on=["NoSuchError"])
+
+
+def test_policies_resolve_node_over_agent_over_default():
+    policies = NodePolicies(
+        default_timeout=30,
+        default_retry=RetryPolicy(max_retries=3),
+        agent_overrides={"slow": {"timeout": 120, "max_retries": 1}},
+    )
+
+    assert policies.resolve("fast", {})[0] == 30
+    timeout, retry = policies.resolve("slow", {"action": "run"})
+    assert (timeout, retry.max_retries) == (120, 1)
+    timeout, retry = policies.resolve("slow", {"timeout": 5, "max_retries": 0})
+    assert (timeout, retry.max_retries) == (5, 0)
+
+
+def test_node_is_retried_until_success():
+    agent = FlakyAgent(failures=2)
+    registry = AgentRegistry()
+    registry.register_agent("flaky", agent, {})
+    events = []
+    bus = EventBus()
+    bus.subscribe("node_retry", lambda data: events.append(data["attempt"]))
+    engine = WorkflowEngine(registry, bus, node_policies=NodePolicies(default_retry=_fast_retry(3)))
+
+    execution_id = asyncio.run(engine.execute_workflow(_single_node_workflow("flaky")))
+
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    node = record["nodes"]["1"]
+    assert node["status"] == "completed"
+    assert node["attempts"] == 3
+    assert events == [1, 2]
+
+
+def test_node_fails_after_exhausting_retries():
+    agent = FlakyAgent(failures=5)
+    registry = AgentRegistry()
+    registry.register_agent("flaky", agent, {})
+    engine = WorkflowEngine(
+        registry, EventBus(), node_policies=NodePolicies(default_retry=_fast_retry(3))
+    )
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(engine.execute_workflow(_single_node_workflow("flaky", {"max_retries": 1})))
+
+    assert agent.calls == 2
+
+
+def test_node_timeout_fails_the_node():
+    registry = AgentRegistry()
+    registry.register_agent("slow", SlowAgent(10), {})
+    engine = WorkflowEngine(registry, EventBus(), node_policies=NodePolicies(default_timeout=0.05))
+
+    started = time.monotonic()
+    with pytest.raises(NodeTimeoutError):
+        asyncio.run(engine.execute_workflow(_single_node_workflow("slow")))
+
+    assert time.monotonic() - started < 1
+    execution = asyncio.run(engine.list_executions(workflow_id="wf_slow"))[0]
+    assert execution["status"] == "failed"
+
+
+def test_workflow_deadline_cancels_running_nodes():
+    registry = AgentRegistry()
+    registry.register_agent("slow", SlowAgent(10), {})
+    engine = WorkflowEngine(registry, EventBus(), workflow_timeout=0.05)
+
+    with pytest.raises(WorkflowTimeoutError):
+        asyncio.run(engine.execute_workflow(_single_node_workflow("slow")))
+
+    execution = asyncio.run(engine.list_executions(workflow_id="wf_slow"))[0]
+    record = asyncio.run(
+        engine.get_execution(execution["execution_id"], include_results=True)
+    )
+    nodes = record["nodes"]
+    assert execution["status"] == "failed"
+    assert nodes["1"]["error"] == "cancelled"
+
+
+def test_cancel_foreground_execution_sets_cancel_event_for_sync_agents():
+    seen = {}
+
+    class BlockingAgent:
+        def handle(self, message):
+            seen["event"] = message["cancel_event"]
+            message["cancel_event"].wait(5)
+            return {"cancelled": message["cancel_event"].is_set()}
+
+    registry = AgentRegistry()
+    registry.register_agent("blocking", BlockingAgent(), {})
+    engine = WorkflowEngine(registry, EventBus())
+
+    async def scenario():
+        task = asyncio.create_task(engine.execute_workflow(_single_node_workflow("blocking")))
+        await asyncio.sleep(0.05)
+        execution_id = next(iter(engine.active_executions))
+        assert engine.cancel_execution(execution_id) is True
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return execution_id
+
+    execution_id = asyncio.run(scenario())
+
+    assert seen["event"].is_set()
+    assert asyncio.run(engine.get_execution(execution_id))["status"] == "cancelled"
+    assert not engine.active_executions
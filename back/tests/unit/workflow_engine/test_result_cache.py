@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from workflow_engine.core.cache import NodeResultCache, node_cache_key
+from workflow_engine.core.WorkflowEngine import (
+    AgentRegistry,
+    EventBus,
+    Workflow,
+    WorkflowEngine,
+    WorkflowNode,
+)
+
+
+class CountingAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def handle(self, message):
+        self.calls += 1
+        return {"status": "success", "data": {"value": message["data"].get("x")}}
+
+
+def test_key_is_stable_and_input_sensitive():
+    key = node_cache_key("a", "run", {"b": 1, "a": 2}, {"x": 1})
+    assert key == node_cache_key("a", "run", {"a": 2, "b": 1}, {"x": 1})
+    assert key != node_cache_key("a", "run", {"a": 2, "b": 1}, {"x": 2})
+
+
+def test_lru_eviction_and_byte_accounting():
+    cache = NodeResultCache(max_entries=2)
+    cache.set("k1", {"v": 1})
+    cache.set("k2", {"v": 2})
+    cache.get("k1")
+    cache.set("k3", {"v": 3})
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") == {"v": 1}
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 2 * len('{"v": 1}')
+
+
+def test_ttl_and_size_limits():
+    cache = NodeResultCache(ttl_seconds=0.01, max_bytes=20)
+    cache.set("k1", {"v": 1})
+    time.sleep(0.02)
+
+    assert cache.get("k1") is None
+    assert cache.set("big", {"v": "x" * 100}) is False
+
+
+def test_cached_values_are_isolated_copies():
+    cache = NodeResultCache()
+    cache.set("k", {"items": [1]})
+    cache.get("k")["items"].append(2)
+
+    assert cache.get("k") == {"items": [1]}
+
+
+def _run(engine, wf, data):
+    return asyncio.run(engine.execute_workflow(wf, data))
+
+
+def test_engine_reuses_cached_node_results():
+    agent = CountingAgent()
+    registry = AgentRegistry()
+    registry.register_agent("gen", agent, {})
+    cache = NodeResultCache()
+    engine = WorkflowEngine(registry, EventBus(), result_cache=cache)
+
+    wf = Workflow("wf_cache", "cache")
+    wf.add_node(WorkflowNode("1", "gen", {"action": "run", "cache": True}))
+
+    _run(engine, wf, {"x": 1})
+    _run(engine, wf, {"x": 1})
+    execution_id = _run(engine, wf, {"x": 2})
+
+    assert agent.calls == 2
+    assert cache.hits == 1
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    node = record["nodes"]["1"]
+    assert node["result"]["data"]["value"] == 2
+
+
+def test_cache_is_opt_in_per_node():
+    agent = CountingAgent()
+    registry = AgentRegistry()
+    registry.register_agent("gen", agent, {})
+    engine = WorkflowEngine(registry, EventBus(), result_cache=NodeResultCache())
+
+    wf = Workflow("wf_nocache", "no cache")
+    wf.add_node(WorkflowNode("1", "gen", {"action": "run"}))
+    wf.add_node(WorkflowNode("2", "gen", {"action": "run", "cache": False}))
+
+    _run(engine, wf, {"x": 1})
+    _run(engine, wf, {"x": 1})
+
+    assert agent.calls == 4
+    assert engine.result_cache.get_stats()["entries"] == 0
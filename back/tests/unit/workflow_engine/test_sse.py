@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+from workflow_engine.core.events import EventBus, execution_topic
+from workflow_engine.core.sse import SSEConnection, frame_seq, frame_type
+
+
+def _parse(messages):
+    events = []
+    for message in messages:
+        fields = dict(
+            line.split(": ", 1) for line in message.strip().splitlines() if ": " in line
+        )
+        if "data" in fields:
+            events.append((fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+def test_frame_helpers_read_type_and_seq_without_decoding():
+    frame = '{"type":"node_completed","data":{"result":{"seq":9}},"timestamp":"t","seq":12}'
+
+    assert frame_type(frame) == "node_completed"
+    assert frame_seq(frame) == 12
+    assert frame_seq('{"type":"replay_gap","data":{}}') is None
+
+
+def test_stream_replays_then_follows_until_workflow_finishes():
+    bus = EventBus()
+    bus.retain("e")
+
+    async def scenario():
+        await bus.emit("workflow_started", {"execution_id": "e"})
+        connection = SSEConnection()
+        bus.add_websocket(connection, [execution_topic("e")], batch_window=0)
+        bus.replay(connection, "e", since=0)
+
+        async def produce():
+            await bus.emit("node_completed", {"execution_id": "e", "node_id": "1"})
+            await bus.emit("workflow_completed", {"execution_id": "e"})
+            await bus.emit("node_completed", {"execution_id": "e", "node_id": "late"})
+
+        producer = asyncio.create_task(produce())
+        messages = [m async for m in connection.stream(keepalive=1)]
+        await producer
+        await bus.close()
+        return messages
+
+    messages = asyncio.run(scenario())
+
+    assert messages[0].startswith("retry:")
+    events = _parse(messages)
+    assert [(i, e["type"]) for i, e in events] == [
+        ("1", "workflow_started"),
+        ("2", "node_completed"),
+        ("3", "workflow_completed"),
+    ]
+
+
+def test_idle_stream_sends_keepalive_comments():
+    async def scenario():
+        connection = SSEConnection()
+        stream = connection.stream(keepalive=0.01)
+        first = [await stream.__anext__(), await stream.__anext__()]
+        await connection.close()
+        rest = [m async for m in stream]
+        return first, rest
+
+    first, rest = asyncio.run(scenario())
+
+    assert first[1] == ": keep-alive\n\n"
+    assert rest == [] or all(m.startswith(":") for m in rest)
+
+
+def test_slow_reader_applies_backpressure_without_blocking_emit():
+    bus = EventBus(queue_size=2)
+    connection = SSEConnection(buffer_size=1)
+    subscriber = bus.add_websocket(connection, [execution_topic("e")], batch_window=0)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(10):
+            await bus.emit("node_completed", {"execution_id": "e", "node_id": str(i)})
+            await asyncio.sleep(0)
+        elapsed = loop.time() - started
+        await bus.emit("workflow_completed", {"execution_id": "e"})
+        messages = [m async for m in connection.stream(keepalive=1)]
+        await bus.close()
+        return elapsed, messages
+
+    elapsed, messages = asyncio.run(scenario())
+
+    assert elapsed < 0.1
+    assert subscriber.dropped > 0
+    assert _parse(messages)[-1][1]["type"] == "workflow_completed"
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+from agenthub.agents.base_agent import StreamAssembler
+from workflow_engine.core.WorkflowEngine import (
+    AgentRegistry,
+    EventBus,
+    Workflow,
+    WorkflowEngine,
+    WorkflowNode,
+)
+from workflow_engine.core.events import coalesce_key
+from workflow_engine.core.executors import AgentPoolManager
+
+
+class SlowWriterAgent:
+    def handle(self, message):
+        return {"status": "success", "data": {"text": "abc"}, "streamed": False}
+
+    def stream(self, message):
+        return self._write()
+
+    def _write(self):
+        for part in ("a", "b", "c"):
+            yield {"field": "data.text", "delta": part}
+            time.sleep(0.05)
+        yield {"result": {"status": "success", "streamed": True}}
+
+
+class AsyncWriterAgent:
+    async def handle(self, message):
+        return {"status": "success"}
+
+    def stream(self, message):
+        return self._write()
+
+    async def _write(self):
+        for part in ("x", "y"):
+            yield part
+            await asyncio.sleep(0)
+
+
+def _run(agent, config=None, pools=None):
+    registry = AgentRegistry()
+    registry.register_agent("writer", agent, {})
+    bus = EventBus()
+    events = []
+    for event_type in ("node_progress", "node_completed"):
+        bus.subscribe(
+            event_type,
+            lambda data, t=event_type: events.append((t, time.monotonic(), data)),
+        )
+    engine = WorkflowEngine(registry, bus, agent_pools=pools)
+    wf = Workflow("wf_stream", "stream")
+    wf.add_node(WorkflowNode("1", "writer", {"action": "write", **(config or {})}))
+    started = time.monotonic()
+    execution_id = asyncio.run(engine.execute_workflow(wf))
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    result = record["nodes"]["1"]["result"]
+    return started, events, result
+
+
+def test_sync_stream_publishes_chunks_before_node_completes():
+    pools = AgentPoolManager()
+    try:
+        started, events, result = _run(SlowWriterAgent(), pools=pools)
+    finally:
+        pools.shutdown()
+
+    progress = [e for e in events if e[0] == "node_progress"]
+    completed_at = next(t for kind, t, _ in events if kind == "node_completed")
+    assert [d["delta"] for _, _, d in progress] == ["a", "b", "c"]
+    assert [d["offset"] for _, _, d in progress] == [0, 1, 2]
+    # El primer fragmento llega mucho antes de que termine el nodo
+    assert progress[0][1] - started < completed_at - started - 0.08
+    assert result == {"status": "success", "streamed": True, "data": {"text": "abc"}}
+
+
+def test_async_generator_stream_without_pools():
+    _, events, result = _run(AsyncWriterAgent())
+
+    assert [d["field"] for kind, _, d in events if kind == "node_progress"] == [
+        "output",
+        "output",
+    ]
+    assert result == {"status": "success", "output": "xy"}
+
+
+def test_node_can_opt_out_of_streaming():
+    _, events, result = _run(SlowWriterAgent(), {"stream": False})
+
+    assert [kind for kind, _, _ in events] == ["node_completed"]
+    assert result["streamed"] is False
+
+
+def test_stream_chunks_are_never_coalesced():
+    assert coalesce_key({"execution_id": "e", "node_id": "1", "delta": "a"}) is None
+    assert coalesce_key({"execution_id": "e", "node_id": "1"}) == ("e", "1")
+
+
+def test_assembler_keeps_fields_already_in_the_final_result():
+    assembler = StreamAssembler()
+    assembler.add({"field": "data.code", "delta": "partial"})
+    assembler.add({"result": {"data": {"code": "final", "lang": "py"}}})
+
+    assert assembler.build() == {"data": {"code": "final", "lang": "py"}}
+
+
+def test_landing_page_streams_sections_through_engine():
+    from agenthub.agents.ui_component_generator import UIComponentGeneratorAgent
+
+    registry = AgentRegistry()
+    registry.register_agent("ui", UIComponentGeneratorAgent(), {})
+    bus = EventBus()
+    deltas = []
+    bus.subscribe("node_progress", lambda data: deltas.append(data["delta"]))
+    engine = WorkflowEngine(registry, bus)
+    wf = Workflow("wf_landing", "landing")
+    wf.add_node(WorkflowNode("1", "ui", {"action": "create_landing_page"}))
+
+    execution_id = asyncio.run(
+        engine.execute_workflow(wf, {"sections": ["hero", "pricing"]})
+    )
+
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    result = record["nodes"]["1"]["result"]
+    assert result["status"] == "success"
+    assert len(deltas) == 4
+    assert result["data"]["main_file"]["code"] == "".join(deltas)
+    assert "hero section" in result["data"]["main_file"]["code"]
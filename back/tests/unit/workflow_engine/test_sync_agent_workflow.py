@@ -19,8 +19,10 @@ def test_single_sync_agent_workflow():
     wf.nodes = {"1": node}
 
     engine = WorkflowEngine(registry, bus)
-    asyncio.run(engine.execute_workflow(wf, {"requirements": "Simple API"}))
+    execution_id = asyncio.run(engine.execute_workflow(wf, {"requirements": "Simple API"}))
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    node = record["nodes"]["1"]
 
-    assert wf.nodes["1"].status.name == "COMPLETED"
-    assert wf.nodes["1"].result["status"] == "success"
-    assert "analysis" in wf.nodes["1"].result["data"]
+    assert node["status"] == "completed"
+    assert node["result"]["status"] == "success"
+    assert "analysis" in node["result"]["data"]
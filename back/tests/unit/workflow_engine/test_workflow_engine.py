@@ -25,6 +25,11 @@ class DummyAgent:
         return {"handled": message.get("action"), **self.result}
 
 
+def _node_results(engine, execution_id):
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    return record["nodes"]
+
+
 def test_sequential_execution():
     registry = AgentRegistry()
     bus = EventBus()
@@ -39,11 +44,11 @@ def test_sequential_execution():
     wf.connections.append(WorkflowConnection("1", "2", ConnectionType.SUCCESS))
 
     engine = WorkflowEngine(registry, bus)
-    asyncio.run(engine.execute_workflow(wf))
+    nodes = _node_results(engine, asyncio.run(engine.execute_workflow(wf)))
 
-    assert wf.nodes["1"].status.name == "COMPLETED"
-    assert wf.nodes["2"].status.name == "COMPLETED"
-    assert wf.nodes["2"].result["b"] == 2
+    assert nodes["1"]["status"] == "completed"
+    assert nodes["2"]["status"] == "completed"
+    assert nodes["2"]["result"]["b"] == 2
 
 
 def test_parallel_execution():
@@ -58,10 +63,10 @@ def test_parallel_execution():
     wf.nodes = {"1": n1, "2": n2}
 
     engine = WorkflowEngine(registry, bus)
-    asyncio.run(engine.execute_workflow(wf))
+    nodes = _node_results(engine, asyncio.run(engine.execute_workflow(wf)))
 
-    assert wf.nodes["1"].status.name == "COMPLETED"
-    assert wf.nodes["2"].status.name == "COMPLETED"
+    assert nodes["1"]["status"] == "completed"
+    assert nodes["2"]["status"] == "completed"
 
 
 def test_node_failure_handling():
@@ -81,8 +86,11 @@ def test_node_failure_handling():
     with pytest.raises(RuntimeError):
         asyncio.run(engine.execute_workflow(wf))
 
-    assert wf.nodes["1"].status.name == "FAILED"
-    assert wf.nodes["2"].status.name == "PENDING"
+    execution = asyncio.run(engine.list_executions(workflow_id="wf3"))[0]
+    nodes = _node_results(engine, execution["execution_id"])
+    assert execution["status"] == "failed"
+    assert nodes["1"]["status"] == "failed"
+    assert "2" not in nodes
 
 
 def test_condition_evaluation():
@@ -99,7 +107,227 @@ def test_condition_evaluation():
     wf.connections.append(WorkflowConnection("1", "2", ConnectionType.SUCCESS))
 
     engine = WorkflowEngine(registry, bus)
-    asyncio.run(engine.execute_workflow(wf))
+    nodes = _node_results(engine, asyncio.run(engine.execute_workflow(wf)))
+
+    assert nodes["1"]["status"] == "completed"
+    assert nodes["2"]["status"] == "skipped"
+
+
+class SlowAgent:
+    async def handle(self, message):
+        await asyncio.sleep(0.1)
+        return {"handled": message.get("action")}
+
+
+@pytest.mark.parametrize(
+    "connection_type", [ConnectionType.ERROR, ConnectionType.CONDITIONAL]
+)
+def test_non_success_input_waits_for_its_source(connection_type):
+    registry = AgentRegistry()
+    registry.register_agent("slow", SlowAgent(), {})
+    registry.register_agent("b", DummyAgent({"b": 2}), {})
+
+    wf = Workflow("wf_inputs", "declared inputs")
+    wf.add_node(WorkflowNode("a", "slow", {"action": "run"}))
+    wf.add_node(WorkflowNode("b", "b", {"action": "run"}))
+    wf.add_connection(WorkflowConnection("a", "b", connection_type))
+
+    engine = WorkflowEngine(registry, EventBus())
+    nodes = _node_results(engine, asyncio.run(engine.execute_workflow(wf)))
+
+    assert nodes["a"]["status"] == "completed"
+    assert nodes["b"]["status"] == "completed"
+
+
+class TrackingAgent:
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    async def handle(self, message):
+        self.tracker["current"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["current"])
+        await asyncio.sleep(0.05)
+        self.tracker["current"] -= 1
+        return {"handled": message.get("action")}
+
+
+def _fan_out_workflow(width):
+    wf = Workflow("wf_fan", "fan out")
+    wf.add_node(WorkflowNode("root", "t", {"action": "run"}))
+    wf.add_node(WorkflowNode("sink", "t", {"action": "run"}))
+    for i in range(width):
+        wf.add_node(WorkflowNode(f"branch_{i}", "t", {"action": "run"}))
+        wf.add_connection(WorkflowConnection("root", f"branch_{i}"))
+        wf.add_connection(WorkflowConnection(f"branch_{i}", "sink"))
+    return wf
+
+
+def test_independent_branches_run_concurrently():
+    tracker = {"current": 0, "peak": 0}
+    registry = AgentRegistry()
+    registry.register_agent("t", TrackingAgent(tracker), {})
+
+    wf = _fan_out_workflow(4)
+    engine = WorkflowEngine(registry, EventBus())
+    nodes = _node_results(engine, asyncio.run(engine.execute_workflow(wf)))
+
+    assert tracker["peak"] == 4
+    assert len(nodes) == len(wf.nodes)
+    assert all(n["status"] == "completed" for n in nodes.values())
+
+
+def test_max_concurrency_limits_running_nodes():
+    tracker = {"current": 0, "peak": 0}
+    registry = AgentRegistry()
+    registry.register_agent("t", TrackingAgent(tracker), {})
+
+    wf = _fan_out_workflow(6)
+    engine = WorkflowEngine(registry, EventBus(), max_concurrency=2)
+    nodes = _node_results(engine, asyncio.run(engine.execute_workflow(wf)))
+
+    assert tracker["peak"] == 2
+    assert nodes["sink"]["status"] == "completed"
+
+
+def test_submit_workflow_runs_in_background():
+    registry = AgentRegistry()
+    registry.register_agent("a", DummyAgent({"a": 1}), {})
+
+    wf = Workflow("wf_bg", "background")
+    wf.add_node(WorkflowNode("1", "a", {"action": "run"}))
+    engine = WorkflowEngine(registry, EventBus())
+
+    async def scenario():
+        execution_id = engine.submit_workflow(wf)
+        job = engine.get_job(execution_id)
+        assert job.status.value in {"queued", "running"}
+        await job.task
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.status.value == "completed"
+    assert job.result["results"]["1"]["result"]["a"] == 1
+    assert job.to_dict()["nodes"]["1"]["status"] == "completed"
+
+    # El job terminado sale de memoria; el resultado se lee del store
+    assert engine.get_job(job.execution_id) is None
+    record = asyncio.run(engine.get_execution(job.execution_id, include_results=True))
+    assert record["status"] == "completed"
+    assert record["result"]["results"]["1"]["result"]["a"] == 1
+
+
+def test_cancel_background_execution():
+    class SlowAgent:
+        async def handle(self, message):
+            await asyncio.sleep(10)
+
+    registry = AgentRegistry()
+    registry.register_agent("slow", SlowAgent(), {})
+
+    wf = Workflow("wf_cancel", "cancel")
+    wf.add_node(WorkflowNode("1", "slow", {"action": "run"}))
+    bus = EventBus()
+    cancelled = []
+    bus.subscribe("workflow_cancelled", lambda data: cancelled.append(data))
+    engine = WorkflowEngine(registry, bus)
+
+    async def scenario():
+        execution_id = engine.submit_workflow(wf)
+        await asyncio.sleep(0.01)
+        assert engine.cancel_execution(execution_id) is True
+        job = engine.get_job(execution_id)
+        await job.task
+
+        # En primer plano también se emite el evento terminal
+        task = asyncio.create_task(engine.execute_workflow(wf))
+        await asyncio.sleep(0.01)
+        assert engine.cancel_execution(next(iter(engine.active_executions)))
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.status.value == "cancelled"
+    assert engine.cancel_execution(job.execution_id) is False
+    assert len(cancelled) == 2
+    assert cancelled[0]["execution_id"] == job.execution_id
+
+
+def test_finished_execution_is_persisted_in_store():
+    registry = AgentRegistry()
+    registry.register_agent("a", DummyAgent({"a": 1}), {})
+
+    wf = Workflow("wf_store", "store")
+    wf.add_node(WorkflowNode("1", "a", {"action": "run"}))
+    engine = WorkflowEngine(registry, EventBus())
+
+    execution_id = asyncio.run(engine.execute_workflow(wf))
+
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    assert record["status"] == "completed"
+    assert record["nodes"]["1"]["result"]["a"] == 1
+    latest = asyncio.run(engine.list_executions(workflow_id="wf_store"))[0]
+    assert latest["execution_id"] == execution_id
+
+
+def test_blocking_store_calls_run_off_the_event_loop():
+    import threading
+
+    from agenthub.execution_store import InMemoryExecutionStore
+
+    class SlowStore(InMemoryExecutionStore):
+        blocking = True
+        threads = set()
+
+        def save_execution(self, record):
+            self.threads.add(threading.current_thread())
+            super().save_execution(record)
+
+        def add_node_result(self, execution_id, node_id, data):
+            self.threads.add(threading.current_thread())
+            super().add_node_result(execution_id, node_id, data)
+
+        def get_execution(self, execution_id, include_results=True):
+            self.threads.add(threading.current_thread())
+            return super().get_execution(execution_id, include_results)
+
+    registry = AgentRegistry()
+    registry.register_agent("a", DummyAgent(), {})
+    wf = Workflow("wf_slow_store", "store")
+    wf.add_node(WorkflowNode("1", "a", {"action": "run"}))
+    store = SlowStore()
+    engine = WorkflowEngine(registry, EventBus(), execution_store=store)
+
+    execution_id = asyncio.run(engine.execute_workflow(wf))
+
+    assert threading.main_thread() not in store.threads
+    assert asyncio.run(engine.get_execution(execution_id))["status"] == "completed"
+
+
+def test_concurrent_executions_keep_isolated_node_state():
+    class EchoAgent:
+        async def handle(self, message):
+            await asyncio.sleep(0.02)
+            return {"value": message["data"]["value"]}
+
+    registry = AgentRegistry()
+    registry.register_agent("echo", EchoAgent(), {})
+
+    wf = Workflow("wf_shared", "shared definition")
+    wf.add_node(WorkflowNode("1", "echo", {"action": "run"}))
+    engine = WorkflowEngine(registry, EventBus())
+
+    async def scenario():
+        return await asyncio.gather(
+            *(engine.execute_workflow(wf, {"value": i}) for i in range(5))
+        )
+
+    execution_ids = asyncio.run(scenario())
 
-    assert wf.nodes["1"].status.name == "COMPLETED"
-    assert wf.nodes["2"].status.name == "SKIPPED"
+    values = [
+        _node_results(engine, eid)["1"]["result"]["value"] for eid in execution_ids
+    ]
+    assert values == list(range(5))
+    assert not hasattr(wf.nodes["1"], "result")
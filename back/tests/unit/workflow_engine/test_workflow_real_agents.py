@@ -32,9 +32,11 @@ def test_simple_workflow_backend_agent():
         "operations": ["create"],
     }
 
-    asyncio.run(engine.execute_workflow(wf, initial_data))
+    execution_id = asyncio.run(engine.execute_workflow(wf, initial_data))
+    record = asyncio.run(engine.get_execution(execution_id, include_results=True))
+    nodes = record["nodes"]
 
-    assert wf.nodes["1"].status.name == "COMPLETED"
-    assert wf.nodes["2"].status.name == "COMPLETED"
-    assert "crud_code" in wf.nodes["2"].result.get("data", {})
+    assert nodes["1"]["status"] == "completed"
+    assert nodes["2"]["status"] == "completed"
+    assert "crud_code" in nodes["2"]["result"].get("data", {})
 
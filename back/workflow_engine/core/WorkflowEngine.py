@@ -3,12 +3,28 @@
 # Motor de workflows visuales para IOPeer
 # ============================================
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
 from datetime import datetime
 import asyncio
-import json
+import threading
+import uuid
 from enum import Enum
-from fastapi import WebSocket
+
+from agenthub.agents.base_agent import StreamAssembler
+from agenthub.execution_store import (
+    ENGINE_SOURCE,
+    ExecutionStore,
+    InMemoryExecutionStore,
+    store_call,
+)
+
+from .cache import NodeResultCache, node_cache_key
+from .executors import AgentPoolManager, iterate_sync_stream
+from .conditions import evaluate_condition, get_condition
+from .events import EventBus  # noqa: F401
+from .plan import ExecutionPlan
+from .policies import NodePolicies, NodeTimeoutError, WorkflowTimeoutError
 
 
 class NodeStatus(Enum):
@@ -32,14 +48,44 @@ class WorkflowNode:
         self.id = node_id
         self.agent_type = agent_type  # "ui_generator", "backend_agent", etc.
         self.config = config
-        self.status = NodeStatus.PENDING
         self.inputs: List[str] = []  # IDs de nodos que alimentan este
         self.outputs: List[Dict[str, Any]] = []  # Conexiones salientes
+
+
+class NodeRunState:
+    """Estado de un nodo dentro de una ejecución concreta.
+
+    La definición (WorkflowNode) es compartida e inmutable durante la
+    ejecución; cada WorkflowExecution guarda un NodeRunState por ordinal.
+    """
+
+    __slots__ = ("status", "result", "error", "started_at", "completed_at", "attempts")
+
+    def __init__(self):
+        self.status = NodeStatus.PENDING
+        self.attempts = 0
         self.result: Optional[Dict[str, Any]] = None
         self.error: Optional[str] = None
         self.started_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
 
+    @property
+    def duration(self) -> float:
+        if self.started_at and self.completed_at:
+            return (self.completed_at - self.started_at).total_seconds()
+        return 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status.value,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+            "error": self.error,
+            "attempts": self.attempts,
+        }
+
 
 class WorkflowConnection:
     """Conexión entre dos nodos"""
@@ -68,40 +114,221 @@ class Workflow:
         self.status = NodeStatus.PENDING
         self.created_at = datetime.now()
         self.metadata: Dict[str, Any] = {}
+        # Versión estructural: cambia con cada nodo o conexión añadidos
+        self.version = 0
+        self._plan: Optional[ExecutionPlan] = None
+        self._plan_signature: Optional[Tuple[int, int, int]] = None
 
     def add_node(self, node: "WorkflowNode") -> None:
-        """Añade un nodo al workflow"""
+        """Añade un nodo al workflow (compila su condición si la tiene)"""
+        condition = node.config.get("condition")
+        if condition:
+            get_condition(condition)
         self.nodes[node.id] = node
+        self.version += 1
 
     def add_connection(self, connection: "WorkflowConnection") -> None:
         """Registra una conexión entre nodos"""
+        if connection.condition:
+            get_condition(connection.condition)
         self.connections.append(connection)
         target = self.nodes.get(connection.target_id)
         if target and connection.source_id not in target.inputs:
             target.inputs.append(connection.source_id)
+        self.version += 1
+
+    def invalidate_plan(self) -> None:
+        """Descarta el plan cacheado tras modificar nodos/conexiones a mano"""
+        self.version += 1
+
+    def get_execution_plan(self) -> ExecutionPlan:
+        """Retorna el plan de ejecución, recalculándolo solo si el grafo cambió"""
+
+        signature = (self.version, len(self.nodes), len(self.connections))
+        if self._plan is None or self._plan_signature != signature:
+            self._plan = ExecutionPlan(
+                list(self.nodes),
+                (
+                    (c.source_id, c.target_id)
+                    for c in self.connections
+                    if c.type == ConnectionType.SUCCESS
+                ),
+                {node_id: node.inputs for node_id, node in self.nodes.items()},
+            )
+            self._plan_signature = signature
+        return self._plan
+
+
+class ExecutionStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ExecutionJob:
+    """Handle de una ejecución lanzada en segundo plano"""
+
+    def __init__(self, execution: "WorkflowExecution"):
+        self.execution = execution
+        self.execution_id = execution.execution_id
+        self.workflow_id = execution.workflow.id
+        self.status = ExecutionStatus.QUEUED
+        self.task: Optional[asyncio.Task] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (
+            ExecutionStatus.COMPLETED,
+            ExecutionStatus.FAILED,
+            ExecutionStatus.CANCELLED,
+        )
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        """Resumen serializable del estado de la ejecución"""
+        data = {
+            "execution_id": self.execution_id,
+            "workflow_id": self.workflow_id,
+            "workflow_name": self.execution.workflow.name,
+            "status": self.status.value,
+            "started_at": self.execution.started_at.isoformat(),
+            "submitted_at": self.submitted_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration": self.execution.get_duration(),
+            "nodes": self.execution.get_progress(),
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
 
 
 class WorkflowEngine:
     """Motor principal de ejecución de workflows"""
 
-    def __init__(self, agent_registry, event_bus):
+    # Nodos ejecutados simultáneamente por defecto en cada ejecución
+    DEFAULT_MAX_CONCURRENCY = 5
+    # Ejecuciones en segundo plano corriendo a la vez
+    DEFAULT_MAX_BACKGROUND_EXECUTIONS = 10
+
+    def __init__(
+        self,
+        agent_registry,
+        event_bus,
+        max_concurrency: Optional[int] = None,
+        max_background_executions: Optional[int] = None,
+        execution_store: Optional[ExecutionStore] = None,
+        result_cache: Optional[NodeResultCache] = None,
+        node_policies: Optional[NodePolicies] = None,
+        workflow_timeout: Optional[float] = None,
+        agent_pools: Optional[AgentPoolManager] = None,
+    ):
         self.agent_registry = agent_registry
         self.event_bus = event_bus
+        self.max_concurrency = max_concurrency or self.DEFAULT_MAX_CONCURRENCY
+        self.max_background_executions = (
+            max_background_executions or self.DEFAULT_MAX_BACKGROUND_EXECUTIONS
+        )
+        self.execution_store = execution_store or InMemoryExecutionStore()
+        self.result_cache = result_cache
+        # Timeouts/reintentos por nodo y deadline por defecto de cada ejecución
+        self.node_policies = node_policies or NodePolicies()
+        self.workflow_timeout = workflow_timeout
+        # Pools por clase de agente para los agentes sincrónicos
+        self.agent_pools = agent_pools or AgentPoolManager()
         self.active_executions: Dict[str, "WorkflowExecution"] = {}
+        # Solo jobs encolados o en curso; los terminados viven en execution_store
+        self.jobs: Dict[str, ExecutionJob] = {}
+        self._job_slots: Optional[asyncio.Semaphore] = None
+
+    def _create_execution(
+        self, workflow: Workflow, initial_data: Optional[Dict[str, Any]]
+    ) -> "WorkflowExecution":
+        """Crea el contexto de ejecución con un id único"""
+
+        execution_id = (
+            f"exec_{workflow.id}_{int(datetime.now().timestamp())}"
+            f"_{uuid.uuid4().hex[:8]}"
+        )
+        return WorkflowExecution(
+            execution_id,
+            workflow,
+            initial_data,
+            self.event_bus,
+            max_concurrency=self.max_concurrency,
+            execution_store=self.execution_store,
+            result_cache=self.result_cache,
+            node_policies=self.node_policies,
+            agent_pools=self.agent_pools,
+        )
+
+    async def _save_execution(
+        self, execution: "WorkflowExecution", status: ExecutionStatus
+    ) -> None:
+        """Crea o reemplaza el registro persistente de una ejecución"""
+
+        await store_call(
+            self.execution_store,
+            "save_execution",
+            {
+                "execution_id": execution.execution_id,
+                "workflow_id": execution.workflow.id,
+                "workflow_name": execution.workflow.name,
+                "source": ENGINE_SOURCE,
+                "status": status.value,
+                "started_at": execution.started_at,
+            },
+        )
+
+    async def _finish_execution(
+        self,
+        execution: "WorkflowExecution",
+        status: ExecutionStatus,
+        error: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Marca la ejecución como terminada en el store (con su resultado)"""
+
+        execution.completed_at = execution.completed_at or datetime.now()
+        fields: Dict[str, Any] = {
+            "status": status.value,
+            "finished_at": execution.completed_at,
+            "duration": execution.get_duration(),
+            "error": error,
+        }
+        if result is not None:
+            fields["result"] = result
+        await store_call(
+            self.execution_store,
+            "update_execution",
+            execution.execution_id,
+            **fields,
+        )
 
     async def execute_workflow(
         self, workflow: Workflow, initial_data: Dict[str, Any] = None
     ) -> str:
         """Ejecuta un workflow completo"""
 
-        execution_id = f"exec_{workflow.id}_{int(datetime.now().timestamp())}"
+        execution = self._create_execution(workflow, initial_data)
+        await self._run_execution(execution)
+        return execution.execution_id
 
-        # Crear contexto de ejecución
-        execution = WorkflowExecution(
-            execution_id, workflow, initial_data, self.event_bus
-        )
+    async def _run_execution(self, execution: "WorkflowExecution") -> Dict[str, Any]:
+        """Corre una ejecución emitiendo los eventos de ciclo de vida"""
 
+        execution_id = execution.execution_id
+        workflow = execution.workflow
+        execution.task = asyncio.current_task()
         self.active_executions[execution_id] = execution
+        # metadata["timeout"] del workflow tiene prioridad sobre el global
+        timeout = workflow.metadata.get("timeout", self.workflow_timeout)
+        await self._save_execution(execution, ExecutionStatus.RUNNING)
 
         try:
             # Emitir evento de inicio
@@ -114,24 +341,51 @@ class WorkflowEngine:
                 },
             )
 
-            # Ejecutar workflow
-            result = await execution.run(self.agent_registry)
+            # Ejecutar workflow con deadline global
+            try:
+                result = await asyncio.wait_for(
+                    execution.run(self.agent_registry), timeout
+                )
+            except asyncio.TimeoutError:
+                if timeout is None or execution.get_duration() < timeout:
+                    raise
+                raise WorkflowTimeoutError(
+                    f"Workflow exceeded its {timeout}s deadline"
+                ) from None
+            await self._finish_execution(
+                execution, ExecutionStatus.COMPLETED, result=result
+            )
 
             # Emitir evento de finalización
             await self.event_bus.emit(
                 "workflow_completed",
                 {
                     "execution_id": execution_id,
+                    "workflow_id": workflow.id,
                     "result": result,
                     "duration": execution.get_duration(),
                 },
             )
 
-            return execution_id
+            return result
 
+        except asyncio.CancelledError:
+            await self._finish_execution(execution, ExecutionStatus.CANCELLED)
+            # Evento terminal también para las ejecuciones en primer plano
+            await self.event_bus.emit(
+                "workflow_cancelled",
+                {"execution_id": execution_id, "workflow_id": workflow.id},
+            )
+            raise
         except Exception as e:
+            await self._finish_execution(execution, ExecutionStatus.FAILED, str(e))
             await self.event_bus.emit(
-                "workflow_failed", {"execution_id": execution_id, "error": str(e)}
+                "workflow_failed",
+                {
+                    "execution_id": execution_id,
+                    "workflow_id": workflow.id,
+                    "error": str(e),
+                },
             )
             raise
         finally:
@@ -139,6 +393,123 @@ class WorkflowEngine:
             if execution_id in self.active_executions:
                 del self.active_executions[execution_id]
 
+    # ------------------------------------------------------------------
+    # Ejecución en segundo plano
+    # ------------------------------------------------------------------
+
+    def submit_workflow(
+        self, workflow: Workflow, initial_data: Dict[str, Any] = None
+    ) -> str:
+        """Encola un workflow para ejecutarse en segundo plano y retorna su id"""
+
+        if self._job_slots is None:
+            self._job_slots = asyncio.Semaphore(self.max_background_executions)
+
+        job = ExecutionJob(self._create_execution(workflow, initial_data))
+        self.jobs[job.execution_id] = job
+        # Los clientes siguen los jobs tras recibir el id: se guarda su replay
+        self.event_bus.retain(job.execution_id)
+        job.task = asyncio.create_task(self._run_job(job))
+        return job.execution_id
+
+    async def _run_job(self, job: ExecutionJob) -> None:
+        """Ejecuta un job respetando el límite de ejecuciones simultáneas"""
+
+        try:
+            await self._save_execution(job.execution, ExecutionStatus.QUEUED)
+            async with self._job_slots:
+                job.status = ExecutionStatus.RUNNING
+                job.result = await self._run_execution(job.execution)
+                job.status = ExecutionStatus.COMPLETED
+        except asyncio.CancelledError:
+            if job.status == ExecutionStatus.QUEUED:
+                # Cancelado antes de empezar: el store sigue en "queued" y
+                # _run_execution no llegó a emitir el evento terminal
+                await self._finish_execution(job.execution, ExecutionStatus.CANCELLED)
+                await self.event_bus.emit(
+                    "workflow_cancelled",
+                    {"execution_id": job.execution_id, "workflow_id": job.workflow_id},
+                )
+            job.status = ExecutionStatus.CANCELLED
+        except Exception as e:
+            job.status = ExecutionStatus.FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            job.execution.completed_at = job.execution.completed_at or job.finished_at
+            self.jobs.pop(job.execution_id, None)
+
+    def get_job(self, execution_id: str) -> Optional[ExecutionJob]:
+        """Obtiene el job de una ejecución en segundo plano todavía activa"""
+        return self.jobs.get(execution_id)
+
+    async def get_execution(
+        self, execution_id: str, include_results: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Estado de una ejecución: en vivo si está activa, si no desde el store"""
+
+        job = self.jobs.get(execution_id)
+        if job:
+            return job.to_dict(include_result=include_results)
+        return await store_call(
+            self.execution_store,
+            "get_execution",
+            execution_id,
+            include_results=include_results,
+        )
+
+    async def get_node_result(
+        self, execution_id: str, node_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Resultado de un nodo (referenciado por eventos truncados)"""
+
+        record = await store_call(
+            self.execution_store, "get_execution", execution_id, include_results=True
+        )
+        if record is None:
+            return None
+        return record.get("nodes", {}).get(node_id)
+
+    async def list_executions(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Lista ejecuciones del store (workflow_id, status, since, until, limit)"""
+        return await store_call(
+            self.execution_store, "list_executions", source=ENGINE_SOURCE, **filters
+        )
+
+    async def list_executions_page(self, **filters: Any) -> Dict[str, Any]:
+        """Igual que ``list_executions`` pero paginado por cursor"""
+        return await store_call(
+            self.execution_store, "list_page", source=ENGINE_SOURCE, **filters
+        )
+
+    def cancel_execution(self, execution_id: str) -> bool:
+        """Cancela una ejecución en curso; retorna False si ya terminó"""
+
+        job = self.jobs.get(execution_id)
+        if job:
+            if job.done or not job.task:
+                return False
+            job.task.cancel()
+            return True
+
+        # Ejecución síncrona (execute_workflow) todavía activa
+        execution = self.active_executions.get(execution_id)
+        if not execution or not execution.task or execution.task.done():
+            return False
+        execution.task.cancel()
+        return True
+
+    async def shutdown(self) -> None:
+        """Cancela los jobs pendientes y espera a que terminen"""
+
+        tasks = [job.task for job in self.jobs.values() if job.task and not job.done]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.execution_store.close()
+        self.agent_pools.shutdown()
+
 
 class WorkflowExecution:
     """Contexto de ejecución de un workflow específico"""
@@ -149,41 +520,107 @@ class WorkflowExecution:
         workflow: Workflow,
         initial_data: Dict[str, Any],
         event_bus,
+        max_concurrency: int = WorkflowEngine.DEFAULT_MAX_CONCURRENCY,
+        execution_store: Optional[ExecutionStore] = None,
+        result_cache: Optional[NodeResultCache] = None,
+        node_policies: Optional[NodePolicies] = None,
+        agent_pools: Optional[AgentPoolManager] = None,
     ):
         self.execution_id = execution_id
         self.workflow = workflow
         self.initial_data = initial_data or {}
         self.event_bus = event_bus
+        self.max_concurrency = max(1, max_concurrency)
+        self.execution_store = execution_store
+        self.result_cache = result_cache
+        self.node_policies = node_policies or NodePolicies()
+        self.agent_pools = agent_pools
+        self.task: Optional[asyncio.Task] = None
         self.execution_context: Dict[str, Any] = {"initial_data": initial_data}
         self.started_at = datetime.now()
         self.completed_at: Optional[datetime] = None
 
-    async def run(self, agent_registry) -> Dict[str, Any]:
-        """Ejecuta el workflow usando topological sort"""
+        # Plan cacheado en el workflow (falla si hay ciclos) y estado propio
+        # de cada nodo indexado por ordinal: el grafo no se copia
+        self.plan: ExecutionPlan = workflow.get_execution_plan()
+        self.nodes: List[WorkflowNode] = [
+            workflow.nodes[node_id] for node_id in self.plan.node_ids
+        ]
+        self.node_states: List[NodeRunState] = [
+            NodeRunState() for _ in self.plan.node_ids
+        ]
 
-        # 1. Calcular orden de ejecución
-        execution_order = self._calculate_execution_order()
+    def get_node_state(self, node_id: str) -> NodeRunState:
+        """Estado del nodo en esta ejecución"""
+        return self.node_states[self.plan.index[node_id]]
 
-        # 2. Ejecutar nodos en orden
-        for node_id in execution_order:
-            node = self.workflow.nodes[node_id]
+    async def run(self, agent_registry) -> Dict[str, Any]:
+        """Ejecuta el workflow lanzando en paralelo los nodos listos"""
 
-            # Verificar si el nodo debe ejecutarse
-            if not self._should_execute_node(node):
-                node.status = NodeStatus.SKIPPED
-                continue
+        plan = self.plan
+
+        # Ejecutar por conjunto listo: cada nodo arranca cuando sus
+        # predecesores terminan, con un máximo de nodos simultáneos
+        in_degree = list(plan.in_degree)
+        ready = deque(i for i in plan.order if in_degree[i] == 0)
+        running: Dict[asyncio.Task, int] = {}
+        first_error: Optional[BaseException] = None
 
-            # Ejecutar nodo
-            await self._execute_node(node, agent_registry)
+        def unlock_successors(ordinal: int) -> None:
+            for neighbor in plan.successors[ordinal]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    ready.append(neighbor)
 
-            # Verificar si debe continuar
-            if node.status == NodeStatus.FAILED:
-                error_handled = await self._handle_node_error(node)
-                if not error_handled:
+        try:
+            while ready or running:
+                while (
+                    ready
+                    and first_error is None
+                    and len(running) < self.max_concurrency
+                ):
+                    ordinal = ready.popleft()
+                    node = self.nodes[ordinal]
+                    state = self.node_states[ordinal]
+
+                    # Verificar si el nodo debe ejecutarse
+                    if not self._should_execute_node(node):
+                        state.status = NodeStatus.SKIPPED
+                        await self._record_node_result(node, state)
+                        unlock_successors(ordinal)
+                        continue
+
+                    task = asyncio.create_task(
+                        self._execute_node(node, agent_registry, state)
+                    )
+                    running[task] = ordinal
+
+                if not running:
                     break
 
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    ordinal = running.pop(task)
+                    if task.exception() is not None:
+                        # No se lanzan nuevos nodos; se esperan los que siguen en curso
+                        first_error = first_error or task.exception()
+                        continue
+                    unlock_successors(ordinal)
+        finally:
+            # Cancelación cooperativa: se espera a que los nodos en curso
+            # terminen de limpiar antes de liberar el slot de la ejecución
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
         self.completed_at = datetime.now()
 
+        if first_error is not None:
+            raise first_error
+
         return {
             "execution_id": self.execution_id,
             "status": self._get_overall_status(),
@@ -191,17 +628,24 @@ class WorkflowExecution:
             "duration": self.get_duration(),
         }
 
-    async def _execute_node(self, node: WorkflowNode, agent_registry):
+    async def _execute_node(
+        self,
+        node: WorkflowNode,
+        agent_registry,
+        state: Optional[NodeRunState] = None,
+    ):
         """Ejecuta un nodo individual"""
 
-        node.status = NodeStatus.RUNNING
-        node.started_at = datetime.now()
+        state = state or self.get_node_state(node.id)
+        state.status = NodeStatus.RUNNING
+        state.started_at = datetime.now()
 
         # Emitir evento de inicio de nodo
         await self.event_bus.emit(
             "node_started",
             {
                 "execution_id": self.execution_id,
+                "workflow_id": self.workflow.id,
                 "node_id": node.id,
                 "agent_type": node.agent_type,
             },
@@ -215,51 +659,73 @@ class WorkflowExecution:
 
             # Preparar datos de entrada
             input_data = self._prepare_node_input(node)
+            action = node.config.get("action", "process")
+
+            # Caché de resultados solo para nodos deterministas que la piden
+            # con config["cache"] = True (un agente LLM daría resultados viejos)
+            cache_key = None
+            result = None
+            if self.result_cache is not None and node.config.get("cache") is True:
+                cache_key = node_cache_key(
+                    node.agent_type, action, node.config, input_data
+                )
+                result = self.result_cache.get(cache_key)
+            cached = result is not None
+
+            if not cached:
+                message = {
+                    "action": action,
+                    "data": input_data,
+                    "config": node.config,
+                }
+                result = await self._call_agent_with_retry(node, agent, message, state)
 
-
-
-            # Ejecutar agente (sincronico o asincronico)
-
-            message = {
-                "action": node.config.get("action", "process"),
-                "data": input_data,
-                "config": node.config,
-            }
-
-            if asyncio.iscoroutinefunction(agent.handle):
-                result = await agent.handle(message)
-            else:
-                result = await asyncio.to_thread(agent.handle, message)
-
+                # Las respuestas de error no se cachean
+                if cache_key is not None and not (
+                    isinstance(result, dict) and result.get("status") == "error"
+                ):
+                    self.result_cache.set(cache_key, result)
 
             # Guardar resultado
-            node.result = result
-            node.status = NodeStatus.COMPLETED
-            node.completed_at = datetime.now()
+            state.result = result
+            state.status = NodeStatus.COMPLETED
+            state.completed_at = datetime.now()
 
             # Actualizar contexto de ejecución
             self.execution_context[f"node_{node.id}"] = result
+            await self._record_node_result(node, state)
 
             # Emitir evento de nodo completado
             await self.event_bus.emit(
                 "node_completed",
                 {
                     "execution_id": self.execution_id,
+                    "workflow_id": self.workflow.id,
                     "node_id": node.id,
                     "result": result,
-                    "duration": (node.completed_at - node.started_at).total_seconds(),
+                    "duration": state.duration,
+                    "cached": cached,
                 },
             )
 
+        except asyncio.CancelledError:
+            state.status = NodeStatus.FAILED
+            state.error = "cancelled"
+            state.completed_at = datetime.now()
+            await self._record_node_result(node, state)
+            raise
+
         except Exception as e:
-            node.status = NodeStatus.FAILED
-            node.error = str(e)
-            node.completed_at = datetime.now()
+            state.status = NodeStatus.FAILED
+            state.error = str(e)
+            state.completed_at = datetime.now()
+            await self._record_node_result(node, state)
 
             await self.event_bus.emit(
                 "node_failed",
                 {
                     "execution_id": self.execution_id,
+                    "workflow_id": self.workflow.id,
                     "node_id": node.id,
                     "error": str(e),
                 },
@@ -267,37 +733,151 @@ class WorkflowExecution:
 
             raise
 
-    def _calculate_execution_order(self) -> List[str]:
-        """Calcula el orden de ejecución usando topological sort"""
-
-        # Crear grafo de dependencias
-        graph = {node_id: [] for node_id in self.workflow.nodes.keys()}
-        in_degree = {node_id: 0 for node_id in self.workflow.nodes.keys()}
+    async def _call_agent_with_retry(
+        self,
+        node: WorkflowNode,
+        agent,
+        message: Dict[str, Any],
+        state: NodeRunState,
+    ) -> Any:
+        """Llama al agente aplicando el timeout y la política de reintentos"""
+
+        timeout, retry = self.node_policies.resolve(node.agent_type, node.config)
+        attempt = 0
+        while True:
+            attempt += 1
+            state.attempts = attempt
+            try:
+                return await self._call_agent(node, agent, message, timeout)
+            except Exception as e:
+                if not retry.should_retry(attempt, e):
+                    raise
+                delay = retry.backoff(attempt)
+                await self.event_bus.emit(
+                    "node_retry",
+                    {
+                        "execution_id": self.execution_id,
+                        "workflow_id": self.workflow.id,
+                        "node_id": node.id,
+                        "attempt": attempt,
+                        "error": str(e),
+                        "delay": delay,
+                    },
+                )
+                await asyncio.sleep(delay)
+
+    async def _call_agent(
+        self,
+        node: WorkflowNode,
+        agent,
+        message: Dict[str, Any],
+        timeout: Optional[float],
+    ) -> Any:
+        """Ejecuta el agente (sincrónico o asincrónico) con timeout.
+
+        Los agentes sincrónicos corren en un hilo que no puede interrumpirse;
+        reciben ``cancel_event`` en el mensaje para abortar cooperativamente
+        cuando el nodo expira o la ejecución se cancela. Si el agente ofrece
+        ``stream`` para la acción, sus fragmentos se publican según llegan.
+        """
+
+        cancel_event = threading.Event()
+        message = {**message, "cancel_event": cancel_event}
+        chunks = self._open_stream(node, agent, message)
+        if chunks is not None:
+            call = self._consume_stream(node, agent, chunks, cancel_event)
+        elif asyncio.iscoroutinefunction(agent.handle):
+            call = agent.handle(message)
+        elif self.agent_pools is not None:
+            call = self.agent_pools.run(agent, message)
+        else:
+            call = asyncio.to_thread(agent.handle, message)
 
-        # Construir grafo
-        for connection in self.workflow.connections:
-            if connection.type == ConnectionType.SUCCESS:
-                graph[connection.source_id].append(connection.target_id)
-                in_degree[connection.target_id] += 1
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            raise NodeTimeoutError(
+                f"Agent '{node.agent_type}' timed out after {timeout}s"
+            ) from None
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
 
-        # Topological sort
-        queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
-        execution_order = []
+    def _open_stream(self, node: WorkflowNode, agent, message: Dict[str, Any]):
+        """Generador de fragmentos del agente, o None para usar ``handle``"""
 
-        while queue:
-            current = queue.pop(0)
-            execution_order.append(current)
+        opener = getattr(agent, "stream", None)
+        if not callable(opener) or node.config.get("stream", True) is False:
+            return None
+        pools = self.agent_pools
+        if pools is not None and not pools.supports_streaming(agent):
+            return None
+        return opener(message)
 
-            for neighbor in graph[current]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
+    async def _consume_stream(
+        self,
+        node: WorkflowNode,
+        agent,
+        chunks,
+        cancel_event: threading.Event,
+    ) -> Any:
+        """Publica cada fragmento como ``node_progress`` y arma el resultado.
+
+        Tras un ``node_retry`` el stream empieza de nuevo (``offset`` 0).
+        """
+
+        if hasattr(chunks, "__aiter__"):
+            iterator = chunks
+        elif self.agent_pools is not None:
+            iterator = self.agent_pools.stream(agent, chunks, cancel_event)
+        else:
+            loop = asyncio.get_running_loop()
+            iterator = iterate_sync_stream(
+                chunks, lambda fn: loop.run_in_executor(None, fn), cancel_event
+            )
 
-        # Verificar ciclos
-        if len(execution_order) != len(self.workflow.nodes):
-            raise Exception("Workflow contains cycles")
+        assembler = StreamAssembler()
+        async for chunk in iterator:
+            delta = assembler.add(chunk)
+            if delta is None:
+                continue
+            await self.event_bus.emit(
+                "node_progress",
+                {
+                    "execution_id": self.execution_id,
+                    "workflow_id": self.workflow.id,
+                    "node_id": node.id,
+                    **delta,
+                },
+            )
+        return assembler.build()
+
+    async def _record_node_result(
+        self, node: WorkflowNode, state: NodeRunState
+    ) -> None:
+        """Envía el resultado del nodo al store (escritura por lotes)"""
+
+        if self.execution_store is None:
+            return
+        await store_call(
+            self.execution_store,
+            "add_node_result",
+            self.execution_id,
+            node.id,
+            {
+                "agent_type": node.agent_type,
+                "status": state.status.value,
+                "result": state.result,
+                "error": state.error,
+                "duration": state.duration,
+                "attempts": state.attempts,
+            },
+        )
 
-        return execution_order
+    def _calculate_execution_order(self) -> List[str]:
+        """Calcula el orden de ejecución usando topological sort"""
+        return self.plan.execution_order
 
     def _prepare_node_input(self, node: WorkflowNode) -> Dict[str, Any]:
         """Prepara los datos de entrada para un nodo"""
@@ -318,10 +898,12 @@ class WorkflowExecution:
     def _should_execute_node(self, node: WorkflowNode) -> bool:
         """Determina si un nodo debe ejecutarse"""
 
-        # Verificar dependencias
-        for input_node_id in node.inputs:
-            input_node = self.workflow.nodes[input_node_id]
-            if input_node.status not in [NodeStatus.COMPLETED, NodeStatus.SKIPPED]:
+        # Verificar dependencias (predecesores precalculados en el plan)
+        for ordinal in self.plan.inputs[self.plan.index[node.id]]:
+            if self.node_states[ordinal].status not in (
+                NodeStatus.COMPLETED,
+                NodeStatus.SKIPPED,
+            ):
                 return False
 
         # Verificar condiciones específicas del nodo
@@ -334,53 +916,16 @@ class WorkflowExecution:
     def _evaluate_condition(self, condition: str) -> bool:
         """Evalúa una condición lógica de forma segura."""
 
-        import ast
-
-        def _safe_eval(expr: str, variables: Dict[str, Any]) -> bool:
-            """Evalúa la expresión permitiendo solo operaciones seguras."""
-
-            allowed_nodes = (
-                ast.Expression,
-                ast.BoolOp,
-                ast.BinOp,
-                ast.UnaryOp,
-                ast.Compare,
-                ast.Name,
-                ast.Load,
-                ast.Constant,
-                ast.And,
-                ast.Or,
-                ast.Not,
-                ast.Eq,
-                ast.NotEq,
-                ast.Lt,
-                ast.LtE,
-                ast.Gt,
-                ast.GtE,
-                ast.In,
-                ast.NotIn,
-                ast.Dict,
-                ast.Subscript,
-            )
-
-            tree = ast.parse(expr, mode="eval")
-            for node in ast.walk(tree):
-                if not isinstance(node, allowed_nodes):
-                    raise ValueError("Unsafe expression")
-                if isinstance(node, ast.Name) and node.id not in variables and node.id not in {"True", "False"}:
-                    raise ValueError(f"Unknown variable '{node.id}'")
+        # La expresión se compila una sola vez y se evalúa contra el contexto
+        # sin sustituir texto; si es inválida o maliciosa el nodo no se ejecuta
+        return evaluate_condition(condition, self.execution_context)
 
-            compiled = compile(tree, "<expr>", "eval")
-            return bool(eval(compiled, {"__builtins__": {}}, variables))
-
-        try:
-            for key, value in self.execution_context.items():
-                condition = condition.replace(f"{{{key}}}", repr(value))
-
-            return _safe_eval(condition, self.execution_context)
-        except Exception:
-            # Si la expresión es maliciosa o inválida, no ejecutar el nodo
-            return False
+    def get_progress(self) -> Dict[str, Dict[str, Any]]:
+        """Estado actual de cada nodo de la ejecución"""
+        return {
+            node.id: state.to_dict()
+            for node, state in zip(self.nodes, self.node_states)
+        }
 
     def get_duration(self) -> float:
         """Retorna la duración de la ejecución en segundos"""
@@ -390,7 +935,7 @@ class WorkflowExecution:
 
     def _get_overall_status(self) -> str:
         """Determina el estado general del workflow"""
-        statuses = [node.status for node in self.workflow.nodes.values()]
+        statuses = [state.status for state in self.node_states]
 
         if NodeStatus.FAILED in statuses:
             return "failed"
@@ -405,17 +950,13 @@ class WorkflowExecution:
         """Recopila todos los resultados del workflow"""
         results = {}
 
-        for node_id, node in self.workflow.nodes.items():
-            if node.result:
-                results[node_id] = {
+        for node, state in zip(self.nodes, self.node_states):
+            if state.result:
+                results[node.id] = {
                     "agent_type": node.agent_type,
-                    "result": node.result,
-                    "duration": (
-                        (node.completed_at - node.started_at).total_seconds()
-                        if node.completed_at and node.started_at
-                        else 0
-                    ),
-                    "status": node.status.value,
+                    "result": state.result,
+                    "duration": state.duration,
+                    "status": state.status.value,
                 }
 
         return results
@@ -451,56 +992,3 @@ class AgentRegistry:
     def get_agent_definition(self, agent_type: str) -> Dict[str, Any]:
         """Retorna la definición de un agente específico"""
         return self.agent_definitions.get(agent_type, {})
-
-
-# ============================================
-# Event Bus para comunicación en tiempo real
-# ============================================
-
-
-class EventBus:
-    """Sistema de eventos para comunicación en tiempo real"""
-
-    def __init__(self):
-        self.listeners: Dict[str, List[callable]] = {}
-        self.websocket_connections: List[Any] = []
-
-    def subscribe(self, event_type: str, callback: callable):
-        """Suscribe un callback a un tipo de evento"""
-        if event_type not in self.listeners:
-            self.listeners[event_type] = []
-        self.listeners[event_type].append(callback)
-
-    async def emit(self, event_type: str, data: Dict[str, Any]):
-        """Emite un evento a todos los listeners"""
-
-        # Ejecutar callbacks locales
-        if event_type in self.listeners:
-            for callback in self.listeners[event_type]:
-                try:
-                    await callback(data)
-                except Exception as e:
-                    print(f"Error in event callback: {e}")
-
-        # Enviar a conexiones WebSocket
-        await self._broadcast_to_websockets(event_type, data)
-
-    async def _broadcast_to_websockets(self, event_type: str, data: Dict[str, Any]):
-        """Envía eventos a todas las conexiones WebSocket activas"""
-        message = {
-            "type": event_type,
-            "data": data,
-            "timestamp": datetime.now().isoformat(),
-        }
-
-
-        disconnects: List[WebSocket] = []
-        for websocket in list(self.websocket_connections):
-            try:
-                await websocket.send_json(message)
-            except Exception:
-                disconnects.append(websocket)
-
-        for websocket in disconnects:
-            if websocket in self.websocket_connections:
-                self.websocket_connections.remove(websocket)
@@ -0,0 +1,103 @@
+# ============================================
+# back/workflow_engine/core/cache.py
+# Caché de resultados de nodos por contenido
+# ============================================
+
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import time
+
+
+def node_cache_key(
+    agent_type: str, action: str, config: Dict[str, Any], input_data: Dict[str, Any]
+) -> str:
+    """Hash estable de (agent_type, action, config, input)"""
+
+    payload = json.dumps(
+        [agent_type, action, config, input_data],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NodeResultCache:
+    """Caché LRU con TTL y límite de tamaño en bytes para resultados de nodos"""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, size, result)
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna una copia del resultado cacheado o None"""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, result = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(result)
+
+    def set(self, key: str, result: Any) -> bool:
+        """Guarda un resultado; retorna False si no entra en la caché"""
+
+        size = len(json.dumps(result, default=str).encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        self._entries[key] = (time.monotonic() + ttl, size, copy.deepcopy(result))
+        self.total_bytes += size
+
+        while (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
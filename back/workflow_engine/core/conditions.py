@@ -0,0 +1,119 @@
+# ============================================
+# back/workflow_engine/core/conditions.py
+# Evaluación segura de condiciones compiladas una sola vez
+# ============================================
+
+from typing import Any, Dict, Mapping, Tuple, Union
+from functools import lru_cache
+import ast
+import re
+
+# Expresiones compiladas compartidas entre workflows y ejecuciones
+CONDITION_CACHE_SIZE = 512
+
+# Placeholders "{clave}" que referencian entradas del contexto de ejecución
+PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][\w.\-]*)\}")
+_ALIAS_PREFIX = "__ctx_"
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.And,
+    ast.Or,
+    ast.Not,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.Dict,
+    ast.Subscript,
+)
+
+
+class CompiledCondition:
+    """Condición validada y compilada, evaluable contra cualquier contexto"""
+
+    __slots__ = ("source", "code", "bindings")
+
+    def __init__(self, source: str, code, bindings: Tuple[Tuple[str, str], ...]):
+        self.source = source
+        self.code = code
+        # (nombre en la expresión, clave en el contexto)
+        self.bindings = bindings
+
+    def evaluate(self, context: Mapping[str, Any]) -> bool:
+        """Evalúa la condición; lanza KeyError si falta una variable"""
+
+        variables: Dict[str, Any] = {}
+        for name, key in self.bindings:
+            if key not in context:
+                raise KeyError(f"Unknown variable '{key}'")
+            variables[name] = context[key]
+        return bool(eval(self.code, {"__builtins__": {}}, variables))
+
+
+def compile_condition(expression: str) -> CompiledCondition:
+    """Parsea, valida y compila una condición; lanza ValueError si es insegura"""
+
+    aliases: Dict[str, str] = {}
+
+    def to_alias(match: "re.Match[str]") -> str:
+        key = match.group(1)
+        alias = aliases.setdefault(key, f"{_ALIAS_PREFIX}{len(aliases)}")
+        return alias
+
+    rewritten = PLACEHOLDER_RE.sub(to_alias, expression)
+
+    try:
+        tree = ast.parse(rewritten, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition: {e.msg}") from e
+
+    alias_to_key = {alias: key for key, alias in aliases.items()}
+    names: Dict[str, str] = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError("Unsafe expression")
+        if isinstance(node, ast.Name):
+            names[node.id] = alias_to_key.get(node.id, node.id)
+
+    code = compile(tree, "<condition>", "eval")
+    return CompiledCondition(expression, code, tuple(names.items()))
+
+
+@lru_cache(maxsize=CONDITION_CACHE_SIZE)
+def _cached_condition(expression: str) -> Union[CompiledCondition, str]:
+    try:
+        return compile_condition(expression)
+    except ValueError as e:
+        # También se cachean los errores para no re-parsear condiciones
+        # inválidas; solo el mensaje, no la excepción con su traceback
+        return str(e)
+
+
+def get_condition(expression: str) -> CompiledCondition:
+    """Retorna la condición compilada desde la caché compartida"""
+
+    compiled = _cached_condition(expression)
+    if isinstance(compiled, str):
+        raise ValueError(compiled)
+    return compiled
+
+
+def evaluate_condition(expression: str, context: Mapping[str, Any]) -> bool:
+    """Evalúa una condición; cualquier error se considera falso"""
+
+    try:
+        return get_condition(expression).evaluate(context)
+    except Exception:
+        return False
@@ -0,0 +1,245 @@
+# ============================================
+# back/workflow_engine/core/connections.py
+# Registro de conexiones en tiempo real con heartbeat
+# ============================================
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import itertools
+import logging
+import time
+
+from .encoding import dumps
+
+logger = logging.getLogger(__name__)
+
+# Código de cierre para clientes que no responden al ping
+PING_TIMEOUT_CLOSE_CODE = 1011
+
+
+class Connection:
+    """Estado de una conexión registrada"""
+
+    __slots__ = (
+        "websocket",
+        "kind",
+        "heartbeat",
+        "metadata",
+        "connected_at",
+        "last_seen",
+        "ping_id",
+        "ping_sent_at",
+        "last_rtt",
+    )
+
+    def __init__(self, websocket, kind: str, heartbeat: bool, metadata: Dict[str, Any]):
+        now = time.monotonic()
+        self.websocket = websocket
+        self.kind = kind
+        self.heartbeat = heartbeat
+        self.metadata = metadata
+        self.connected_at = now
+        self.last_seen = now
+        # Ping pendiente de respuesta (None si no hay)
+        self.ping_id: Optional[int] = None
+        self.ping_sent_at: Optional[float] = None
+        self.last_rtt: Optional[float] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.monotonic()) - self.connected_at
+
+
+class ConnectionManager:
+    """Único registro de WebSockets y streams SSE del proceso.
+
+    Altas y bajas en O(1) (dict por socket). Una tarea periódica envía
+    ``{"type": "ping", "id": n}`` a los WebSockets sin actividad durante
+    ``ping_interval`` y cierra los que no contestan ``pong`` (o cualquier
+    otro mensaje) en ``pong_timeout``. Al dar de baja una conexión también se
+    quita del ``EventBus``.
+    """
+
+    def __init__(
+        self,
+        event_bus=None,
+        ping_interval: float = 20.0,
+        pong_timeout: float = 10.0,
+    ):
+        self.event_bus = event_bus
+        self.ping_interval = ping_interval
+        self.pong_timeout = pong_timeout
+        self.connections: Dict[Any, Connection] = {}
+        self._ping_ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+        self.total_connections = 0
+        self.pings_sent = 0
+        self.pongs_received = 0
+        self.reaped = 0
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def register(
+        self, websocket, kind: str = "websocket", heartbeat: bool = True, **metadata
+    ) -> Connection:
+        """Registra una conexión; ``heartbeat=False`` para streams sin pong"""
+        connection = self.connections.get(websocket)
+        if connection is None:
+            connection = Connection(websocket, kind, heartbeat, metadata)
+            self.connections[websocket] = connection
+            self.total_connections += 1
+        return connection
+
+    def unregister(self, websocket) -> None:
+        """Da de baja la conexión aquí y en el EventBus"""
+        self.connections.pop(websocket, None)
+        if self.event_bus is not None:
+            self.event_bus.remove_websocket(websocket)
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def __contains__(self, websocket) -> bool:
+        return websocket in self.connections
+
+    # ------------------------------------------------------------------
+    # Heartbeat
+    # ------------------------------------------------------------------
+
+    def touch(self, websocket) -> None:
+        """Cualquier mensaje del cliente demuestra que sigue vivo"""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.last_seen = time.monotonic()
+
+    def pong(self, websocket, ping_id: Optional[int] = None) -> None:
+        """Respuesta a un ping del servidor"""
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
+        now = time.monotonic()
+        connection.last_seen = now
+        matches = ping_id is None or ping_id == connection.ping_id
+        if connection.ping_sent_at is not None and matches:
+            connection.last_rtt = now - connection.ping_sent_at
+            connection.ping_id = None
+            connection.ping_sent_at = None
+            self.pongs_received += 1
+
+    def start(self) -> None:
+        """Arranca la tarea periódica de ping y limpieza"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        # Se revisa varias veces por intervalo para detectar timeouts a tiempo
+        period = max(0.01, min(self.ping_interval, self.pong_timeout) / 2)
+        while True:
+            await asyncio.sleep(period)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error("Connection heartbeat error: %s", e)
+
+    async def check(self) -> int:
+        """Cierra las conexiones que no contestaron y hace ping a las
+        inactivas; retorna cuántas se cerraron."""
+
+        now = time.monotonic()
+        expired: List[Connection] = []
+        due: List[Connection] = []
+        for connection in self.connections.values():
+            if not connection.heartbeat:
+                continue
+            if connection.ping_sent_at is not None:
+                if now - connection.ping_sent_at > self.pong_timeout:
+                    expired.append(connection)
+            elif now - connection.last_seen >= self.ping_interval:
+                due.append(connection)
+
+        for connection in expired:
+            # Hubo actividad tras el ping: se da por contestado
+            if connection.last_seen > connection.ping_sent_at:
+                self.pong(connection.websocket)
+                continue
+            self.reaped += 1
+            logger.info("Reaping unresponsive %s connection", connection.kind)
+            self.unregister(connection.websocket)
+            await self._close(connection.websocket, PING_TIMEOUT_CLOSE_CODE)
+
+        if due:
+            await asyncio.gather(*(self._ping(c) for c in due))
+        return len(expired)
+
+    async def _ping(self, connection: Connection) -> None:
+        connection.ping_id = next(self._ping_ids)
+        connection.ping_sent_at = time.monotonic()
+        frame = dumps(
+            {
+                "type": "ping",
+                "id": connection.ping_id,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+        try:
+            # Si el socket tiene writer en el EventBus el ping pasa por él:
+            # nunca se escribe en paralelo con los eventos
+            sent = None
+            if self.event_bus is not None:
+                sent = self.event_bus.send_control(connection.websocket, frame)
+            if sent is None:
+                sent = connection.websocket.send_text(frame)
+            # Un envío que no termina también cuenta como cliente muerto
+            if await asyncio.wait_for(sent, self.pong_timeout) is False:
+                raise ConnectionError("ping not sent")
+            self.pings_sent += 1
+        except Exception:
+            self.reaped += 1
+            self.unregister(connection.websocket)
+            await self._close(connection.websocket, PING_TIMEOUT_CLOSE_CODE)
+
+    @staticmethod
+    async def _close(websocket, code: int = 1000) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Detiene el heartbeat y cierra todas las conexiones"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        websockets = list(self.connections)
+        for websocket in websockets:
+            self.unregister(websocket)
+        await asyncio.gather(*(self._close(ws, 1001) for ws in websockets))
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        ages = [c.age(now) for c in self.connections.values()]
+        by_kind: Dict[str, int] = {}
+        for connection in self.connections.values():
+            by_kind[connection.kind] = by_kind.get(connection.kind, 0) + 1
+        rtts = [c.last_rtt for c in self.connections.values() if c.last_rtt is not None]
+        return {
+            "active": len(self.connections),
+            "by_kind": by_kind,
+            "total": self.total_connections,
+            "oldest_age": max(ages) if ages else 0.0,
+            "avg_age": sum(ages) / len(ages) if ages else 0.0,
+            "awaiting_pong": sum(
+                1 for c in self.connections.values() if c.ping_sent_at is not None
+            ),
+            "avg_rtt": sum(rtts) / len(rtts) if rtts else None,
+            "pings_sent": self.pings_sent,
+            "pongs_received": self.pongs_received,
+            "reaped": self.reaped,
+        }
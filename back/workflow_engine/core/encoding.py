@@ -0,0 +1,43 @@
+# ============================================
+# back/workflow_engine/core/encoding.py
+# Serialización JSON rápida de eventos
+# ============================================
+
+from typing import Any, Dict, Optional
+import json
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj: Any) -> str:
+    """JSON compacto; usa orjson si está instalado y json como respaldo"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # p.ej. enteros fuera de 64 bits: se reintenta con json
+            pass
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+def result_reference(data: Dict[str, Any], size: int) -> Dict[str, Any]:
+    """Sustituto de un resultado demasiado grande para ir en el evento"""
+
+    execution_id = data.get("execution_id")
+    node_id = data.get("node_id")
+    if node_id is not None:
+        url: Optional[str] = f"/api/v1/executions/{execution_id}/nodes/{node_id}"
+    elif execution_id:
+        url = f"/api/v1/executions/{execution_id}/result"
+    else:
+        url = None
+    return {"truncated": True, "size": size, "url": url}
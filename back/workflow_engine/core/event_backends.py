@@ -0,0 +1,126 @@
+# ============================================
+# back/workflow_engine/core/event_backends.py
+# Backends de distribución de eventos entre procesos
+# ============================================
+
+from typing import Callable, List, Optional
+from abc import ABC, abstractmethod
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Recibe el sobre serializado publicado por cualquier proceso
+DeliverCallback = Callable[[str], None]
+
+
+class EventBackend(ABC):
+    """Transporte de eventos: cada EventBus publica aquí y entrega a sus
+    propios WebSockets lo que recibe del backend."""
+
+    # True si todos los suscriptores viven en este proceso
+    local_only = False
+
+    def __init__(self):
+        self._deliver: Optional[DeliverCallback] = None
+
+    def attach(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+
+    async def start(self) -> None:
+        """Conecta el backend (no-op para el backend en memoria)"""
+
+    @abstractmethod
+    async def publish(self, message: str) -> None:
+        """Publica un sobre ya serializado"""
+
+    async def close(self) -> None:
+        """Libera conexiones"""
+
+
+class InMemoryBroker:
+    """Broker en proceso que simula varios workers compartiendo canal"""
+
+    def __init__(self):
+        self.backends: List["InMemoryEventBackend"] = []
+
+    def publish(self, message: str) -> None:
+        for backend in list(self.backends):
+            if backend._deliver is not None:
+                backend._deliver(message)
+
+
+class InMemoryEventBackend(EventBackend):
+    """Entrega directa dentro del proceso; con un broker compartido permite
+    probar el reparto entre varios EventBus sin Redis."""
+
+    def __init__(self, broker: Optional[InMemoryBroker] = None):
+        super().__init__()
+        self.local_only = broker is None
+        self.broker = broker or InMemoryBroker()
+        self.broker.backends.append(self)
+
+    async def publish(self, message: str) -> None:
+        self.broker.publish(message)
+
+    async def close(self) -> None:
+        if self in self.broker.backends:
+            self.broker.backends.remove(self)
+
+
+class RedisEventBackend(EventBackend):
+    """Pub/sub de Redis: todos los workers reciben todos los eventos y cada
+    uno los entrega solo a sus propios sockets."""
+
+    def __init__(self, redis_url: str, channel: str = "iopeer:events"):
+        super().__init__()
+        self.redis_url = redis_url
+        self.channel = channel
+        self._redis = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(self.redis_url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("Redis event backend subscribed to %s", self.channel)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "message" or self._deliver is None:
+                        continue
+                    data = message["data"]
+                    self._deliver(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Redis event listener error: %s", e)
+                await asyncio.sleep(1)
+
+    async def publish(self, message: str) -> None:
+        if self._redis is None:
+            raise RuntimeError("Redis event backend not started")
+        await self._redis.publish(self.channel, message)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.close()
+        if self._redis is not None:
+            await self._redis.close()
+
+
+def create_event_backend(settings) -> EventBackend:
+    """Redis si ``use_redis`` está activo; si no, entrega en memoria"""
+    if settings.get("use_redis"):
+        return RedisEventBackend(settings.get("redis_url", "redis://localhost:6379"))
+    return InMemoryEventBackend()
@@ -0,0 +1,764 @@
+# ============================================
+# back/workflow_engine/core/events.py
+# Event Bus para comunicación en tiempo real
+# ============================================
+
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime
+import asyncio
+import inspect
+import json
+import logging
+import time
+
+from .encoding import dumps, result_reference
+from .event_backends import EventBackend, InMemoryEventBackend
+
+logger = logging.getLogger(__name__)
+
+# Topic que recibe todos los eventos (dashboards globales)
+ALL_TOPIC = "*"
+
+# Eventos de estado intermedio que un evento posterior del mismo nodo reemplaza
+PROGRESS_EVENTS = frozenset(("node_started", "node_progress", "node_retry"))
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Último evento de una ejecución: ya no hace falta seguir numerándola
+FINISHED_EVENTS = frozenset(
+    ("workflow_completed", "workflow_failed", "workflow_cancelled")
+)
+
+# Callback de ``subscribe``: recibe los datos del evento (sync o async)
+Listener = Callable[[Dict[str, Any]], Any]
+
+
+def workflow_topic(workflow_id: str) -> str:
+    return f"workflow:{workflow_id}"
+
+
+def execution_topic(execution_id: str) -> str:
+    return f"execution:{execution_id}"
+
+
+def event_topics(data: Dict[str, Any]) -> List[str]:
+    """Topics a los que pertenece un evento según sus ids"""
+    topics = [ALL_TOPIC]
+    if data.get("workflow_id"):
+        topics.append(workflow_topic(data["workflow_id"]))
+    if data.get("execution_id"):
+        topics.append(execution_topic(data["execution_id"]))
+    return topics
+
+
+def coalesce_batch(
+    items: List[Tuple[str, Optional[Tuple[str, str]], str]]
+) -> List[Tuple[str, Optional[Tuple[str, str]], str]]:
+    """Quita eventos de progreso superados por otro posterior del mismo nodo"""
+    seen: Set[Tuple[str, str]] = set()
+    kept = []
+    for item in reversed(items):
+        event_type, key, _ = item
+        if key is not None:
+            if event_type in PROGRESS_EVENTS and key in seen:
+                continue
+            seen.add(key)
+        kept.append(item)
+    kept.reverse()
+    return kept
+
+
+def coalesce_key(data: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Clave (ejecución, nodo) de los eventos de nodo; los fragmentos de
+    streaming (con ``delta``) no se sustituyen entre sí y no llevan clave"""
+    if data.get("node_id") is None or "delta" in data:
+        return None
+    return (data.get("execution_id"), data["node_id"])
+
+
+class ExecutionEventLog:
+    """Ring buffer de los eventos ya serializados de una ejecución, acotado
+    en número de eventos y en bytes"""
+
+    __slots__ = ("events", "size", "max_bytes", "bytes", "last_seq", "complete")
+
+    def __init__(self, size: int, max_bytes: Optional[int] = None, complete=True):
+        # (seq, tipo de evento, clave de coalescencia, frame)
+        self.events: Deque[Tuple[int, str, Optional[Tuple[str, str]], str]] = deque()
+        self.size = size
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.last_seq = 0
+        # False si se empezó a guardar con la ejecución ya en marcha
+        self.complete = complete
+
+    def next_seq(self) -> int:
+        self.last_seq += 1
+        return self.last_seq
+
+    def append(
+        self, seq: int, event_type: str, key: Optional[Tuple[str, str]], frame: str
+    ) -> None:
+        self.events.append((seq, event_type, key, frame))
+        self.bytes += len(frame)
+        self.last_seq = max(self.last_seq, seq)
+        while len(self.events) > self.size or (
+            self.max_bytes and self.bytes > self.max_bytes and len(self.events) > 1
+        ):
+            self.pop_oldest()
+
+    def pop_oldest(self) -> int:
+        """Descarta el evento más antiguo; retorna los bytes liberados"""
+        freed = len(self.events.popleft()[3])
+        self.bytes -= freed
+        return freed
+
+    @property
+    def first_seq(self) -> int:
+        return self.events[0][0] if self.events else self.last_seq + 1
+
+    def since(self, seq: int) -> List[Tuple[int, str, Optional[Tuple[str, str]], str]]:
+        """Eventos con número de secuencia mayor que ``seq``"""
+        newer = []
+        for item in reversed(self.events):
+            if item[0] <= seq:
+                break
+            newer.append(item)
+        newer.reverse()
+        return newer
+
+
+class EventSubscriber:
+    """WebSocket con cola de salida acotada vaciada por su propia tarea.
+
+    ``enqueue`` nunca espera al cliente: si la cola está llena aplica la
+    política de overflow (``drop_oldest``, ``coalesce`` o ``disconnect``).
+    Con ``batch_window`` el writer acumula eventos durante esa ventana y los
+    envía en un único frame ``{"type": "batch", "events": [...]}``.
+
+    El writer es el único que escribe en el socket (los WebSockets de
+    Starlette no admiten envíos concurrentes): pings y otros mensajes de
+    control pasan por ``send_control`` y salen antes que los eventos.
+    """
+
+    def __init__(
+        self,
+        websocket,
+        max_queue: int = 256,
+        overflow_policy: str = "drop_oldest",
+        on_close: Optional[Callable[[Any], None]] = None,
+        batch_window: Optional[float] = None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.websocket = websocket
+        self.on_close = on_close
+        self.batch_window = batch_window
+        self.topics: Set[str] = set()
+        self.max_queue = max(1, max_queue)
+        self.overflow_policy = overflow_policy
+        # (tipo de evento, clave de coalescencia, frame serializado)
+        self.queue: Deque[Tuple[str, Optional[Tuple[str, str]], str]] = deque()
+        # (frame, future con True si se envió) fuera de límites y de batching
+        self.control: Deque[Tuple[str, asyncio.Future]] = deque()
+        self.closed = False
+        self.sending = False
+        self.connected_at = time.monotonic()
+        self.sent = 0
+        self.events_sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._ready: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    def enqueue(
+        self, event_type: str, key: Optional[Tuple[str, str]], frame: str
+    ) -> bool:
+        """Encola un frame; retorna False si el suscriptor debe desconectarse"""
+
+        if self.closed:
+            return False
+        if len(self.queue) >= self.max_queue:
+            if self.overflow_policy == "disconnect":
+                return False
+            if not (self.overflow_policy == "coalesce" and self._coalesce(key)):
+                self.queue.popleft()
+                self.dropped += 1
+        self.queue.append((event_type, key, frame))
+        self._wake()
+        return True
+
+    def _coalesce(self, key: Optional[Tuple[str, str]]) -> bool:
+        """Libera un hueco descartando un evento de progreso ya superado"""
+
+        oldest_progress = None
+        for i, (event_type, queued_key, _) in enumerate(self.queue):
+            if event_type not in PROGRESS_EVENTS:
+                continue
+            if key is not None and queued_key == key:
+                del self.queue[i]
+                self.coalesced += 1
+                return True
+            if oldest_progress is None:
+                oldest_progress = i
+        if oldest_progress is None:
+            return False
+        del self.queue[oldest_progress]
+        self.dropped += 1
+        return True
+
+    def enqueue_replay(
+        self, items: Iterable[Tuple[str, Optional[Tuple[str, str]], str]]
+    ) -> None:
+        """Encola eventos de replay sin aplicar el límite de la cola"""
+        if self.closed:
+            return
+        self.queue.extend(items)
+        if self.queue:
+            self._wake()
+
+    def send_control(self, frame: str) -> asyncio.Future:
+        """Encola un frame de control; el future indica si llegó a enviarse"""
+        sent = asyncio.get_running_loop().create_future()
+        if self.closed:
+            sent.set_result(False)
+            return sent
+        self.control.append((frame, sent))
+        self._wake()
+        return sent
+
+    def _wake(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._ready = asyncio.Event()
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+        self._ready.set()
+
+    async def _write_loop(self) -> None:
+        while not self.closed:
+            if self.control:
+                frame, sent = self.control.popleft()
+                ok = await self._send(frame)
+                if not sent.done():
+                    sent.set_result(ok)
+                if not ok:
+                    return
+                continue
+            if not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+                frame, count = self._take_batch()
+            else:
+                _, _, frame = self.queue.popleft()
+                count = 1
+            if not await self._send(frame):
+                return
+            self.events_sent += count
+
+    async def _send(self, frame: str) -> bool:
+        self.sending = True
+        try:
+            await self.websocket.send_text(frame)
+        except Exception:
+            # Socket caído: se da de baja sin esperar al próximo evento
+            self.closed = True
+            if self.on_close is not None:
+                self.on_close(self.websocket)
+            return False
+        finally:
+            self.sending = False
+        self.sent += 1
+        return True
+
+    def _take_batch(self) -> Tuple[str, int]:
+        """Vacía la cola en un frame; los frames ya serializados se concatenan"""
+        items = coalesce_batch(list(self.queue))
+        self.coalesced += len(self.queue) - len(items)
+        self.queue.clear()
+        frame = '{"type":"batch","events":[' + ",".join(f for _, _, f in items) + "]}"
+        return frame, len(items)
+
+    async def drain(self) -> None:
+        """Espera a que la cola se vacíe (o el socket falle)"""
+        while (self.queue or self.control or self.sending) and not self.closed:
+            await asyncio.sleep(0.001)
+
+    def close(self) -> None:
+        self.closed = True
+        self.queue.clear()
+        while self.control:
+            _, sent = self.control.popleft()
+            if not sent.done():
+                sent.set_result(False)
+        if self._writer is not None and not self._writer.done():
+            self._writer.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "topics": sorted(self.topics),
+            "queue_depth": len(self.queue),
+            "sent": self.sent,
+            "events_sent": self.events_sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "age": time.monotonic() - self.connected_at,
+        }
+
+
+class EventBus:
+    """Sistema de eventos para comunicación en tiempo real.
+
+    Los WebSockets se suscriben a topics (``workflow:<id>``,
+    ``execution:<id>`` o ``*``); cada evento se serializa una vez y se encola
+    solo en los suscriptores de alguno de sus topics, sin esperar a ningún
+    cliente. Los resultados que superan ``max_frame_size`` se sustituyen por
+    una referencia al endpoint de la ejecución.
+
+    Con un ``backend`` distribuido (Redis) el evento se publica una vez y cada
+    proceso lo entrega a sus propios sockets; los listeners internos solo se
+    ejecutan en el proceso que emite.
+
+    Los eventos de cada ejecución llevan ``seq`` y quedan en un ring buffer
+    (``replay_size`` eventos y ``replay_log_bytes`` por ejecución, y
+    ``replay_total_bytes`` entre las últimas ``replay_executions``) para que
+    un cliente que se conecta tarde pueda pedir ``replay`` desde el último
+    número que vio. Solo se guardan las ejecuciones que piden replay con
+    ``retain`` o cuyos eventos tienen algún suscriptor.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 256,
+        overflow_policy: str = "drop_oldest",
+        max_frame_size: Optional[int] = 64 * 1024,
+        batch_window: Optional[float] = None,
+        listener_timeout: Optional[float] = 5.0,
+        backend: Optional[EventBackend] = None,
+        replay_size: int = 1000,
+        replay_executions: int = 500,
+        replay_log_bytes: Optional[int] = 1024 * 1024,
+        replay_total_bytes: Optional[int] = 64 * 1024 * 1024,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.listeners: Dict[str, List[Listener]] = {}
+        self.listener_timeout = listener_timeout
+        # (tipo de evento, listener) -> llamadas, errores, timeouts y latencias
+        self.listener_stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.max_frame_size = max_frame_size
+        # Ventana de batching por defecto (segundos); None envía cada evento
+        self.batch_window = batch_window
+        self.frames_encoded = 0
+        self.bytes_encoded = 0
+        self.truncated = 0
+        # topic -> suscriptores y websocket -> suscriptor para altas/bajas en O(1)
+        self.topic_subscribers: Dict[str, Set[EventSubscriber]] = defaultdict(set)
+        self.subscribers: Dict[Any, EventSubscriber] = {}
+        self.disconnected_slow = 0
+        self.publish_errors = 0
+        self.replay_size = replay_size
+        self.replay_executions = max(1, replay_executions)
+        self.replay_log_bytes = replay_log_bytes
+        self.replay_total_bytes = replay_total_bytes
+        self.replay_bytes = 0
+        self.event_logs: "OrderedDict[str, ExecutionEventLog]" = OrderedDict()
+        # Con backend distribuido: último seq emitido por ejecución, exista o
+        # no su log en este proceso (acotado, por si alguna no termina)
+        self.event_seqs: "OrderedDict[str, int]" = OrderedDict()
+        self.max_event_seqs = 10 * self.replay_executions
+        self.set_backend(backend or InMemoryEventBackend())
+
+    def set_backend(self, backend: EventBackend) -> None:
+        """Cambia el transporte de eventos (p.ej. fallback si Redis no está)"""
+        self.backend = backend
+        backend.attach(self._deliver_envelope)
+
+    async def start(self) -> None:
+        """Conecta el backend de distribución"""
+        await self.backend.start()
+
+    @property
+    def websocket_connections(self) -> List[Any]:
+        """Sockets suscritos a cualquier topic"""
+        return list(self.subscribers)
+
+    def subscribe(self, event_type: str, callback: Listener):
+        """Suscribe un callback a un tipo de evento"""
+        if event_type not in self.listeners:
+            self.listeners[event_type] = []
+        self.listeners[event_type].append(callback)
+
+    def unsubscribe(self, event_type: str, callback: Listener) -> None:
+        """Elimina un callback suscrito"""
+        callbacks = self.listeners.get(event_type)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+
+    def add_websocket(
+        self,
+        websocket,
+        topics: Iterable[str] = (ALL_TOPIC,),
+        overflow_policy: Optional[str] = None,
+        batch_window: Optional[float] = None,
+    ) -> EventSubscriber:
+        """Registra un WebSocket suscrito a los topics indicados"""
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            subscriber = EventSubscriber(
+                websocket,
+                max_queue=self.queue_size,
+                overflow_policy=overflow_policy or self.overflow_policy,
+                on_close=self.remove_websocket,
+                batch_window=(
+                    batch_window if batch_window is not None else self.batch_window
+                ),
+            )
+            self.subscribers[websocket] = subscriber
+        for topic in topics:
+            subscriber.topics.add(topic)
+            self.topic_subscribers[topic].add(subscriber)
+        return subscriber
+
+    def remove_websocket(self, websocket) -> None:
+        """Da de baja un WebSocket de todos sus topics"""
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber is None:
+            return
+        subscriber.close()
+        for topic in subscriber.topics:
+            subscribers = self.topic_subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.topic_subscribers[topic]
+
+    def send_control(self, websocket, frame: str) -> Optional[asyncio.Future]:
+        """Envía un frame de control por el writer del socket; None si el
+        socket no está suscrito y se le puede escribir directamente"""
+        subscriber = self.subscribers.get(websocket)
+        return subscriber.send_control(frame) if subscriber is not None else None
+
+    def get_subscribers(self, data: Dict[str, Any]) -> Set[EventSubscriber]:
+        """Suscriptores interesados en un evento (sin duplicados)"""
+        return self._subscribers_for(event_topics(data))
+
+    def _subscribers_for(self, topics: Iterable[str]) -> Set[EventSubscriber]:
+        subscribers: Set[EventSubscriber] = set()
+        for topic in topics:
+            subscribers.update(self.topic_subscribers.get(topic, ()))
+        return subscribers
+
+    async def emit(self, event_type: str, data: Dict[str, Any]):
+        """Emite un evento a todos los listeners"""
+
+        # Ejecutar callbacks locales en paralelo, cada uno con su timeout
+        callbacks = self.listeners.get(event_type)
+        if callbacks:
+            await asyncio.gather(
+                *(
+                    self._call_listener(event_type, callback, data)
+                    for callback in callbacks
+                )
+            )
+
+        # Encolar para las conexiones WebSocket (de este y otros procesos)
+        await self._broadcast_to_websockets(event_type, data)
+
+    async def _call_listener(
+        self, event_type: str, callback: Listener, data: Dict[str, Any]
+    ) -> None:
+        """Ejecuta un listener aislado: los sincrónicos van a un hilo"""
+
+        name = getattr(callback, "__qualname__", None) or repr(callback)
+        stats = self.listener_stats.get((event_type, name))
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "errors": 0,
+                "timeouts": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+            }
+            self.listener_stats[(event_type, name)] = stats
+
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(callback):
+                call = callback(data)
+            else:
+                call = asyncio.to_thread(callback, data)
+
+            async def run():
+                result = await call
+                # Callables sincrónicos que devuelven una corrutina
+                if inspect.isawaitable(result):
+                    await result
+
+            await asyncio.wait_for(run(), self.listener_timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            logger.warning("Event listener %s timed out on %s", name, event_type)
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error("Error in event listener %s on %s: %s", name, event_type, e)
+        finally:
+            latency = time.perf_counter() - started
+            stats["calls"] += 1
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+
+    def get_listener_stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            f"{event_type}:{name}": {
+                **stats,
+                "avg_latency": (
+                    stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0
+                ),
+            }
+            for (event_type, name), stats in self.listener_stats.items()
+        }
+
+    def retain(self, execution_id: str) -> None:
+        """Guarda los eventos de una ejecución aunque aún nadie la siga"""
+        if self.replay_size:
+            self._get_log(execution_id, create=True)
+
+    def _get_log(
+        self, execution_id: str, create: bool = False, complete: bool = True
+    ) -> Optional[ExecutionEventLog]:
+        log = self.event_logs.get(execution_id)
+        if log is not None:
+            self.event_logs.move_to_end(execution_id)
+        elif create:
+            log = ExecutionEventLog(self.replay_size, self.replay_log_bytes, complete)
+            self.event_logs[execution_id] = log
+            while len(self.event_logs) > self.replay_executions:
+                self._drop_log()
+        return log
+
+    def _drop_log(self) -> None:
+        _, log = self.event_logs.popitem(last=False)
+        self.replay_bytes -= log.bytes
+
+    def _append_to_log(
+        self,
+        log: ExecutionEventLog,
+        seq: int,
+        event_type: str,
+        key: Optional[Tuple[str, str]],
+        frame: str,
+    ) -> None:
+        before = log.bytes
+        log.append(seq, event_type, key, frame)
+        self.replay_bytes += log.bytes - before
+        if not self.replay_total_bytes:
+            return
+        # Primero se descartan las ejecuciones menos recientes enteras
+        while self.replay_bytes > self.replay_total_bytes and len(self.event_logs) > 1:
+            self._drop_log()
+        while self.replay_bytes > self.replay_total_bytes and len(log.events) > 1:
+            self.replay_bytes -= log.pop_oldest()
+
+    def _next_seq(self, execution_id: str, event_type: str) -> int:
+        """Siguiente seq de una ejecución sin crear su log"""
+        log = self.event_logs.get(execution_id)
+        last = self.event_seqs.pop(execution_id, 0)
+        seq = max(last, log.last_seq if log is not None else 0) + 1
+        if event_type not in FINISHED_EVENTS:
+            self.event_seqs[execution_id] = seq
+            while len(self.event_seqs) > self.max_event_seqs:
+                self.event_seqs.popitem(last=False)
+        return seq
+
+    def get_last_seq(self, execution_id: str) -> int:
+        log = self.event_logs.get(execution_id)
+        return log.last_seq if log else 0
+
+    def replay(self, websocket, execution_id: str, since: int = 0) -> int:
+        """Reenvía a un socket los eventos de una ejecución posteriores a
+        ``since``; si el buffer ya los descartó envía antes un ``replay_gap``.
+        """
+
+        subscriber = self.subscribers.get(websocket)
+        log = self.event_logs.get(execution_id)
+        if subscriber is None or log is None:
+            return 0
+
+        items = [
+            (event_type, key, frame) for _, event_type, key, frame in log.since(since)
+        ]
+        if since + 1 < log.first_seq or (since == 0 and not log.complete):
+            gap = dumps(
+                {
+                    "type": "replay_gap",
+                    "data": {
+                        "execution_id": execution_id,
+                        "since": since,
+                        "first_seq": log.first_seq,
+                    },
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+            items.insert(0, ("replay_gap", None, gap))
+        subscriber.enqueue_replay(items)
+        return len(items)
+
+    def _encode_event(
+        self, event_type: str, data: Dict[str, Any], seq: Optional[int] = None
+    ) -> str:
+        """Serializa el evento una sola vez para todos los suscriptores"""
+
+        event = {
+            "type": event_type,
+            "data": data,
+            "timestamp": datetime.now().isoformat(),
+        }
+        if seq is not None:
+            event["seq"] = seq
+        frame = dumps(event)
+        if (
+            self.max_frame_size
+            and len(frame) > self.max_frame_size
+            and data.get("result") is not None
+        ):
+            event["data"] = {**data, "result": result_reference(data, len(frame))}
+            frame = dumps(event)
+            self.truncated += 1
+
+        self.frames_encoded += 1
+        self.bytes_encoded += len(frame)
+        return frame
+
+    async def _broadcast_to_websockets(
+        self, event_type: str, data: Dict[str, Any]
+    ) -> None:
+        """Encola el evento en los suscriptores de sus topics"""
+
+        topics = event_topics(data)
+        key = coalesce_key(data)
+        execution_id = data.get("execution_id")
+        replay = bool(execution_id and self.replay_size)
+
+        if self.backend.local_only:
+            # Sin otros procesos: se entrega directo; sin interesados ni
+            # replay pedido no hace falta serializar ni guardar nada
+            subscribers = self._subscribers_for(topics)
+            log = None
+            if replay:
+                log = self._get_log(
+                    execution_id,
+                    create=bool(subscribers),
+                    complete=event_type == "workflow_started",
+                )
+            if subscribers or log is not None:
+                seq = log.next_seq() if log is not None else None
+                frame = self._encode_event(event_type, data, seq)
+                if log is not None:
+                    self._append_to_log(log, seq, event_type, key, frame)
+                self._deliver(subscribers, event_type, key, frame)
+            return
+
+        # Otros procesos pueden tener suscriptores: el emisor numera siempre,
+        # pero el log solo se crea al entregar (si se retuvo o hay suscriptores)
+        seq = self._next_seq(execution_id, event_type) if replay else None
+
+        # Cabecera pequeña + frame tal cual: el evento se serializa una vez
+        header = dumps(
+            {
+                "event_type": event_type,
+                "topics": topics,
+                "key": key,
+                "execution_id": execution_id,
+                "seq": seq,
+            }
+        )
+        envelope = f"{header}\n{self._encode_event(event_type, data, seq)}"
+        try:
+            await self.backend.publish(envelope)
+        except Exception as e:
+            # La entrega de eventos nunca cambia el resultado de un workflow:
+            # se registra y al menos los sockets de este proceso lo reciben
+            self.publish_errors += 1
+            logger.error("Event backend publish failed for %s: %s", event_type, e)
+            self._deliver_envelope(envelope)
+
+    def _deliver_envelope(self, message: str) -> None:
+        """Entrega a los sockets locales un evento recibido del backend"""
+
+        header, frame = message.split("\n", 1)
+        envelope = json.loads(header)
+        key = tuple(envelope["key"]) if envelope.get("key") else None
+        subscribers = self._subscribers_for(envelope["topics"])
+        if envelope.get("seq") is not None and self.replay_size:
+            log = self._get_log(
+                envelope["execution_id"],
+                create=bool(subscribers),
+                complete=envelope["event_type"] == "workflow_started",
+            )
+            if log is not None:
+                self._append_to_log(
+                    log, envelope["seq"], envelope["event_type"], key, frame
+                )
+        if subscribers:
+            self._deliver(subscribers, envelope["event_type"], key, frame)
+
+    def _deliver(
+        self,
+        subscribers: Set[EventSubscriber],
+        event_type: str,
+        key: Optional[Tuple[str, str]],
+        frame: str,
+    ) -> None:
+        for subscriber in subscribers:
+            if not subscriber.enqueue(event_type, key, frame):
+                self._disconnect(subscriber)
+
+    def _disconnect(self, subscriber: EventSubscriber) -> None:
+        """Saca a un suscriptor caído o demasiado lento"""
+        if not subscriber.closed:
+            # Cola llena con política "disconnect": se cierra el socket
+            self.disconnected_slow += 1
+            asyncio.get_running_loop().create_task(
+                self._close_websocket(subscriber.websocket)
+            )
+        self.remove_websocket(subscriber.websocket)
+
+    @staticmethod
+    async def _close_websocket(websocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def drain(self) -> None:
+        """Espera a que todas las colas de salida se vacíen"""
+        await asyncio.gather(*(s.drain() for s in list(self.subscribers.values())))
+
+    async def close(self) -> None:
+        """Detiene las tareas de escritura y el backend"""
+        for websocket in list(self.subscribers):
+            self.remove_websocket(websocket)
+        await self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "topics": len(self.topic_subscribers),
+            "queued": sum(len(s.queue) for s in self.subscribers.values()),
+            "dropped": sum(s.dropped for s in self.subscribers.values()),
+            "coalesced": sum(s.coalesced for s in self.subscribers.values()),
+            "disconnected_slow": self.disconnected_slow,
+            "frames_encoded": self.frames_encoded,
+            "bytes_encoded": self.bytes_encoded,
+            "truncated": self.truncated,
+            "backend": type(self.backend).__name__,
+            "publish_errors": self.publish_errors,
+            "replay_executions": len(self.event_logs),
+            "replay_bytes": self.replay_bytes,
+            "listeners": self.get_listener_stats(),
+        }
@@ -0,0 +1,386 @@
+# ============================================
+# back/workflow_engine/core/executors.py
+# Pools dedicados por clase de agente (hilos o procesos)
+# ============================================
+
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import importlib
+import inspect
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+# Claves del mensaje que solo tienen sentido dentro del proceso principal
+LOCAL_MESSAGE_KEYS = ("cancel_event",)
+
+# (ruta "modulo:Clase", agent_id, config serializada) -> instancia del worker
+_worker_agents: Dict[Tuple[str, str, str], Any] = {}
+
+
+def agent_spec(agent) -> Tuple[str, str, str]:
+    """Datos mínimos para recrear un agente dentro de un worker"""
+    cls = agent.__class__
+    return (
+        f"{cls.__module__}:{cls.__qualname__}",
+        getattr(agent, "agent_id", cls.__name__),
+        json.dumps(getattr(agent, "config", {}) or {}, sort_keys=True, default=str),
+    )
+
+
+def worker_init_kwargs(
+    agent_class: type, agent_id: Optional[str] = None, config: Any = None
+) -> Dict[str, Any]:
+    """Argumentos con los que un worker puede construir ``agent_class``.
+
+    Solo se conocen ``agent_id``, ``name`` y ``config``; si ``__init__``
+    exige otros la clase no puede correr en un pool de procesos.
+    """
+    known = {"agent_id": agent_id, "name": agent_id, "config": config}
+    params = inspect.signature(agent_class).parameters
+    missing = [
+        p.name
+        for p in params.values()
+        if p.default is p.empty
+        and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+        and p.name not in known
+    ]
+    if missing:
+        raise TypeError(
+            f"{agent_class.__name__} cannot run in a process pool: "
+            f"__init__ requires {', '.join(missing)}"
+        )
+    return {name: value for name, value in known.items() if name in params}
+
+
+def _get_worker_agent(spec: Tuple[str, str, str]):
+    """Instancia el agente una sola vez por proceso worker"""
+    agent = _worker_agents.get(spec)
+    if agent is None:
+        class_path, agent_id, config = spec
+        module_name, class_name = class_path.split(":")
+        agent_class = getattr(importlib.import_module(module_name), class_name)
+        config = json.loads(config)
+        agent = agent_class(**worker_init_kwargs(agent_class, agent_id, config))
+        agent.agent_id = agent_id
+        agent.config = config
+        _worker_agents[spec] = agent
+    return agent
+
+
+def run_in_worker(spec: Tuple[str, str, str], payload: bytes) -> Tuple[float, bytes]:
+    """Punto de entrada en el worker: JSON compacto de ida y vuelta"""
+    started_at = time.time()
+    result = _get_worker_agent(spec).handle(json.loads(payload))
+    return started_at, json.dumps(result, separators=(",", ":"), default=str).encode()
+
+
+# Marca de fin de un stream síncrono consumido en un hilo
+_STREAM_END = object()
+
+
+async def iterate_sync_stream(
+    chunks: Iterator[Any],
+    submit: Callable[[Callable[[], None]], Any],
+    cancel_event: Optional[threading.Event] = None,
+) -> AsyncIterator[Any]:
+    """Recorre un generador síncrono en un hilo (vía ``submit``) y entrega
+    cada fragmento al loop en cuanto se produce."""
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def put(item: Tuple[Any, Optional[BaseException]]) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # loop cerrado: ya nadie consume
+
+    def produce() -> None:
+        error = None
+        try:
+            for chunk in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                put((chunk, None))
+        except BaseException as e:
+            error = e
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        put((_STREAM_END, error))
+
+    submit(produce)
+    while True:
+        chunk, error = await queue.get()
+        if chunk is _STREAM_END:
+            if error is not None:
+                raise error
+            return
+        yield chunk
+
+
+class AgentPoolFullError(Exception):
+    """La cola del pool de un agente está llena"""
+
+
+class BaseAgentPool:
+    """Interfaz y métricas comunes de los pools de hilos y de procesos"""
+
+    executor: Any
+    queued: int
+    running: int
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise AgentPoolFullError(
+            f"Agent pool '{self.name}' is full ({self.queued} queued)"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.completed + self.failed + self.running
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "avg_wait": self.total_wait / started if started else 0.0,
+                "max_wait": self.max_wait,
+                "avg_run": self.total_run / finished if finished else 0.0,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class AgentPool(BaseAgentPool):
+    """ThreadPoolExecutor acotado con métricas de cola y espera"""
+
+    def __init__(self, name: str, workers: int = 4, max_queue: int = 100):
+        super().__init__(name, workers, max_queue)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix=f"agent-{name}"
+        )
+        self.queued = 0
+        self.running = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Encola la llamada; lanza AgentPoolFullError si se supera max_queue"""
+
+        with self._lock:
+            if self.queued + self.running >= self.workers + self.max_queue:
+                self._reject()
+            self.queued += 1
+        submitted_at = time.monotonic()
+
+        def run() -> Any:
+            started_at = time.monotonic()
+            wait = started_at - submitted_at
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.monotonic() - started_at
+                with self._lock:
+                    self.running -= 1
+                    self.total_run += elapsed
+
+        future = self.executor.submit(run)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            if future.cancelled():
+                # Cancelado antes de arrancar: nunca salió de la cola
+                self.queued -= 1
+                self.cancelled += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+
+class ProcessAgentPool(BaseAgentPool):
+    """Pool de procesos para agentes CPU-bound que no liberan el GIL.
+
+    Los agentes se instancian una vez por worker a partir de su spec y los
+    mensajes viajan como JSON compacto; la espera en cola se mide con el
+    reloj de pared porque el inicio ocurre en otro proceso. No ejecuta
+    callables arbitrarios: solo ``submit_message``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: Optional[int] = None,
+        max_queue: int = 100,
+        start_method: str = "spawn",
+    ):
+        super().__init__(name, workers or os.cpu_count() or 1, max_queue)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+        )
+        self.in_flight = 0
+
+    @property
+    def running(self) -> int:
+        return min(self.in_flight, self.workers)
+
+    @property
+    def queued(self) -> int:
+        return self.in_flight - self.running
+
+    def submit_message(self, agent, message: Dict[str, Any]) -> Future:
+        """Envía el mensaje serializado al pool; retorna un Future de bytes"""
+
+        payload = json.dumps(
+            {k: v for k, v in message.items() if k not in LOCAL_MESSAGE_KEYS},
+            separators=(",", ":"),
+            default=str,
+        ).encode()
+
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self._reject()
+            self.in_flight += 1
+        submitted_at = time.time()
+
+        future = self.executor.submit(run_in_worker, agent_spec(agent), payload)
+        future.add_done_callback(lambda f: self._on_process_done(f, submitted_at))
+        return future
+
+    def _on_process_done(self, future: Future, submitted_at: float) -> None:
+        finished_at = time.time()
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled():
+                self.cancelled += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                started_at, _ = future.result()
+                wait = max(0.0, started_at - submitted_at)
+                self.completed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.total_run += finished_at - started_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "backend": "process"}
+
+
+class AgentPoolManager:
+    """Un pool acotado por clase de agente para aislar agentes lentos.
+
+    Los tamaños salen de ``agents.pools`` en config.yaml: la entrada
+    ``default`` aplica a cualquier clase sin configuración propia. Las
+    clases marcadas con ``use_process_pool`` (``"executor": "process"`` en
+    registry.json) corren en un ProcessPoolExecutor.
+    """
+
+    DEFAULT_WORKERS = 4
+    DEFAULT_MAX_QUEUE = 100
+
+    def __init__(self, settings: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.settings = settings or {}
+        self.pools: Dict[str, BaseAgentPool] = {}
+        # Clase de agente -> opciones del pool de procesos
+        self.process_agents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def use_process_pool(self, agent_class: type, **options: Any) -> None:
+        """Ejecuta los agentes de esta clase en un pool de procesos"""
+        # Falla aquí, no en el worker, si la clase no se puede reconstruir
+        worker_init_kwargs(agent_class)
+        self.process_agents[agent_class.__name__] = options
+
+    def get_pool(self, agent) -> BaseAgentPool:
+        name = agent.__class__.__name__
+        pool = self.pools.get(name)
+        if pool is None:
+            with self._lock:
+                pool = self.pools.get(name)
+                if pool is None:
+                    pool = self._create_pool(name)
+                    self.pools[name] = pool
+        return pool
+
+    def _create_pool(self, name: str) -> BaseAgentPool:
+        defaults = self.settings.get("default") or {}
+        settings = {**defaults, **(self.settings.get(name) or {})}
+        if name in self.process_agents:
+            settings.update(self.process_agents[name])
+            return ProcessAgentPool(
+                name,
+                workers=settings.get("process_workers"),
+                max_queue=settings.get("max_queue", self.DEFAULT_MAX_QUEUE),
+                start_method=settings.get("start_method", "spawn"),
+            )
+        return AgentPool(
+            name,
+            workers=settings.get("workers", self.DEFAULT_WORKERS),
+            max_queue=settings.get("max_queue", self.DEFAULT_MAX_QUEUE),
+        )
+
+    async def run(self, agent, message: Dict[str, Any]) -> Any:
+        """Ejecuta ``agent.handle(message)`` en el pool de su clase"""
+        pool = self.get_pool(agent)
+        if isinstance(pool, ProcessAgentPool):
+            _, payload = await asyncio.wrap_future(pool.submit_message(agent, message))
+            return json.loads(payload)
+        return await asyncio.wrap_future(pool.submit(agent.handle, message))
+
+    def supports_streaming(self, agent) -> bool:
+        """Los fragmentos no cruzan procesos: esas clases usan ``handle``"""
+        return agent.__class__.__name__ not in self.process_agents
+
+    def stream(
+        self,
+        agent,
+        chunks: Iterator[Any],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> AsyncIterator[Any]:
+        """Consume el stream síncrono de ``agent`` en el pool de su clase"""
+        pool = self.get_pool(agent)
+        if not isinstance(pool, AgentPool):
+            raise TypeError(
+                f"{agent.__class__.__name__} runs in a process pool and cannot stream"
+            )
+        return iterate_sync_stream(chunks, pool.submit, cancel_event)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
+
+    def shutdown(self, wait: bool = False) -> None:
+        for pool in self.pools.values():
+            pool.shutdown(wait=wait)
+        self.pools.clear()
@@ -0,0 +1,140 @@
+# ============================================
+# back/workflow_engine/core/plan.py
+# Plan de ejecución precalculado de un workflow
+# ============================================
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import deque
+
+
+class ExecutionPlan:
+    """Grafo de un workflow indexado por ordinal de nodo.
+
+    Se calcula una vez por versión del workflow: orden topológico (Kahn con
+    deque), sucesores/predecesores por ordinal, niveles paralelos y camino
+    crítico. Las conexiones SUCCESS fijan el orden; las demás entradas
+    declaradas (ERROR, CONDITIONAL) también se esperan antes de lanzar el
+    nodo si su origen va antes en ese orden.
+    """
+
+    __slots__ = (
+        "node_ids",
+        "index",
+        "successors",
+        "predecessors",
+        "inputs",
+        "in_degree",
+        "order",
+        "levels",
+        "critical_path",
+    )
+
+    def __init__(
+        self,
+        node_ids: List[str],
+        edges: Iterable[Tuple[str, str]],
+        inputs: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.node_ids = node_ids
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        count = len(node_ids)
+        successors: List[List[int]] = [[] for _ in range(count)]
+        predecessors: List[List[int]] = [[] for _ in range(count)]
+        for source_id, target_id in edges:
+            try:
+                source, target = self.index[source_id], self.index[target_id]
+            except KeyError as e:
+                raise ValueError(f"Connection references unknown node {e}") from None
+            successors[source].append(target)
+            predecessors[target].append(source)
+        self._set_edges(successors, predecessors)
+
+        # Entradas declaradas de cada nodo (incluye conexiones no SUCCESS)
+        inputs = inputs or {}
+        self.inputs: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(self.index[i] for i in inputs.get(node_id, ()) if i in self.index)
+            for node_id in node_ids
+        )
+
+        self.order, self.levels, self.critical_path = self._sort()
+
+        # Un nodo no se lanza mientras una entrada declarada siga en curso.
+        # Solo se añaden las que van antes en el orden SUCCESS: así el grafo
+        # sigue siendo acíclico y las posteriores se resuelven como SKIPPED.
+        position = {node: i for i, node in enumerate(self.order)}
+        added = False
+        for target, sources in enumerate(self.inputs):
+            for source in sources:
+                if (
+                    position[source] < position[target]
+                    and source not in predecessors[target]
+                ):
+                    successors[source].append(target)
+                    predecessors[target].append(source)
+                    added = True
+        if added:
+            self._set_edges(successors, predecessors)
+            self.order, self.levels, self.critical_path = self._sort()
+
+    def _set_edges(
+        self, successors: List[List[int]], predecessors: List[List[int]]
+    ) -> None:
+        self.successors: Tuple[Tuple[int, ...], ...] = tuple(map(tuple, successors))
+        self.predecessors: Tuple[Tuple[int, ...], ...] = tuple(map(tuple, predecessors))
+        self.in_degree: Tuple[int, ...] = tuple(len(p) for p in predecessors)
+
+    def _sort(self) -> Tuple[List[int], List[List[int]], List[str]]:
+        """Kahn O(V+E) calculando niveles y el camino más largo"""
+
+        remaining = list(self.in_degree)
+        level = [0] * len(self.node_ids)
+        # Longitud del camino más largo que termina en cada nodo y su predecesor
+        depth = [1] * len(self.node_ids)
+        parent = [-1] * len(self.node_ids)
+
+        queue = deque(i for i, degree in enumerate(remaining) if degree == 0)
+        order: List[int] = []
+        while queue:
+            current = queue.popleft()
+            order.append(current)
+            for neighbor in self.successors[current]:
+                if level[current] + 1 > level[neighbor]:
+                    level[neighbor] = level[current] + 1
+                if depth[current] + 1 > depth[neighbor]:
+                    depth[neighbor] = depth[current] + 1
+                    parent[neighbor] = current
+                remaining[neighbor] -= 1
+                if remaining[neighbor] == 0:
+                    queue.append(neighbor)
+
+        if len(order) != len(self.node_ids):
+            raise Exception("Workflow contains cycles")
+
+        levels: List[List[int]] = []
+        for i in order:
+            if level[i] == len(levels):
+                levels.append([])
+            levels[level[i]].append(i)
+
+        critical: List[str] = []
+        if order:
+            current = max(order, key=depth.__getitem__)
+            while current != -1:
+                critical.append(self.node_ids[current])
+                current = parent[current]
+            critical.reverse()
+
+        return order, levels, critical
+
+    @property
+    def execution_order(self) -> List[str]:
+        return [self.node_ids[i] for i in self.order]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "execution_order": self.execution_order,
+            "levels": [[self.node_ids[i] for i in level] for level in self.levels],
+            "critical_path": self.critical_path,
+            "max_parallelism": max((len(level) for level in self.levels), default=0),
+        }
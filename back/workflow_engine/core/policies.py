@@ -0,0 +1,155 @@
+# ============================================
+# back/workflow_engine/core/policies.py
+# Timeouts y reintentos de nodos por tipo de agente
+# ============================================
+
+from typing import Any, Dict, Iterable, Optional, Tuple, Type, Union
+import builtins
+import random
+
+from .executors import AgentPoolFullError
+
+# Claves de configuración que modifican una RetryPolicy
+RETRY_KEYS = frozenset(
+    (
+        "max_retries",
+        "retry_base_delay",
+        "retry_max_delay",
+        "retry_on_timeout",
+        "retry_on",
+    )
+)
+
+# Errores transitorios que se reintentan por defecto: timeouts e I/O de red.
+# Bugs (ValueError, KeyError...) o validaciones fallidas no mejoran al repetir
+DEFAULT_RETRY_ON: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError)
+
+# Nunca se reintentan: repetir solo añade carga a un pool ya lleno
+NEVER_RETRY: Tuple[Type[BaseException], ...] = (AgentPoolFullError,)
+
+ExceptionTypes = Iterable[Union[str, Type[BaseException]]]
+
+
+def exception_types(names: ExceptionTypes) -> Tuple[Type[BaseException], ...]:
+    """Clases de excepción a partir de clases o nombres de builtins (config)"""
+    types = []
+    for name in names:
+        error_type = getattr(builtins, name, None) if isinstance(name, str) else name
+        if not (isinstance(error_type, type) and issubclass(error_type, BaseException)):
+            raise ValueError(f"Unknown exception type in retry_on: {name}")
+        types.append(error_type)
+    return tuple(types)
+
+
+class NodeTimeoutError(Exception):
+    """El agente de un nodo superó su tiempo máximo"""
+
+
+class WorkflowTimeoutError(Exception):
+    """La ejecución completa superó el deadline del workflow"""
+
+
+class RetryPolicy:
+    """Reintentos con backoff exponencial y jitter completo"""
+
+    __slots__ = (
+        "max_retries",
+        "base_delay",
+        "max_delay",
+        "retry_on_timeout",
+        "retry_on",
+    )
+
+    def __init__(
+        self,
+        max_retries: int = 0,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        retry_on_timeout: bool = True,
+        retry_on: Optional[ExceptionTypes] = None,
+    ):
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self.retry_on_timeout = retry_on_timeout
+        self.retry_on = (
+            DEFAULT_RETRY_ON if retry_on is None else exception_types(retry_on)
+        )
+
+    def should_retry(self, attempt: int, error: BaseException) -> bool:
+        """attempt es el número de intento fallido, empezando en 1"""
+        if attempt > self.max_retries or isinstance(error, NEVER_RETRY):
+            return False
+        if isinstance(error, NodeTimeoutError):
+            return self.retry_on_timeout
+        return isinstance(error, self.retry_on)
+
+    def backoff(self, attempt: int) -> float:
+        """Espera antes del reintento: uniforme en [0, min(max, base * 2^n)]"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def merged(self, settings: Optional[Dict[str, Any]]) -> "RetryPolicy":
+        """Copia de la política con los campos de settings sobrescritos"""
+        if not settings or RETRY_KEYS.isdisjoint(settings):
+            return self
+        return RetryPolicy(
+            max_retries=settings.get("max_retries", self.max_retries),
+            base_delay=settings.get("retry_base_delay", self.base_delay),
+            max_delay=settings.get("retry_max_delay", self.max_delay),
+            retry_on_timeout=settings.get("retry_on_timeout", self.retry_on_timeout),
+            retry_on=settings.get("retry_on", self.retry_on),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_retries": self.max_retries,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "retry_on_timeout": self.retry_on_timeout,
+            "retry_on": [error_type.__name__ for error_type in self.retry_on],
+        }
+
+
+class NodePolicies:
+    """Resuelve timeout y RetryPolicy de cada nodo.
+
+    Prioridad: config del nodo > overrides del tipo de agente > valores por
+    defecto (sección ``agents`` de config.yaml).
+    """
+
+    def __init__(
+        self,
+        default_timeout: Optional[float] = None,
+        default_retry: Optional[RetryPolicy] = None,
+        agent_overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.default_timeout = default_timeout
+        self.default_retry = default_retry or RetryPolicy()
+        self.agent_overrides = agent_overrides or {}
+        self._by_agent: Dict[str, Tuple[Optional[float], RetryPolicy]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> "NodePolicies":
+        """Construye las políticas desde la sección ``agents`` de la config"""
+        settings = settings or {}
+        return cls(
+            default_timeout=settings.get("default_timeout"),
+            default_retry=RetryPolicy().merged(settings),
+            agent_overrides=settings.get("overrides"),
+        )
+
+    def resolve(
+        self, agent_type: str, node_config: Dict[str, Any]
+    ) -> Tuple[Optional[float], RetryPolicy]:
+        agent_policy = self._by_agent.get(agent_type)
+        if agent_policy is None:
+            override = self.agent_overrides.get(agent_type) or {}
+            agent_policy = (
+                override.get("timeout", self.default_timeout),
+                self.default_retry.merged(override),
+            )
+            self._by_agent[agent_type] = agent_policy
+
+        timeout, retry = agent_policy
+        return node_config.get("timeout", timeout), retry.merged(node_config)
@@ -0,0 +1,95 @@
+# ============================================
+# back/workflow_engine/core/sse.py
+# Stream Server-Sent Events sobre el EventBus
+# ============================================
+
+from typing import AsyncIterator, Optional
+import asyncio
+
+# Eventos tras los que una ejecución ya no emite nada más
+TERMINAL_EVENTS = frozenset(
+    (
+        "workflow_completed",
+        "workflow_failed",
+        "workflow_cancelled",
+        "execution_finished",
+    )
+)
+
+_TYPE_PREFIX = '{"type":"'
+_SEQ_MARKER = '"seq":'
+
+
+def frame_type(frame: str) -> Optional[str]:
+    """Tipo de un frame serializado por el EventBus sin decodificarlo"""
+    if not frame.startswith(_TYPE_PREFIX):
+        return None
+    end = frame.find('"', len(_TYPE_PREFIX))
+    return frame[len(_TYPE_PREFIX) : end] if end != -1 else None
+
+
+def frame_seq(frame: str) -> Optional[int]:
+    """``seq`` de un frame: es siempre la última clave del objeto"""
+    marker = frame.rfind(_SEQ_MARKER)
+    if marker == -1 or not frame.endswith("}"):
+        return None
+    tail = frame[marker + len(_SEQ_MARKER) : -1]
+    return int(tail) if tail.isdigit() else None
+
+
+def format_sse(frame: str, event_id: Optional[int] = None) -> str:
+    """Mensaje SSE; el frame JSON es compacto y no contiene saltos de línea"""
+    if event_id is None:
+        return f"data: {frame}\n\n"
+    return f"id: {event_id}\ndata: {frame}\n\n"
+
+
+class SSEConnection:
+    """Suscriptor del EventBus que expone los frames como stream SSE.
+
+    Implementa ``send_text``/``close`` como un WebSocket. ``send_text``
+    espera mientras el buffer de salida está lleno, así que un cliente HTTP
+    lento frena al writer de su ``EventSubscriber`` y es la cola de éste la
+    que aplica la política de overflow, sin bloquear ``emit``.
+    """
+
+    def __init__(self, buffer_size: int = 16):
+        self.buffer: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_size))
+        self.closed = False
+        self.close_code: Optional[int] = None
+
+    async def send_text(self, frame: str) -> None:
+        if self.closed:
+            raise RuntimeError("SSE stream closed")
+        await self.buffer.put(frame)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+        self.close_code = code
+        # Despierta al stream aunque el buffer esté lleno
+        if self.buffer.full():
+            self.buffer.get_nowait()
+        self.buffer.put_nowait(None)
+
+    async def stream(self, keepalive: float = 15.0) -> AsyncIterator[str]:
+        """Mensajes SSE hasta el evento final de la ejecución o el cierre.
+
+        Si no llega nada en ``keepalive`` segundos emite un comentario para
+        que proxies y clientes no den la conexión por muerta.
+        """
+
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.buffer.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if frame is None:
+                if self.close_code == 1013:
+                    # Desconectado por lento: el cliente puede reanudar
+                    yield f"event: overflow\ndata: {self.close_code}\n\n"
+                return
+            yield format_sse(frame, frame_seq(frame))
+            if frame_type(frame) in TERMINAL_EVENTS:
+                return
@@ -116,6 +116,11 @@ class WorkflowAPIClient {
     socket.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
+        // Heartbeat del servidor: sin pong a tiempo cierra la conexión
+        if (data.type === 'ping') {
+          socket.send(JSON.stringify({ type: 'pong', id: data.id }));
+          return;
+        }
         onMessage(data);
       } catch (error) {
         console.error('Error parsing WebSocket message:', error);
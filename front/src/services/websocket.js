@@ -60,6 +60,10 @@ class IopeerWebSocketService {
             if (data.type === 'pong') {
               return;
             }
+            if (data.type === 'ping') {
+              this.ws.send(JSON.stringify({ type: 'pong', id: data.id }));
+              return;
+            }
 
             console.log('📨 WebSocket message received:', data);
             this.emit('message', data);
@@ -203,6 +203,11 @@ class WorkflowService {
       socket.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
+          // Heartbeat del servidor: sin pong a tiempo cierra la conexión
+          if (data.type === 'ping') {
+            socket.send(JSON.stringify({ type: 'pong', id: data.id }));
+            return;
+          }
           if (onMessage) {
             onMessage(data);
           }